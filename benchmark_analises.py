@@ -0,0 +1,108 @@
+import sys
+import os
+import argparse
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def gerar_roster(tamanho, seed=42):
+    """Roster sintético já no formato de colunas do DatabaseManager, com cadastros ao longo de 3 anos"""
+    import numpy as np
+    import pandas as pd
+    from models.database import COLUNAS
+    from utils.benchmark import PERFIS
+    
+    rng = np.random.default_rng(seed)
+    segundos = rng.integers(0, 3 * 365 * 86400, tamanho).astype('timedelta64[s]')
+    datas = pd.Series(np.datetime64('2022-01-01T00:00:00') + segundos).dt.strftime("%Y-%m-%d %H:%M:%S")
+    
+    return pd.DataFrame({
+        COLUNAS['login']: [f"usuario{i:07d}" for i in range(tamanho)],
+        COLUNAS['senha']: 'senha',
+        COLUNAS['perfil']: np.array(PERFIS, dtype=object)[rng.integers(0, len(PERFIS), tamanho)],
+        COLUNAS['status']: np.where(rng.random(tamanho) < 0.1, 'Bloqueado', 'Ativo').astype(object),
+        COLUNAS['nome_completo']: [f"Usuario {i:07d}" for i in range(tamanho)],
+        COLUNAS['data_cadastro']: datas.astype(object),
+        COLUNAS['id']: [f"id{i}" for i in range(tamanho)]
+    })
+
+def laco_python(data):
+    """Como era feito antes: percorrer o roster inteiro em Python"""
+    por_perfil_status = Counter()
+    por_dia = Counter()
+    bloqueados = []
+    
+    for login, perfil, status, data_cadastro in zip(
+        data['LOGIN'], data['PERFIL'], data['STATUS'], data['DATA CADASTRO']
+    ):
+        por_perfil_status[(perfil, status)] += 1
+        por_dia[data_cadastro[:10]] += 1
+        if status != 'Ativo':
+            bloqueados.append(login)
+    
+    return por_perfil_status, por_dia, bloqueados
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede as análises vetorizadas do DatabaseManager")
+    parser.add_argument('--registros', type=int, default=1000000)
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    
+    from models.database import DatabaseManager
+    from utils.benchmark import ambiente, salvar
+    
+    print(f"🚀 Gerando roster com {args.registros} usuários...")
+    data = gerar_roster(args.registros)
+    
+    manager = DatabaseManager()
+    _, t_carga = cronometrar(lambda: manager.set_data(data))
+    print(f"📥 set_data (com índices de login) em {t_carga:.0f} ms")
+    
+    _, t_laco = cronometrar(lambda: laco_python(data))
+    print(f"🐢 Laço Python (3 análises): {t_laco:.1f} ms")
+    
+    analises = [
+        ('count_by(perfil, status)', lambda: manager.count_by('perfil', 'status')),
+        ('count_by(mes)', lambda: manager.count_by('mes')),
+        ('registrations_per_day', manager.registrations_per_day),
+        ('blocked_users', manager.blocked_users),
+        ('roster_summary', manager.roster_summary)
+    ]
+    
+    # A primeira análise também converte as colunas (categorias e datas)
+    _, t_preparo = cronometrar(manager.prepare_analytics)
+    print(f"🔧 Preparo das colunas de análise: {t_preparo:.1f} ms")
+    
+    resultados = []
+    for nome, funcao in analises:
+        _, frio = cronometrar(funcao)
+        _, quente = cronometrar(funcao)
+        resultados.append({
+            'analise': nome,
+            'primeira_ms': round(frio, 3),
+            'em_cache_ms': round(quente, 3)
+        })
+        print(f"📊 {nome:<26} primeira {frio:>8.2f} ms  em cache {quente:>7.3f} ms")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio.update({
+            'registros': args.registros,
+            'set_data_ms': round(t_carga, 1),
+            'laco_python_ms': round(t_laco, 1),
+            'preparo_ms': round(t_preparo, 1),
+            'resultados': resultados
+        })
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
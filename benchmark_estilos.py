@@ -0,0 +1,112 @@
+import sys
+import os
+import argparse
+import json
+import subprocess
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+MODOS = {
+    'por_janela': '0',
+    'global': '1'
+}
+
+def cronometrar(app, funcao):
+    """Executa funcao e processa os eventos pendentes (polish e layout); retorna ms"""
+    inicio = time.perf_counter()
+    funcao()
+    app.processEvents()
+    return (time.perf_counter() - inicio) * 1000
+
+def medir(trocas):
+    """Roda dentro do subprocesso de um modo: abertura das janelas e trocas entre elas"""
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    from views.login_window import LoginWindow
+    from views.register_window import RegisterWindow
+    from views.home_window import HomeWindow
+    
+    janelas = {}
+    abertura = {}
+    for nome, classe in (('login', LoginWindow), ('register', RegisterWindow), ('home', HomeWindow)):
+        def abrir():
+            janelas[nome] = classe()
+            janelas[nome].show()
+        abertura[nome] = cronometrar(app, abrir)
+        janelas[nome].hide()
+    
+    sequencia = ['register', 'login', 'home', 'login']
+    tempos = []
+    atual = 'login'
+    for i in range(trocas):
+        destino = sequencia[i % len(sequencia)]
+        
+        def trocar():
+            janelas[atual].hide()
+            janelas[destino].show()
+        tempos.append(cronometrar(app, trocar))
+        atual = destino
+    
+    tempos.sort()
+    return {
+        'abertura_ms': {nome: round(ms, 2) for nome, ms in abertura.items()},
+        'abertura_total_ms': round(sum(abertura.values()), 2),
+        'troca_media_ms': round(sum(tempos) / len(tempos), 3),
+        'troca_p90_ms': round(tempos[int(len(tempos) * 0.9)], 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara folha de estilos por janela com a folha única no QApplication")
+    parser.add_argument('--trocas', type=int, default=200)
+    parser.add_argument('--repeticoes', type=int, default=3, help="Processos novos por modo (abertura é medida a frio)")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    parser.add_argument('--interno', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.interno:
+        print(json.dumps(medir(args.trocas)))
+        return 0
+    
+    from utils.benchmark import ambiente, salvar
+    
+    resultados = {}
+    for modo, valor in MODOS.items():
+        ambiente_modo = dict(os.environ, AVERBSYS_ESTILOS_GLOBAIS=valor)
+        execucoes = []
+        for _ in range(args.repeticoes):
+            saida = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--interno', '--trocas', str(args.trocas)],
+                env=ambiente_modo, capture_output=True, text=True, check=True
+            ).stdout
+            execucoes.append(json.loads(saida.strip().splitlines()[-1]))
+        
+        # Melhor execução de cada métrica: menos ruído de disco e agendador
+        resultados[modo] = {
+            'abertura_total_ms': min(e['abertura_total_ms'] for e in execucoes),
+            'abertura_login_ms': min(e['abertura_ms']['login'] for e in execucoes),
+            'troca_media_ms': min(e['troca_media_ms'] for e in execucoes),
+            'troca_p90_ms': min(e['troca_p90_ms'] for e in execucoes)
+        }
+        r = resultados[modo]
+        print(f"📊 {modo:<10} abertura {r['abertura_total_ms']:>8.2f} ms (login {r['abertura_login_ms']:.2f} ms)  "
+              f"troca média {r['troca_media_ms']:.3f} ms  p90 {r['troca_p90_ms']:.3f} ms")
+    
+    antes, depois = resultados['por_janela'], resultados['global']
+    economia = {
+        campo: round(antes[campo] - depois[campo], 3)
+        for campo in ('abertura_total_ms', 'abertura_login_ms', 'troca_media_ms')
+    }
+    print(f"💡 Economia: abertura {economia['abertura_total_ms']:.2f} ms, troca {economia['troca_media_ms']:.3f} ms")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio.update({'trocas': args.trocas, 'resultados': resultados, 'economia': economia})
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
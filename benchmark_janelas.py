@@ -0,0 +1,134 @@
+import sys
+import os
+import argparse
+import json
+import subprocess
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Variáveis de ambiente de cada modo comparado
+MODOS = {
+    'antecipada': {'AVERBSYS_JANELAS_SOB_DEMANDA': '0', 'AVERBSYS_PREAQUECER_JANELAS': '0'},
+    'sob_demanda': {'AVERBSYS_JANELAS_SOB_DEMANDA': '1', 'AVERBSYS_PREAQUECER_JANELAS': '0'},
+    'sob_demanda_preaquecida': {'AVERBSYS_JANELAS_SOB_DEMANDA': '1', 'AVERBSYS_PREAQUECER_JANELAS': '1'}
+}
+
+# Login rápido e determinístico: backend em memória, sem pool de senhas nem limites
+AMBIENTE_BASE = {
+    'AVERBSYS_METRICAS': '1',
+    'AVERBSYS_SENHA_PROCESSOS': '0',
+    'AVERBSYS_SENHA_REHASH': '0',
+    'AVERBSYS_LOGIN_TAXA_GLOBAL': '0',
+    'AVERBSYS_LOGIN_TAXA_USUARIO': '0'
+}
+
+def rss_mb():
+    """Memória residente do processo (Linux); None onde /proc não existe"""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def medir(latencia_ms):
+    """Roda dentro do subprocesso de um modo: abertura do controller e login até a home"""
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv)
+    
+    from services.storage_backends import MemoryBackend
+    from utils.metrics import metricas
+    
+    class BackendLento(MemoryBackend):
+        """Simula a latência da RPC de login, quando a home pode ser pré-montada"""
+        
+        def get_by_login(self, login):
+            time.sleep(latencia_ms / 1000)
+            return super().get_by_login(login)
+    
+    backend = BackendLento([{
+        'login': 'benchmark', 'senha': '1234', 'perfil': 'Dev',
+        'nome_completo': 'Benchmark', 'status': 'Ativo'
+    }])
+    
+    rss_antes = rss_mb()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    
+    from controllers.auth_controller import AuthController
+    controller = AuthController(backend=backend)
+    controller.show_login()
+    app.processEvents()
+    
+    abertura_ms = (time.perf_counter() - inicio) * 1000
+    python_kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+    rss_depois = rss_mb()
+    
+    # Aguarda o warm_up do worker para medir só o login
+    while controller.api_worker.pending_count():
+        app.processEvents()
+        time.sleep(0.001)
+    
+    inicio = time.perf_counter()
+    controller.handle_login('benchmark', '1234')
+    while not controller._visivel(controller._home_window):
+        app.processEvents()
+        time.sleep(0.0005)
+    login_ate_home_ms = (time.perf_counter() - inicio) * 1000
+    
+    troca = metricas.histograma('janela.troca', destino='home')
+    return {
+        'abertura_ms': round(abertura_ms, 2),
+        'memoria_python_kb': round(python_kb, 1),
+        'memoria_rss_mb': round(rss_depois - rss_antes, 2) if rss_antes is not None else None,
+        'login_ate_home_ms': round(login_ate_home_ms, 2),
+        'troca_home_ms': round((troca.maximo or 0.0) * 1000, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara janelas criadas na abertura, sob demanda e pré-montadas")
+    parser.add_argument('--repeticoes', type=int, default=5, help="Processos novos por modo")
+    parser.add_argument('--latencia-ms', type=float, default=50.0, help="Latência simulada da consulta de login")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    parser.add_argument('--interno', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.interno:
+        print(json.dumps(medir(args.latencia_ms)))
+        return 0
+    
+    from utils.benchmark import ambiente, salvar
+    
+    resultados = {}
+    for modo, variaveis in MODOS.items():
+        ambiente_modo = dict(os.environ, **AMBIENTE_BASE, **variaveis)
+        execucoes = []
+        for _ in range(args.repeticoes):
+            saida = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--interno', '--latencia-ms', str(args.latencia_ms)],
+                env=ambiente_modo, capture_output=True, text=True, check=True
+            ).stdout
+            execucoes.append(json.loads(saida.strip().splitlines()[-1]))
+        
+        # Mediana de cada métrica entre os processos
+        resultados[modo] = {
+            campo: sorted(e[campo] for e in execucoes)[len(execucoes) // 2] if execucoes[0][campo] is not None else None
+            for campo in execucoes[0]
+        }
+        r = resultados[modo]
+        rss = f"{r['memoria_rss_mb']:.2f} MB" if r['memoria_rss_mb'] is not None else "n/d"
+        print(f"📊 {modo:<24} abertura {r['abertura_ms']:>7.2f} ms  Python {r['memoria_python_kb']:>8.1f} KB  "
+              f"RSS {rss:>9}  login→home {r['login_ate_home_ms']:>7.2f} ms  troca {r['troca_home_ms']:.3f} ms")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio.update({'latencia_ms': args.latencia_ms, 'resultados': resultados})
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
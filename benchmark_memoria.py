@@ -0,0 +1,114 @@
+import sys
+import os
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+class UserModelLegado:
+    """Forma anterior do UserModel (atributos em __dict__, data formatada na construção), só para comparação"""
+    
+    def __init__(self, login, senha, perfil, nome_completo, status="Ativo"):
+        self.login = login
+        self.senha = senha
+        self.perfil = perfil
+        self.nome_completo = nome_completo
+        self.status = status
+        self.data_cadastro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    def to_dict(self):
+        return {
+            'login': self.login,
+            'senha': self.senha,
+            'perfil': self.perfil,
+            'nome_completo': self.nome_completo,
+            'status': self.status,
+            'data_cadastro': self.data_cadastro
+        }
+    
+    @staticmethod
+    def from_dict(data):
+        user = UserModelLegado(data['login'], data['senha'], data['perfil'], data['nome_completo'], data.get('status', 'Ativo'))
+        user.data_cadastro = data.get('data_cadastro', '')
+        return user
+
+def cronometrar(funcao):
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+def medir_memoria(funcao):
+    """Bytes alocados (e mantidos) pela estrutura construída por funcao()"""
+    gc.collect()
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    resultado = funcao()
+    depois = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, depois - antes
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara memória e vazão de dicts, UserModel legado e User")
+    parser.add_argument('--registros', type=int, default=1000000)
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    
+    from models.user import User
+    from utils.benchmark import ambiente, gerar_usuarios, salvar
+    
+    n = args.registros
+    print(f"🚀 Gerando {n} usuários de origem...")
+    # Como chegam do Firestore: um dict por documento, com data já em texto
+    origem = list(gerar_usuarios(n))
+    tuplas = [tuple(User.from_dict(dados)) for dados in origem]
+    
+    formatos = [
+        ('dict', dict, dict),
+        ('UserModel legado', UserModelLegado.from_dict, UserModelLegado.to_dict),
+        ('User', User.from_dict, User.to_dict)
+    ]
+    
+    resultados = []
+    for nome, de_dict, para_dict in formatos:
+        registros, memoria = medir_memoria(lambda: [de_dict(dados) for dados in origem])
+        _, t_carga = cronometrar(lambda: [de_dict(dados) for dados in origem])
+        _, t_export = cronometrar(lambda: [para_dict(registro) for registro in registros])
+        
+        resultado = {
+            'formato': nome,
+            'registros': n,
+            'bytes_por_registro': round(memoria / n, 1),
+            'memoria_mb': round(memoria / 2 ** 20, 1),
+            'from_dict_por_segundo': round(n / t_carga),
+            'to_dict_por_segundo': round(n / t_export)
+        }
+        resultados.append(resultado)
+        registros = None  # libera antes de medir o próximo formato
+        
+        print(f"📊 {nome:<17} {resultado['bytes_por_registro']:>7.1f} B/registro  {resultado['memoria_mb']:>8.1f} MB  "
+              f"from_dict {resultado['from_dict_por_segundo']:>10}/s  to_dict {resultado['to_dict_por_segundo']:>10}/s")
+    
+    # Caminho sem dict: reconstrução direta a partir de tuplas
+    _, t_tuplas = cronometrar(lambda: [User.from_tuple(valores) for valores in tuplas])
+    _, t_novo = cronometrar(lambda: [User.novo(d['login'], d['senha'], d['perfil'], d['nome_completo']) for d in origem])
+    extra = {
+        'user_from_tuple_por_segundo': round(n / t_tuplas),
+        'user_novo_por_segundo': round(n / t_novo)
+    }
+    print(f"📊 User.from_tuple {extra['user_from_tuple_por_segundo']}/s  User.novo {extra['user_novo_por_segundo']}/s")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio['resultados'] = resultados
+        relatorio.update(extra)
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
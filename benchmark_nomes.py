@@ -0,0 +1,121 @@
+import sys
+import os
+import argparse
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+SILABAS = ('ma', 'ri', 'an', 'jo', 'se', 'lu', 'ca', 'ro', 'fe', 'li', 'pe', 'dro', 'na', 'ta', 'vi', 'to',
+           'gu', 'bri', 'el', 'da', 'ni', 'la', 'ra', 'fa', 'bi', 'mi', 'ch', 'é', 'ô', 'ã')
+SOBRENOMES = ('Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes',
+              'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques',
+              'Machado', 'Mendes', 'Freitas', 'Cardoso', 'Ramos', 'Gonçalves', 'Santana', 'Teixeira')
+
+def gerar_nomes(tamanho, rng):
+    """Nomes sintéticos: primeiro nome de 2 a 4 sílabas, partícula opcional e dois sobrenomes comuns"""
+    nomes = []
+    for _ in range(tamanho):
+        primeiro = ''.join(rng.choice(SILABAS) for _ in range(rng.randint(2, 4))).capitalize()
+        particula = rng.choice(('', '', 'da ', 'de ', 'dos '))
+        nomes.append(f"{primeiro} {particula}{rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}")
+    return nomes
+
+def variar(nome, rng):
+    """Variação que o cadastro exato deixaria passar: sem acento, caixa, espaços ou um erro de digitação"""
+    import unicodedata
+    
+    tipo = rng.randrange(4)
+    if tipo == 0:
+        return ''.join(c for c in unicodedata.normalize('NFKD', nome) if not unicodedata.combining(c)) + ' '
+    if tipo == 1:
+        return nome.upper()
+    if tipo == 2:
+        return nome.replace(' ', '  ', 1).lower()
+    
+    posicao = rng.randrange(1, len(nome) - 1)
+    return nome[:posicao] + nome[posicao + 1] + nome[posicao] + nome[posicao + 2:]
+
+def pares_todos(formas, limiar):
+    """Como seria sem índice: comparar todos os pares"""
+    from utils.name_index import _gramas
+    
+    conjuntos = [_gramas(f) for f in formas]
+    encontrados = 0
+    for i in range(len(conjuntos)):
+        for j in range(i + 1, len(conjuntos)):
+            comuns = len(conjuntos[i] & conjuntos[j])
+            if comuns and comuns / (len(conjuntos[i]) + len(conjuntos[j]) - comuns) >= limiar:
+                encontrados += 1
+    return encontrados
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o índice de nomes parecidos: carga, consulta no cadastro e relatório")
+    parser.add_argument('--registros', type=int, default=100000)
+    parser.add_argument('--consultas', type=int, default=2000)
+    parser.add_argument('--limiar', type=float, default=0.7)
+    parser.add_argument('--pares-amostra', type=int, default=3000, help="Tamanho da amostra comparada par a par")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    
+    from utils.benchmark import ambiente, resumir, salvar
+    from utils.name_index import IndiceNomes, forma_comparacao
+    
+    rng = random.Random(42)
+    print(f"🚀 Gerando {args.registros} nomes...")
+    nomes = gerar_nomes(args.registros, rng)
+    
+    inicio = time.perf_counter()
+    indice = IndiceNomes(nomes)
+    t_carga = time.perf_counter() - inicio
+    print(f"📥 Carga do índice: {t_carga:.2f} s ({len(indice)} nomes distintos)")
+    
+    # Consultas como no cadastro: variações de nomes existentes e nomes novos
+    consultas = [variar(nome, rng) for nome in rng.sample(nomes, args.consultas // 2)]
+    consultas += gerar_nomes(args.consultas - len(consultas), rng)
+    
+    latencias = []
+    achados = 0
+    for posicao, consulta in enumerate(consultas):
+        t0 = time.perf_counter()
+        parecidos = indice.semelhantes(consulta, args.limiar)
+        latencias.append(time.perf_counter() - t0)
+        if posicao < args.consultas // 2 and parecidos:
+            achados += 1
+    
+    consulta = resumir(latencias, sum(latencias))
+    print(f"🔎 Consulta: p50 {consulta['p50_ms']:.3f} ms  p99 {consulta['p99_ms']:.3f} ms  "
+          f"variações encontradas {achados}/{args.consultas // 2}")
+    
+    inicio = time.perf_counter()
+    grupos = indice.grupos(args.limiar)
+    t_grupos = time.perf_counter() - inicio
+    print(f"📊 Relatório (grupos): {t_grupos:.2f} s, {len(grupos)} grupos")
+    
+    amostra = [forma_comparacao(n) for n in nomes[:args.pares_amostra]]
+    inicio = time.perf_counter()
+    pares_todos(amostra, args.limiar)
+    t_pares = time.perf_counter() - inicio
+    estimado = t_pares * (args.registros / len(amostra)) ** 2
+    print(f"🐢 Todos os pares: {t_pares:.2f} s para {len(amostra)} nomes (~{estimado:.0f} s estimados para {args.registros})")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio.update({
+            'registros': args.registros,
+            'limiar': args.limiar,
+            'carga_s': round(t_carga, 3),
+            'consulta': consulta,
+            'variacoes_encontradas': achados,
+            'grupos_s': round(t_grupos, 3),
+            'grupos': len(grupos),
+            'todos_os_pares_estimado_s': round(estimado, 1)
+        })
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
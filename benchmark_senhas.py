@@ -0,0 +1,83 @@
+import sys
+import os
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def medir_vazao(executor, armazenado, quantidade):
+    """Conferências por segundo de quantidade senhas distribuídas no executor"""
+    from utils.passwords import conferir_senha
+    
+    inicio = time.perf_counter()
+    resultados = list(executor.map(conferir_senha, ['senha-benchmark'] * quantidade, [armazenado] * quantidade))
+    duracao = time.perf_counter() - inicio
+    
+    if not all(resultados):
+        raise RuntimeError("Conferência falhou durante o benchmark")
+    return quantidade / duracao
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o custo do hash de senhas e a vazão de conferências por núcleo")
+    parser.add_argument('--custos', default='', help="Custos (log2 de N) separados por vírgula; padrão: o calibrado")
+    parser.add_argument('--processos', default='', help="Tamanhos de pool separados por vírgula; padrão: 1..núcleos")
+    parser.add_argument('--duracao', type=float, default=3.0, help="Segundos aproximados por medição")
+    parser.add_argument('--orcamento-ms', type=float, help="Calibra para este orçamento em vez do configurado")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    
+    from utils import passwords
+    from utils.benchmark import ambiente, salvar
+    
+    nucleos = os.cpu_count() or 1
+    custo_calibrado, duracao_calibrada = passwords.calibrar(args.orcamento_ms)
+    print(f"🔐 Custo calibrado: 2^{custo_calibrado} ({duracao_calibrada * 1000:.1f} ms por hash, {nucleos} núcleos)")
+    
+    custos = [int(c) for c in args.custos.split(',') if c.strip()] or [custo_calibrado]
+    processos = [int(p) for p in args.processos.split(',') if p.strip()] or list(range(1, nucleos + 1))
+    
+    resultados = []
+    for custo in custos:
+        armazenado = passwords.gerar_hash('senha-benchmark', custo)
+        latencia = min(passwords.medir_hash(custo) for _ in range(3))
+        
+        for n in processos:
+            quantidade = max(n * 4, round(args.duracao / latencia * n))
+            
+            # Threads dividem o GIL com a GUI; processos não
+            for modo, criar in (
+                ('threads', lambda: ThreadPoolExecutor(max_workers=n)),
+                ('processos', lambda: ProcessPoolExecutor(n, mp_context=multiprocessing.get_context('spawn')))
+            ):
+                executor = criar()
+                try:
+                    # Sobe os workers antes de medir
+                    list(executor.map(passwords.conferir_senha, ['senha-benchmark'] * n, [armazenado] * n))
+                    vazao = medir_vazao(executor, armazenado, quantidade)
+                finally:
+                    executor.shutdown()
+                
+                resultado = {
+                    'custo': custo,
+                    'modo': modo,
+                    'workers': n,
+                    'latencia_ms': round(latencia * 1000, 2),
+                    'verificacoes_por_segundo': round(vazao, 1),
+                    'verificacoes_por_segundo_por_nucleo': round(vazao / min(n, nucleos), 1)
+                }
+                resultados.append(resultado)
+                print(f"📊 2^{custo} {modo:<9} x{n:<2} {resultado['verificacoes_por_segundo']:>8.1f}/s  "
+                      f"{resultado['verificacoes_por_segundo_por_nucleo']:>8.1f}/s por núcleo")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio.update({'nucleos': nucleos, 'custo_calibrado': custo_calibrado, 'resultados': resultados})
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import sys
+import os
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def gerar_documentos(tamanho):
+    """Documentos como chegam do listener: (id, dados) com 'atualizado_em' do servidor"""
+    from utils.benchmark import gerar_usuarios
+    
+    inicio = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    documentos = []
+    for i, dados in enumerate(gerar_usuarios(tamanho)):
+        dados['atualizado_em'] = inicio + timedelta(seconds=i)
+        documentos.append((f"id{i}", dados))
+    return documentos
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+def medir_consultas(manager, logins):
+    """Latências de user_exists (índices de login e nome, sem o hash de senha)"""
+    latencias = []
+    for login in logins:
+        nome = f"Usuario {login[len('usuario'):]}"
+        inicio = time.perf_counter()
+        manager.user_exists(login, nome)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede a abertura da réplica pelo snapshot em disco contra a carga completa")
+    parser.add_argument('--registros', type=int, default=1000000)
+    parser.add_argument('--consultas', type=int, default=2000)
+    parser.add_argument('--delta', type=int, default=100, help="Usuários alterados entre duas execuções")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    
+    import random
+    from models.database import DatabaseManager
+    from utils.benchmark import ambiente, resumir, salvar
+    
+    print(f"🚀 Gerando {args.registros} documentos...")
+    documentos = gerar_documentos(args.registros)
+    rng = random.Random(42)
+    logins = [f"usuario{rng.randrange(args.registros):07d}" for _ in range(args.consultas)]
+    caminho = os.path.join(tempfile.mkdtemp(), 'usuarios_snapshot.arrow')
+    
+    # Sem snapshot: a réplica só responde depois da collection inteira (aqui sem contar a rede)
+    completa = DatabaseManager()
+    _, t_completa = cronometrar(lambda: completa.load_documents(documentos))
+    print(f"🐢 Carga completa (load_documents): {t_completa:.0f} ms")
+    
+    _, t_gravar = cronometrar(lambda: completa.save_snapshot(caminho))
+    print(f"💾 Gravação do snapshot: {t_gravar:.0f} ms ({os.path.getsize(caminho) / 2**20:.1f} MB)")
+    
+    # Próxima execução: abre o arquivo e aplica só o delta
+    manager = DatabaseManager()
+    _, t_abrir = cronometrar(lambda: manager.open_snapshot(caminho))
+    _, t_primeira = cronometrar(lambda: manager.user_exists(logins[0], ''))
+    print(f"⚡ Abertura do snapshot: {t_abrir:.1f} ms, primeira consulta {t_primeira:.2f} ms")
+    
+    marca = manager.sync_mark()
+    delta = [
+        (doc_id, dict(dados, status='Bloqueado', atualizado_em=marca + timedelta(seconds=i + 1)))
+        for i, (doc_id, dados) in enumerate(rng.sample(documentos, min(args.delta, len(documentos))))
+    ]
+    _, t_delta = cronometrar(lambda: manager.apply_changes(delta, []))
+    print(f"🔄 Delta de {len(delta)} usuários: {t_delta:.1f} ms")
+    
+    latencias_snapshot = medir_consultas(manager, logins)
+    latencias_memoria = medir_consultas(completa, logins)
+    snapshot = resumir(latencias_snapshot, sum(latencias_snapshot))
+    memoria = resumir(latencias_memoria, sum(latencias_memoria))
+    print(f"🔎 user_exists pelo snapshot: p50 {snapshot['p50_ms']:.3f} ms  p99 {snapshot['p99_ms']:.3f} ms")
+    print(f"🔎 user_exists pelos dicts:   p50 {memoria['p50_ms']:.3f} ms  p99 {memoria['p99_ms']:.3f} ms")
+    
+    if args.saida:
+        relatorio = ambiente()
+        relatorio.update({
+            'registros': args.registros,
+            'carga_completa_ms': round(t_completa, 1),
+            'gravacao_ms': round(t_gravar, 1),
+            'abertura_ms': round(t_abrir, 2),
+            'primeira_consulta_ms': round(t_primeira, 3),
+            'delta': len(delta),
+            'delta_ms': round(t_delta, 2),
+            'consulta_snapshot': snapshot,
+            'consulta_memoria': memoria
+        })
+        salvar(args.saida, relatorio)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
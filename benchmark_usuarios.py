@@ -0,0 +1,114 @@
+import sys
+import os
+import argparse
+import json
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def montar_servico(tamanho, latencia, jitter, seed, usar_cache):
+    from utils.benchmark import popular_fake
+    from utils.fake_firestore import FakeFirestore
+    from services.storage_backends import FirestoreBackend
+    from services.user_service import UserService
+    
+    db = FakeFirestore(latencia=latencia, jitter=jitter, seed=seed)
+    popular_fake(db, tamanho)
+    
+    kwargs = {} if usar_cache else {'cache_size': 0}
+    return db, UserService(backend=FirestoreBackend(db=db), **kwargs)
+
+def executar(tamanho, args):
+    from utils.benchmark import PERFIS, SENHA_USUARIOS, medir
+    
+    rng = random.Random(args.seed)
+    db, service = montar_servico(tamanho, args.latencia_ms / 1000, args.jitter_ms / 1000, args.seed, not args.sem_cache)
+    
+    # Logins existentes sorteados, com 10% de senhas erradas
+    logins = []
+    for _ in range(args.iteracoes):
+        i = rng.randrange(tamanho)
+        senha = SENHA_USUARIOS if rng.random() >= 0.1 else "errada"
+        logins.append((f"usuario{i:07d}", senha))
+    
+    # Cadastros novos, mais 10% de logins repetidos para exercitar a recusa
+    cadastros = []
+    for n in range(args.iteracoes):
+        login = f"usuario{rng.randrange(tamanho):07d}" if rng.random() < 0.1 else f"novo{n:07d}"
+        cadastros.append(({
+            'login': login,
+            'senha': 'senha',
+            'perfil': PERFIS[n % len(PERFIS)],
+            'nome_completo': f"Novo {n:07d}"
+        },))
+    
+    operacoes = [
+        ('verificar_login', service.verificar_login, logins),
+        ('cadastrar_usuario', service.cadastrar_usuario, cadastros),
+        ('listar_usuarios', lambda: service.listar_usuarios(tamanho_pagina=args.tamanho_pagina),
+         [()] * args.iteracoes_listagem)
+    ]
+    
+    resultados = []
+    for nome, operacao, argumentos in operacoes:
+        rpcs_antes = db.rpcs
+        resultado = {'tamanho': tamanho, 'operacao': nome}
+        resultado.update(medir(operacao, argumentos))
+        resultado['rpcs_por_op'] = round((db.rpcs - rpcs_antes) / max(1, len(argumentos)), 2)
+        resultados.append(resultado)
+        
+        print(f"📊 {tamanho:>9} {nome:<18} p50 {resultado['p50_ms']:>9.3f} ms  "
+              f"p95 {resultado['p95_ms']:>9.3f} ms  p99 {resultado['p99_ms']:>9.3f} ms  "
+              f"{resultado['ops_por_segundo']:>10.1f} ops/s")
+    
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de login, cadastro e listagem contra um Firestore em memória")
+    parser.add_argument('--tamanhos', default='1000,100000,1000000', help="Tamanhos de roster separados por vírgula")
+    parser.add_argument('--iteracoes', type=int, default=1000, help="Chamadas de login e de cadastro por tamanho")
+    parser.add_argument('--iteracoes-listagem', type=int, default=3, help="Listagens completas por tamanho")
+    parser.add_argument('--tamanho-pagina', type=int, default=500, help="Tamanho de página da listagem")
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help="Latência injetada por RPC")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Variação aleatória somada à latência")
+    parser.add_argument('--sem-cache', action='store_true', help="Desliga o cache de usuários do UserService")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', default='benchmark_usuarios.json', help="Arquivo JSON com os resultados")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+    
+    from utils.benchmark import ambiente, comparar, salvar
+    
+    tamanhos = [int(t) for t in args.tamanhos.split(',') if t.strip()]
+    relatorio = ambiente()
+    relatorio['parametros'] = {
+        'tamanhos': tamanhos,
+        'iteracoes': args.iteracoes,
+        'iteracoes_listagem': args.iteracoes_listagem,
+        'tamanho_pagina': args.tamanho_pagina,
+        'latencia_ms': args.latencia_ms,
+        'jitter_ms': args.jitter_ms,
+        'cache': not args.sem_cache,
+        'seed': args.seed
+    }
+    relatorio['resultados'] = []
+    
+    print("🚀 Iniciando benchmark...")
+    for tamanho in tamanhos:
+        relatorio['resultados'].extend(executar(tamanho, args))
+    
+    salvar(args.saida, relatorio)
+    print(f"📄 Resultados gravados em {args.saida}")
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+        
+        print(f"🔍 Comparação com {args.comparar} (commit {anterior.get('commit')}):")
+        for (tamanho, operacao), campo, antes, depois, variacao in comparar(anterior, relatorio):
+            print(f"   {tamanho:>9} {operacao:<18} {campo:<16} {antes:>10} -> {depois:>10} ({variacao:+.1f}%)")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
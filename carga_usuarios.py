@@ -0,0 +1,251 @@
+import sys
+import os
+import argparse
+import itertools
+import random
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Cenários simulados e pesos padrão (proporção de cada um nas requisições)
+CENARIOS = ('login_ok', 'senha_errada', 'bloqueado', 'cadastro')
+MIX_PADRAO = 'login_ok=70,senha_errada=15,bloqueado=5,cadastro=10'
+
+def ler_mix(texto):
+    """Converte 'login_ok=70,cadastro=10' em {cenário: peso}"""
+    mix = {}
+    for parte in texto.split(','):
+        if not parte.strip():
+            continue
+        nome, _, peso = parte.partition('=')
+        nome = nome.strip()
+        if nome not in CENARIOS:
+            raise ValueError(f"Cenário desconhecido: {nome} (use {', '.join(CENARIOS)})")
+        mix[nome] = float(peso or 1)
+    
+    if not any(mix.values()):
+        raise ValueError("O mix precisa de ao menos um cenário com peso positivo")
+    return mix
+
+def montar_servico(args):
+    """UserService sobre o backend escolhido, já com o roster sintético quando aplicável"""
+    from services.storage_backends import FirestoreBackend, criar_backend
+    from services.user_service import UserService
+    from utils.benchmark import popular_backend, popular_fake
+    
+    if args.backend == 'fake':
+        from utils.fake_firestore import FakeFirestore
+        db = FakeFirestore(latencia=args.latencia_ms / 1000, jitter=args.jitter_ms / 1000, seed=args.seed)
+        popular_fake(db, args.roster)
+        backend = FirestoreBackend(db=db)
+    
+    elif args.backend == 'emulador':
+        # Firestore emulator (gcloud emulators firestore start): o cliente usa FIRESTORE_EMULATOR_HOST
+        from google.cloud import firestore
+        os.environ['FIRESTORE_EMULATOR_HOST'] = args.emulador
+        backend = FirestoreBackend(db=firestore.Client(project=args.projeto))
+        if args.popular:
+            popular_backend(backend, args.roster)
+    
+    else:
+        backend = criar_backend(args.backend)
+        if args.backend == 'memoria' or args.popular:
+            popular_backend(backend, args.roster)
+    
+    kwargs = {} if not args.sem_cache else {'cache_size': 0}
+    return UserService(backend=backend, **kwargs)
+
+class UsuarioSimulado(threading.Thread):
+    """Thread que repete requisições sorteadas do mix até o fim da rodada"""
+    
+    def __init__(self, indice, service, args, mix, fim, contador):
+        super().__init__(daemon=True)
+        self.indice = indice
+        self.service = service
+        self.args = args
+        self.cenarios = list(mix)
+        self.pesos = list(mix.values())
+        self.fim = fim
+        self.contador = contador
+        self.rng = random.Random(args.seed + indice)
+        self.registros = []  # (cenário, latência, sucesso, mensagem)
+        self._cadastros = itertools.count()
+    
+    def _sortear_usuario(self, bloqueado):
+        from utils.benchmark import usuario_bloqueado
+        
+        while True:
+            i = self.rng.randrange(self.args.roster)
+            if usuario_bloqueado(i) == bloqueado:
+                return i
+    
+    def _executar(self, cenario):
+        """Faz a requisição do cenário; retorna (sucesso, mensagem)"""
+        from utils.benchmark import SENHA_USUARIOS
+        
+        if cenario == 'cadastro':
+            n = next(self._cadastros)
+            success, message = self.service.cadastrar_usuario({
+                'login': f"carga{self.indice:04d}_{n:07d}",
+                'senha': 'senha',
+                'perfil': 'Analista',
+                'nome_completo': f"Carga {self.indice:04d} {n:07d}"
+            })
+            return success, message
+        
+        i = self._sortear_usuario(bloqueado=cenario == 'bloqueado')
+        senha = 'errada' if cenario == 'senha_errada' else SENHA_USUARIOS
+        user_info, error_message = self.service.verificar_login(f"usuario{i:07d}", senha)
+        
+        if cenario == 'login_ok':
+            return bool(user_info) and not error_message, error_message or "ok"
+        if cenario == 'senha_errada':
+            return error_message == "Senha incorreta", error_message
+        return error_message == "Usuário bloqueado ou inativo", error_message
+    
+    def run(self):
+        # Rampa: usuários entram espalhados para simular a chegada do turno
+        if self.args.rampa > 0:
+            time.sleep(self.args.rampa * self.indice / self.args.usuarios)
+        
+        while time.perf_counter() < self.fim:
+            if self.args.requisicoes and next(self.contador) >= self.args.requisicoes:
+                return
+            
+            cenario = self.rng.choices(self.cenarios, self.pesos)[0]
+            t0 = time.perf_counter()
+            try:
+                sucesso, mensagem = self._executar(cenario)
+            except Exception as e:
+                sucesso, mensagem = False, f"Exceção: {e}"
+            self.registros.append((cenario, time.perf_counter() - t0, sucesso, mensagem))
+            
+            if self.args.pausa_ms:
+                time.sleep(self.rng.expovariate(1000 / self.args.pausa_ms))
+
+def relatorio(registros, duracao):
+    from utils.benchmark import histograma, resumir
+    
+    por_cenario = {}
+    for cenario, latencia, sucesso, mensagem in registros:
+        por_cenario.setdefault(cenario, []).append((latencia, sucesso, mensagem))
+    
+    resultados = []
+    for cenario in ['total'] + [c for c in CENARIOS if c in por_cenario]:
+        itens = [(r[1], r[2], r[3]) for r in registros] if cenario == 'total' else por_cenario[cenario]
+        latencias = [latencia for latencia, _, _ in itens]
+        
+        erros = {}
+        for _, sucesso, mensagem in itens:
+            if not sucesso:
+                erros[mensagem] = erros.get(mensagem, 0) + 1
+        
+        resultado = {'cenario': cenario}
+        resultado.update(resumir(latencias, duracao))
+        resultado['erros'] = sum(erros.values())
+        resultado['taxa_erro'] = round(resultado['erros'] / len(itens), 4) if itens else 0.0
+        resultado['motivos_erro'] = erros
+        resultado['histograma_ms'] = [[limite, contagem] for limite, contagem in histograma(latencias) if contagem]
+        resultados.append(resultado)
+    
+    return resultados
+
+def imprimir(resultados):
+    from utils.benchmark import FAIXAS_MS
+    
+    for resultado in resultados:
+        print(f"📊 {resultado['cenario']:<13} {resultado['iteracoes']:>8} req  "
+              f"{resultado['ops_por_segundo']:>9.1f} req/s  erros {resultado['taxa_erro'] * 100:5.1f}%  "
+              f"p50 {resultado['p50_ms']:>8.3f} ms  p95 {resultado['p95_ms']:>8.3f} ms  p99 {resultado['p99_ms']:>8.3f} ms")
+        for motivo, quantidade in sorted(resultado['motivos_erro'].items(), key=lambda item: -item[1])[:5]:
+            print(f"   ❌ {quantidade:>6}x {motivo}")
+    
+    total = resultados[0]
+    if not total['histograma_ms']:
+        return
+    
+    print("⏱️ Histograma de latência (total):")
+    maior = max(contagem for _, contagem in total['histograma_ms'])
+    for limite, contagem in total['histograma_ms']:
+        faixa = f"<= {limite} ms" if limite is not None else f"> {FAIXAS_MS[-1]} ms"
+        print(f"   {faixa:>12} {contagem:>8} {'█' * max(1, round(40 * contagem / maior))}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga headless para login e cadastro de usuários")
+    parser.add_argument('--usuarios', type=int, default=20, help="Usuários simultâneos (threads)")
+    parser.add_argument('--duracao', type=float, default=10.0, help="Duração da rodada em segundos")
+    parser.add_argument('--requisicoes', type=int, default=0, help="Limite total de requisições (0 = só a duração)")
+    parser.add_argument('--mix', default=MIX_PADRAO, help=f"Pesos dos cenários (padrão: {MIX_PADRAO})")
+    parser.add_argument('--rampa', type=float, default=0.0, help="Segundos para todos os usuários entrarem")
+    parser.add_argument('--pausa-ms', type=float, default=0.0, help="Pausa média entre requisições de um usuário")
+    parser.add_argument('--backend', default='fake', choices=('fake', 'emulador', 'memoria', 'sqlite', 'firestore'),
+                        help="fake: Firestore em memória; emulador: Firestore emulator local")
+    parser.add_argument('--roster', type=int, default=10000, help="Usuários sintéticos pré-cadastrados")
+    parser.add_argument('--popular', action='store_true', help="Grava o roster sintético também em sqlite/emulador/firestore")
+    parser.add_argument('--latencia-ms', type=float, default=0.0, help="Latência por RPC do backend fake")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Variação aleatória da latência do fake")
+    parser.add_argument('--emulador', default='localhost:8080', help="Endereço do Firestore emulator")
+    parser.add_argument('--projeto', default='averbsys-carga', help="Projeto usado no emulador")
+    parser.add_argument('--sem-cache', action='store_true', help="Desliga o cache de usuários do UserService")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--metricas', action='store_true', help="Mostra as latências por etapa (utils.metrics)")
+    parser.add_argument('--saida', help="Arquivo JSON com os resultados")
+    args = parser.parse_args()
+    
+    try:
+        mix = ler_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.backend == 'firestore' and args.popular:
+        parser.error("--popular não é permitido contra o Firestore de produção")
+    
+    from utils.metrics import metricas
+    metricas.ativo = metricas.ativo or args.metricas
+    
+    print(f"🚀 Preparando backend '{args.backend}' com {args.roster} usuários...")
+    service = montar_servico(args)
+    
+    print(f"👥 {args.usuarios} usuários simultâneos por {args.duracao:.0f}s, mix {args.mix}")
+    inicio = time.perf_counter()
+    contador = itertools.count()
+    usuarios = [
+        UsuarioSimulado(indice, service, args, mix, inicio + args.duracao, contador)
+        for indice in range(args.usuarios)
+    ]
+    for usuario in usuarios:
+        usuario.start()
+    for usuario in usuarios:
+        usuario.join()
+    duracao = time.perf_counter() - inicio
+    
+    registros = [registro for usuario in usuarios for registro in usuario.registros]
+    resultados = relatorio(registros, duracao)
+    imprimir(resultados)
+    
+    if args.metricas:
+        print("🔬 Latência por etapa:")
+        for item in metricas.resumo():
+            rotulos = ','.join(f"{chave}={valor}" for chave, valor in item['rotulos'].items())
+            print(f"   {item['nome']:<32} {rotulos:<20} {item['total']:>8}x  "
+                  f"p50 {item['p50_ms']:>8.3f} ms  p99 {item['p99_ms']:>8.3f} ms")
+    
+    if args.saida:
+        from utils.benchmark import ambiente, salvar
+        
+        dados = ambiente()
+        dados['parametros'] = {chave: valor for chave, valor in vars(args).items() if chave != 'saida'}
+        dados['duracao_s'] = round(duracao, 3)
+        dados['cache'] = service.cache_stats()
+        dados['resultados'] = resultados
+        if metricas.ativo:
+            dados['etapas'] = metricas.resumo()
+        salvar(args.saida, dados)
+        print(f"📄 Resultados gravados em {args.saida}")
+    
+    total = resultados[0]
+    return 0 if total['erros'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
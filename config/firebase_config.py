@@ -27,6 +27,7 @@ class FirebaseManager:
                     print("✅ Firebase inicializado com sucesso!")
                 
                 self.db = firestore.client()
+                self.async_db = None
                 self._initialized = True
                 
             except Exception as e:
@@ -34,4 +35,11 @@ class FirebaseManager:
                 raise
 
     def get_db(self):
-        return self.db
\ No newline at end of file
+        return self.db
+    
+    def get_async_db(self):
+        """Cliente firestore.AsyncClient do mesmo app, criado no primeiro uso"""
+        if self.async_db is None:
+            from firebase_admin import firestore_async
+            self.async_db = firestore_async.client()
+        return self.async_db
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+
+# Configurações do sistema. Cada valor pode ser sobrescrito por variável de ambiente.
+
+def _env_int(nome, padrao):
+    try:
+        return int(os.environ.get(nome, padrao))
+    except ValueError:
+        return padrao
+
+def _env_float(nome, padrao):
+    try:
+        return float(os.environ.get(nome, padrao))
+    except ValueError:
+        return padrao
+
+def _env_bool(nome, padrao):
+    valor = os.environ.get(nome)
+    if valor is None:
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'sim', 'yes', 'on')
+
+# Cache de usuários do UserService
+CACHE_USUARIOS_TAMANHO = _env_int('AVERBSYS_CACHE_TAMANHO', 1024)
+CACHE_USUARIOS_TTL = _env_float('AVERBSYS_CACHE_TTL', 30.0)
+CACHE_USUARIOS_TTL_NEGATIVO = _env_float('AVERBSYS_CACHE_TTL_NEGATIVO', 5.0)
+
+# Pool de threads do APIWorker
+WORKER_MAX_THREADS = _env_int('AVERBSYS_WORKER_THREADS', 4)
+WORKER_MAX_PENDENTES = _env_int('AVERBSYS_WORKER_PENDENTES', 32)
+
+# Réplica local da collection 'usuarios' mantida por listener em tempo real
+USAR_REPLICA_LOCAL = _env_bool('AVERBSYS_REPLICA_LOCAL', False)
+
+# Inicialização: janela de login primeiro, Firebase e imports pesados depois
+INICIALIZACAO_LAZY = _env_bool('AVERBSYS_INICIALIZACAO_LAZY', True)
+MOSTRAR_TIMELINE = _env_bool('AVERBSYS_TIMELINE', False)
+
+# Réplica SQLite em disco para autenticação com a rede degradada
+USAR_REPLICA_SQLITE = _env_bool('AVERBSYS_REPLICA_SQLITE', False)
+REPLICA_SQLITE_CAMINHO = os.environ.get('AVERBSYS_REPLICA_SQLITE_CAMINHO', 'usuarios_replica.db')
+
+# Login e cadastro pelo cliente async do Firestore no loop do Qt (requer qasync)
+USAR_ASYNC = _env_bool('AVERBSYS_ASYNC', False)
+
+# Métricas de latência: arquivo (.prom ou .json) e/ou endpoint /metrics local
+METRICAS_ARQUIVO = os.environ.get('AVERBSYS_METRICAS_ARQUIVO', '')
+METRICAS_PORTA = _env_int('AVERBSYS_METRICAS_PORTA', 0)
+METRICAS_INTERVALO = _env_float('AVERBSYS_METRICAS_INTERVALO', 15.0)
+METRICAS_ATIVAS = _env_bool('AVERBSYS_METRICAS', bool(METRICAS_ARQUIVO or METRICAS_PORTA))
+
+# Limites de login (fichas por segundo e rajada; taxa 0 desliga o limite)
+LOGIN_LIMITE_GLOBAL_TAXA = _env_float('AVERBSYS_LOGIN_TAXA_GLOBAL', 50.0)
+LOGIN_LIMITE_GLOBAL_RAJADA = _env_int('AVERBSYS_LOGIN_RAJADA_GLOBAL', 100)
+LOGIN_LIMITE_USUARIO_TAXA = _env_float('AVERBSYS_LOGIN_TAXA_USUARIO', 0.2)
+LOGIN_LIMITE_USUARIO_RAJADA = _env_int('AVERBSYS_LOGIN_RAJADA_USUARIO', 5)
+LOGIN_FALHA_TTL = _env_float('AVERBSYS_LOGIN_FALHA_TTL', 30.0)
+LOGIN_ESPERA_MAXIMA = _env_float('AVERBSYS_LOGIN_ESPERA_MAXIMA', 5.0)
+
+# Armazenamento de usuários: firestore, sqlite ou memoria
+BACKEND_USUARIOS = os.environ.get('AVERBSYS_BACKEND', 'firestore')
+BACKEND_SQLITE_CAMINHO = os.environ.get('AVERBSYS_BACKEND_SQLITE_CAMINHO', 'usuarios.db')
+
+# Hash de senhas (scrypt): custo = log2 de N; 0 calibra pelo orçamento de latência desta máquina
+SENHA_CUSTO = _env_int('AVERBSYS_SENHA_CUSTO', 0)
+SENHA_ORCAMENTO_MS = _env_float('AVERBSYS_SENHA_ORCAMENTO_MS', 100.0)
+SENHA_CALIBRACAO_ARQUIVO = os.environ.get('AVERBSYS_SENHA_CALIBRACAO', 'senha_calibracao.json')
+SENHA_PROCESSOS = _env_int('AVERBSYS_SENHA_PROCESSOS', min(4, os.cpu_count() or 1))
+SENHA_REHASH_NO_LOGIN = _env_bool('AVERBSYS_SENHA_REHASH', True)
+
+# Estilos: folha única no QApplication (True) ou setStyleSheet por janela (False)
+ESTILOS_GLOBAIS = _env_bool('AVERBSYS_ESTILOS_GLOBAIS', True)
+
+# Janelas de home e cadastro criadas na primeira exibição; home pré-montada durante o login
+JANELAS_SOB_DEMANDA = _env_bool('AVERBSYS_JANELAS_SOB_DEMANDA', True)
+PREAQUECER_JANELAS = _env_bool('AVERBSYS_PREAQUECER_JANELAS', True)
+
+# Sessão salva após o login (opcional): reabre a home direto enquanto o token assinado for válido.
+# A chave de assinatura fica na pasta de configuração do usuário, separada do token
+# Sem resposta do backend, a confirmação da sessão é repetida a cada SESSAO_REVALIDAR_INTERVALO s
+SESSAO_ATIVA = _env_bool('AVERBSYS_SESSAO', False)
+SESSAO_ARQUIVO = os.environ.get('AVERBSYS_SESSAO_ARQUIVO', 'sessao.token')
+SESSAO_CHAVE_ARQUIVO = os.environ.get('AVERBSYS_SESSAO_CHAVE', os.path.join(
+    os.environ.get('APPDATA') or os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config'),
+    'averbsys', 'sessao.chave'
+))
+SESSAO_VALIDADE_HORAS = _env_float('AVERBSYS_SESSAO_VALIDADE_HORAS', 12.0)
+SESSAO_REVALIDAR_INTERVALO = _env_float('AVERBSYS_SESSAO_REVALIDAR_INTERVALO', 30.0)
+
+# Aviso de nome parecido no cadastro: similaridade mínima dos n-gramas (acima de 1 desliga)
+NOMES_LIMIAR_SEMELHANCA = _env_float('AVERBSYS_NOMES_LIMIAR', 0.7)
+
+# Snapshot colunar (Arrow) da réplica em memória: abertura imediata e sincronização só do delta.
+# Com a última carga completa mais antiga que a validade, o snapshot ainda abre, mas a sincronização volta a ser completa
+SNAPSHOT_ATIVO = _env_bool('AVERBSYS_SNAPSHOT', True)
+SNAPSHOT_CAMINHO = os.environ.get('AVERBSYS_SNAPSHOT_CAMINHO', 'usuarios_snapshot.arrow')
+SNAPSHOT_VALIDADE_HORAS = _env_float('AVERBSYS_SNAPSHOT_VALIDADE_HORAS', 24.0)
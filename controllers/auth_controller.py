@@ -1,8 +1,10 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+import time
+from config import settings
+from utils.metrics import metricas
 from views.login_window import LoginWindow
-from views.home_window import HomeWindow
-from views.register_window import RegisterWindow
 from models.database import DatabaseManager
+from services.session_store import SessaoLocal
 from workers.api_worker import APIWorker
 
 class AuthController(QObject):
@@ -11,28 +13,45 @@ class AuthController(QObject):
     register_success = pyqtSignal()
     register_failed = pyqtSignal(str)
     
-    def __init__(self):
+    def __init__(self, login_window=None, backend=None):
         super().__init__()
         self.db_manager = DatabaseManager()
-        self.api_worker = APIWorker()
+        if settings.USAR_ASYNC:
+            from workers.async_worker import AsyncAPIWorker
+            self.api_worker = AsyncAPIWorker(backend=backend)
+        else:
+            self.api_worker = APIWorker(backend=backend)
+        self.api_worker.set_replica(self.db_manager)
+        self._login_inicio = None
+        self._cadastro_inicio = None
+        self.sessao = SessaoLocal()
         
         # Conectar sinais do worker
         self.api_worker.data_loaded.connect(self.on_data_loaded)
         self.api_worker.error_occurred.connect(self.on_api_error)
         self.api_worker.login_verified.connect(self.on_login_verified)
         self.api_worker.user_registered.connect(self.on_user_registered)
+        self.api_worker.register_confirmation.connect(self.on_register_confirmation)
+        self.api_worker.replica_loaded.connect(self.on_replica_loaded)
+        self.api_worker.replica_changed.connect(self.on_replica_changed)
+        self.api_worker.login_revoked.connect(self.on_login_revoked)
+        self.api_worker.login_throttled.connect(self.on_login_throttled)
         
-        # Inicializar views
-        self.login_window = LoginWindow()
-        self.home_window = HomeWindow()
-        self.register_window = RegisterWindow()
+        # Inicializar views: login já; home e cadastro na primeira exibição
+        self.login_window = login_window or LoginWindow()
+        self._home_window = None
+        self._register_window = None
         
         # Conectar sinais das views
         self.login_window.login_attempt.connect(self.handle_login)
         self.login_window.register_request.connect(self.show_register)
-        self.home_window.logout_request.connect(self.show_login)
-        self.register_window.register_attempt.connect(self.handle_register)
-        self.register_window.back_to_login.connect(self.show_login)
+        
+        # Janela fechada: requisições dela não têm mais quem as receba
+        self.login_window.closed.connect(lambda: self.api_worker.cancel_pending('login'))
+        
+        if not settings.JANELAS_SOB_DEMANDA:
+            # Comportamento anterior: todas as janelas criadas na abertura
+            self._criar_janelas()
         
         # Conectar próprios sinais
         self.login_success.connect(self.on_login_success)
@@ -40,39 +59,127 @@ class AuthController(QObject):
         self.register_success.connect(self.on_register_success)
         self.register_failed.connect(self.on_register_failed)
         
-        # Carregar dados iniciais
+        # Firebase inicializa em segundo plano; dados iniciais em seguida
+        self.api_worker.warm_up()
         self.api_worker.load_data()
     
+    @property
+    def home_window(self):
+        """HomeWindow criada no primeiro uso e reaproveitada depois"""
+        if self._home_window is None:
+            from views.home_window import HomeWindow
+            
+            with metricas.span('janela.criar', janela='home'):
+                self._home_window = HomeWindow()
+            self._home_window.logout_request.connect(self.logout)
+        return self._home_window
+    
+    @property
+    def register_window(self):
+        """RegisterWindow criada no primeiro uso; a maioria das sessões nunca abre o cadastro"""
+        if self._register_window is None:
+            from views.register_window import RegisterWindow
+            
+            with metricas.span('janela.criar', janela='register'):
+                self._register_window = RegisterWindow()
+            self._register_window.register_attempt.connect(self.handle_register)
+            self._register_window.back_to_login.connect(self.show_login)
+            self._register_window.closed.connect(lambda: self.api_worker.cancel_pending('register'))
+        return self._register_window
+    
+    def _criar_janelas(self):
+        """Cria e conecta home e cadastro agora, em vez de na primeira exibição; retorna as duas"""
+        home = self.home_window
+        cadastro = self.register_window
+        return home, cadastro
+    
+    @staticmethod
+    def _visivel(janela):
+        """Verdadeiro se a janela já foi criada e está aberta"""
+        return janela is not None and janela.isVisible()
+    
+    def _preaquecer_home(self):
+        """Monta a home e aplica o polish enquanto o login está em andamento"""
+        if self._home_window is None:
+            janela = self.home_window
+            janela.ensurePolished()
+            janela.layout().activate()
+            # Janela nativa criada agora; o show() do login bem-sucedido só a exibe
+            janela.winId()
+    
+    def iniciar(self):
+        """Abre a home direto se houver sessão salva válida; senão, a tela de login"""
+        perfil = self.sessao.carregar() if settings.SESSAO_ATIVA else None
+        if perfil is None:
+            self.show_login()
+            return
+        
+        self._abrir_home(perfil)
+        # Bloqueio ou exclusão desde o último login derrubam a sessão assim que confirmados
+        self.api_worker.revalidate_session(perfil)
+    
+    def logout(self):
+        self.api_worker.stop_revalidation()
+        self.sessao.encerrar()
+        self.show_login()
+    
     def show_login(self):
-        self.home_window.hide()
-        self.register_window.hide()
-        self.login_window.show()
-        self.login_window.set_loading(False)
+        # Troca de janela inclui o polish da folha de estilos no show()
+        with metricas.span('janela.troca', destino='login'):
+            for janela in (self._home_window, self._register_window):
+                if janela is not None:
+                    janela.hide()
+            self.login_window.show()
+            self.login_window.set_loading(False)
     
     def show_register(self):
-        self.login_window.hide()
-        self.register_window.show()
-        self.register_window.set_loading(False)
+        with metricas.span('janela.troca', destino='register'):
+            self.login_window.hide()
+            self.register_window.show()
+            self.register_window.set_loading(False)
+        
+        # Índice do aviso de nome parecido pronto antes do primeiro cadastro
+        self.api_worker.prepare_similar_names()
     
     def handle_login(self, username, password):
+        self._login_inicio = time.perf_counter()
         self.api_worker.verify_login(username, password)
+        
+        # Próxima tela provável: montada na primeira folga do event loop, durante a RPC
+        if settings.PREAQUECER_JANELAS and self._home_window is None:
+            QTimer.singleShot(0, self._preaquecer_home)
     
     def handle_register(self, user_data):
+        self._cadastro_inicio = time.perf_counter()
         self.api_worker.register_user(user_data)
     
     def on_data_loaded(self, data):
         self.db_manager.set_data(data)
         print("Dados carregados com sucesso!")
     
+    def on_replica_loaded(self, documents):
+        self.db_manager.load_documents(documents)
+        print(f"Réplica local carregada com {len(documents)} usuários")
+        self.api_worker.save_snapshot()
+    
+    def on_replica_changed(self, upserts, removed_ids):
+        self.db_manager.apply_changes(upserts, removed_ids)
+    
     def on_api_error(self, error_message):
         print(f"API Error: {error_message}")
         # Mostrar erro na janela apropriada
         if self.login_window.isVisible():
             self.login_window.show_error(f"Erro: {error_message}")
-        elif self.register_window.isVisible():
+        elif self._visivel(self._register_window):
             self.register_window.show_error(f"Erro: {error_message}")
     
     def on_login_verified(self, user_data, error_message):
+        # Do clique em "Entrar" até a resposta chegar à GUI
+        if self._login_inicio is not None:
+            resultado = 'ok' if user_data and not error_message else 'erro'
+            metricas.registrar('auth.login_total', time.perf_counter() - self._login_inicio, resultado=resultado)
+            self._login_inicio = None
+        
         if user_data and not error_message:  # Sucesso: user_data preenchido e error_message vazio
             self.login_success.emit(user_data)
         elif error_message:  # Erro: error_message preenchido
@@ -81,16 +188,49 @@ class AuthController(QObject):
             self.login_failed.emit("Erro desconhecido no login")
     
     def on_user_registered(self, success, message):
+        if self._cadastro_inicio is not None:
+            resultado = 'ok' if success else 'erro'
+            metricas.registrar('auth.cadastro_total', time.perf_counter() - self._cadastro_inicio, resultado=resultado)
+            self._cadastro_inicio = None
+        
         if success:
             self.register_success.emit()
         else:
             self.register_failed.emit(message)
     
+    def on_register_confirmation(self, user_data, aviso):
+        # Nome parecido com um já cadastrado: nada foi gravado até o operador confirmar
+        if self._visivel(self._register_window) and self.register_window.confirm_similar(aviso):
+            self._cadastro_inicio = time.perf_counter()
+            self.api_worker.register_user(user_data, confirmado=True)
+            return
+        
+        self._cadastro_inicio = None
+        if self._register_window is not None:
+            self.register_window.set_loading(False)
+    
     def on_login_success(self, user_data):
+        if settings.SESSAO_ATIVA:
+            self.sessao.salvar(user_data)
+        self._abrir_home(user_data)
+    
+    def _abrir_home(self, user_data):
         self.home_window.set_user_data(user_data)
-        self.login_window.hide()
-        self.login_window.set_loading(False)
-        self.home_window.show()
+        with metricas.span('janela.troca', destino='home'):
+            self.login_window.hide()
+            self.login_window.set_loading(False)
+            self.home_window.show()
+    
+    def on_login_revoked(self, error_message):
+        # Réplica local ou sessão salva aceitou, mas o backend recusou: encerra a sessão
+        self.api_worker.stop_revalidation()
+        self.sessao.encerrar()
+        if self._visivel(self._home_window):
+            self.show_login()
+            self.login_window.show_error(error_message)
+    
+    def on_login_throttled(self, espera):
+        self.login_window.show_waiting(espera)
     
     def on_login_failed(self, error_message):
         self.login_window.show_error(error_message)
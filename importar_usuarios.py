@@ -0,0 +1,56 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação em massa de usuários para o Firebase")
+    parser.add_argument('arquivo', nargs='?', help="Arquivo CSV ou XLSX com cabeçalho (LOGIN, SENHA, PERFIL, NOME COMPLETO, STATUS)")
+    parser.add_argument('--planilha', help="ID da planilha do Google Sheets")
+    parser.add_argument('--range', default='Usuarios!A:E', help="Range da planilha (padrão: Usuarios!A:E)")
+    parser.add_argument('--falhas', help="Arquivo CSV para gravar as linhas recusadas")
+    args = parser.parse_args()
+    
+    if not args.arquivo and not args.planilha:
+        parser.error("Informe um arquivo ou --planilha")
+    
+    from services.user_service import UserService
+    from services.bulk_import import ImportadorUsuarios
+    
+    def on_progresso(resultado):
+        print(f"⏳ {resultado.total} linhas lidas, {resultado.importados} importadas, {len(resultado.falhas)} falhas")
+    
+    importador = ImportadorUsuarios(UserService(), progresso=on_progresso)
+    
+    if args.planilha:
+        from utils.google_sheets import GoogleSheetsAPI
+        linhas = importador.ler_planilha(GoogleSheetsAPI(args.planilha), args.range)
+    else:
+        linhas = importador.ler_arquivo(args.arquivo)
+    
+    print("🚀 Iniciando importação...")
+    try:
+        resultado = importador.importar(linhas)
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ {resultado.importados} de {resultado.total} usuários importados")
+    
+    for linha, login, motivo in resultado.falhas[:20]:
+        print(f"❌ Linha {linha} ({login}): {motivo}")
+    if len(resultado.falhas) > 20:
+        print(f"... e mais {len(resultado.falhas) - 20} falhas")
+    
+    if args.falhas and resultado.falhas:
+        import csv
+        with open(args.falhas, 'w', newline='', encoding='utf-8') as arquivo:
+            writer = csv.writer(arquivo)
+            writer.writerow(['linha', 'login', 'motivo'])
+            writer.writerows(resultado.falhas)
+        print(f"📄 Falhas gravadas em {args.falhas}")
+    
+    return 0 if not resultado.falhas else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
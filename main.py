@@ -1,9 +1,11 @@
+from utils import timeline
+import multiprocessing
 import sys
 import os
 import traceback
 from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import Qt
-from controllers.auth_controller import AuthController
+from PyQt5.QtCore import Qt, QTimer
+from config import settings
 
 def excepthook(exctype, value, tb):
     """Handler global de exceções"""
@@ -19,6 +21,38 @@ def excepthook(exctype, value, tb):
     msg.setDetailedText(error_msg)
     msg.exec_()
 
+def start_lazy(app):
+    """Pinta a janela de login antes de montar o controller e o Firebase"""
+    from views.login_window import LoginWindow
+    
+    from services.session_store import SessaoLocal
+    
+    login_window = LoginWindow()
+    
+    # Com sessão salva a primeira janela será a home: o login não chega a ser pintado
+    if not (settings.SESSAO_ATIVA and SessaoLocal().existe()):
+        login_window.show()
+        app.processEvents()
+        tempo = timeline.marcar('janela_login_visivel')
+        print(f"⏱️ Janela de login visível em {tempo:.0f} ms")
+    
+    def montar_controller():
+        from controllers.auth_controller import AuthController
+        
+        auth_controller = AuthController(login_window=login_window)
+        auth_controller.iniciar()
+        app.aboutToQuit.connect(auth_controller.api_worker.stop_sync)
+        app.aboutToQuit.connect(auth_controller.api_worker.cancel_pending)
+        
+        # Manter referência viva enquanto o app roda
+        app.auth_controller = auth_controller
+        timeline.marcar('controller_pronto')
+        
+        if settings.MOSTRAR_TIMELINE:
+            timeline.imprimir()
+    
+    QTimer.singleShot(0, montar_controller)
+
 def main():
     # Configurar handler global de exceções
     sys.excepthook = excepthook
@@ -30,15 +64,39 @@ def main():
     app = QApplication(sys.argv)
     app.setApplicationName("ABERBSYS")
     
+    loop = None
+    if settings.USAR_ASYNC:
+        from utils import qt_asyncio
+        loop = qt_asyncio.criar_loop(app)
+    
+    timeline.marcar('qapplication_criada')
+    
+    from utils.metrics import iniciar_exportacao
+    from utils.passwords import verificador
+    app.aboutToQuit.connect(iniciar_exportacao())
+    app.aboutToQuit.connect(verificador.encerrar)
+    
     try:
-        # Criar controller principal
-        auth_controller = AuthController()
-        auth_controller.show_login()
+        if settings.INICIALIZACAO_LAZY:
+            start_lazy(app)
+        else:
+            # Criar controller principal
+            from controllers.auth_controller import AuthController
+            auth_controller = AuthController()
+            auth_controller.iniciar()
+            app.aboutToQuit.connect(auth_controller.api_worker.stop_sync)
+            app.aboutToQuit.connect(auth_controller.api_worker.cancel_pending)
+            app.auth_controller = auth_controller
+            timeline.marcar('janela_login_visivel')
         
+        if loop is not None:
+            sys.exit(qt_asyncio.executar(app, loop))
         sys.exit(app.exec_())
     except Exception as e:
         print(f"Error starting application: {e}")
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Executável congelado: processos do pool de senhas (spawn) partem daqui
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
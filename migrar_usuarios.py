@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Migra usuários com IDs aleatórios para os IDs determinísticos e reserva seus nomes"
+    )
+    parser.add_argument('--verificar', action='store_true', help="Só informa se a migração já foi feita")
+    args = parser.parse_args()
+    
+    from services.storage_backends import FirestoreBackend
+    
+    backend = FirestoreBackend()
+    if backend.ids_migrados():
+        print("✅ Migração já concluída: o cadastro usa só a checagem atômica por ID")
+        return 0
+    
+    if args.verificar:
+        print("⚠️ Migração pendente: o cadastro ainda consulta login e nome por campo")
+        return 1
+    
+    print("🚀 Migrando usuários...")
+    migrados, conflitos = backend.migrar_ids_deterministicos()
+    print(f"✅ {migrados} usuários movidos para o ID determinístico; nomes reservados")
+    
+    if conflitos:
+        # Nada foi sobrescrito nem apagado: os repetidos ficam com o ID antigo até a correção
+        print(f"⚠️ {len(conflitos)} conflitos não migrados; corrija e rode de novo:")
+        for campo, valor, ids in conflitos:
+            print(f"   {campo} '{valor}' repetido nos documentos {', '.join(ids)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,366 @@
-import pandas as pd
+import threading
+import time
+from datetime import datetime, timezone
 from PyQt5.QtCore import QObject
+from config import settings
+from utils.name_index import IndiceNomes
+from utils.passwords import verificador
+
+# pandas é importado sob demanda para não pesar na abertura da janela de login
+
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+# Ponto de partida do delta para coleções sem 'atualizado_em' em nenhum documento
+MARCA_INICIAL = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Campos aceitos nas contagens do roster
+CAMPOS_ANALISE = ('perfil', 'status', 'dia', 'mes')
+
+# Campo do Firestore -> coluna do DataFrame
+COLUNAS = {
+    'login': 'LOGIN',
+    'senha': 'SENHA', 
+    'perfil': 'PERFIL',
+    'status': 'STATUS',  # Alterado para STATUS
+    'nome_completo': 'NOME COMPLETO',
+    'data_cadastro': 'DATA CADASTRO',
+    'id': 'ID'
+}
 
 class DatabaseManager(QObject):
     def __init__(self):
         super().__init__()
         self.data = None
-        self.columns = {
-            'login': 'LOGIN',
-            'senha': 'SENHA', 
-            'perfil': 'PERFIL',
-            'status': 'STATUS',  # Alterado para STATUS
-            'nome_completo': 'NOME COMPLETO',
-            'data_cadastro': 'DATA CADASTRO'
-        }
+        self.columns = dict(COLUNAS)
+        
+        # Índices em memória: login normalizado -> registros, contagem de nomes e id do documento
+        self._login_index = {}
+        self._nome_index = {}
+        self._id_index = {}
+        
+        # Índice de nomes parecidos, montado na primeira consulta e depois mantido a cada alteração
+        self._semelhantes = None
+        
+        # Consultas chegam das threads do APIWorker enquanto a réplica é atualizada na GUI
+        self._lock = threading.RLock()
+        
+        # Agregados do roster por versão dos dados: toda alteração troca o dict inteiro,
+        # e cálculos em andamento sobre a versão anterior gravam no dict descartado
+        self._analises = {}
+        
+        # Roster aberto de um snapshot em disco: login e nome são consultados nos índices
+        # do arquivo, e os ids alterados ou removidos depois da abertura ficam em _sombreados
+        self._snapshot = None
+        self._sombreados = set()
+        
+        # Maior 'atualizado_em' aplicado (None: dados sem ponto de partida para o delta),
+        # instante da última carga completa (deltas não a renovam) e versão dos dados já gravada em snapshot
+        self._marca = None
+        self._carregado_em = None
+        self._versao_gravada = None
+        self._gravacao_lock = threading.Lock()
     
-    def set_data(self, data):
+    def _reiniciar(self, data):
         self.data = data
+        self._analises = {}
+        self._login_index = {}
+        self._nome_index = {}
+        self._id_index = {}
+        self._semelhantes = None
+        self._snapshot = None
+        self._sombreados = set()
+        self._marca = None
+        self._carregado_em = None
+    
+    def set_data(self, data):
+        with self._lock:
+            self._reiniciar(data)
+            self._indexar(data)
+    
+    def is_loaded(self):
+        return self.data is not None
+    
+    def _documentos_para_frame(self, documentos):
+        """Converte pares (id, dados do Firestore) para o formato de colunas do DataFrame"""
+        import pandas as pd
+        
+        campos = [campo for campo in self.columns if campo != 'id']
+        linhas = []
+        
+        for doc_id, dados in documentos:
+            linha = {self.columns[campo]: dados.get(campo) for campo in campos}
+            linha[self.columns['id']] = doc_id
+            linhas.append(linha)
+        
+        return pd.DataFrame(linhas, columns=list(self.columns.values()))
+    
+    @staticmethod
+    def _maior_marca(documentos, atual):
+        """Maior 'atualizado_em' entre a marca atual e os documentos"""
+        for _, dados in documentos:
+            valor = dados.get('atualizado_em')
+            if isinstance(valor, datetime) and (atual is None or valor > atual):
+                atual = valor
+        return atual
+    
+    def load_documents(self, documentos):
+        """Carrega a réplica completa a partir de documentos da collection 'usuarios'"""
+        data = self._documentos_para_frame(documentos)
+        with self._lock:
+            self.set_data(data)
+            self._marca = self._maior_marca(documentos, MARCA_INICIAL)
+            self._carregado_em = time.time()
+    
+    def apply_changes(self, upserts, removed_ids):
+        """Aplica um delta da collection: upserts [(id, dados)] e ids removidos"""
+        import pandas as pd
+        
+        if self.data is None:
+            self.load_documents(upserts)
+            return
+        
+        with self._lock:
+            self._analises = {}
+            afetados = set(removed_ids) | {doc_id for doc_id, _ in upserts}
+            do_snapshot = [doc_id for doc_id in afetados if doc_id not in self._id_index]
+            
+            for doc_id in afetados:
+                self._desindexar(doc_id)
+            
+            id_column = self.columns['id']
+            if afetados and id_column in self.data.columns:
+                saindo = self.data[id_column].isin(afetados)
+                if self._snapshot is not None and do_snapshot:
+                    self._sombrear(saindo & self.data[id_column].isin(do_snapshot))
+                self.data = self.data[~saindo]
+            
+            if self._marca is not None:
+                self._marca = self._maior_marca(upserts, self._marca)
+            
+            if upserts:
+                novos = self._documentos_para_frame(upserts)
+                self.data = pd.concat([self.data, novos], ignore_index=True)
+                self._indexar(novos)
+    
+    def open_snapshot(self, caminho=None):
+        """Abre o último roster gravado em disco, se ainda não há dados; retorna True se abriu"""
+        from services.roster_snapshot import SnapshotRoster
+        
+        try:
+            snapshot = SnapshotRoster.abrir(caminho or settings.SNAPSHOT_CAMINHO)
+            if snapshot is None:
+                return False
+            data = snapshot.dataframe()
+        except Exception as e:
+            print(f"Snapshot do roster ignorado: {e}")
+            return False
+        
+        with self._lock:
+            if self.data is not None:
+                return False
+            
+            # Sem _indexar: login e nome vão aos índices gravados no arquivo
+            self._reiniciar(data)
+            self._snapshot = snapshot
+            self._versao_gravada = self._analises
+            
+            # Última carga completa antiga: o snapshot abre igual, mas a sincronização volta
+            # a ser completa (exclusões de documentos não aparecem no delta)
+            if time.time() - snapshot.carregado_em <= settings.SNAPSHOT_VALIDADE_HORAS * 3600:
+                self._marca = snapshot.marca
+                self._carregado_em = snapshot.carregado_em
+        return True
+    
+    def sync_mark(self):
+        """Instante a partir do qual um delta do Firestore completa os dados; None exige carga completa"""
+        with self._lock:
+            return self._marca
+    
+    def save_snapshot(self, caminho=None):
+        """Grava o roster para a próxima abertura; retorna True se o arquivo ficou em dia"""
+        from services.roster_snapshot import SnapshotRoster
+        
+        # Uma gravação por vez; a mesma versão dos dados não é gravada de novo
+        with self._gravacao_lock:
+            with self._lock:
+                if self.data is None or self._marca is None:
+                    return False
+                if self._versao_gravada is self._analises:
+                    return True
+                versao, data, marca, carregado_em = self._analises, self.data, self._marca, self._carregado_em
+            
+            try:
+                SnapshotRoster.gravar(
+                    caminho or settings.SNAPSHOT_CAMINHO, data,
+                    self.columns['login'], self.columns['nome_completo'], marca, carregado_em
+                )
+            except Exception as e:
+                print(f"Não foi possível gravar o snapshot do roster: {e}")
+                return False
+            
+            with self._lock:
+                self._versao_gravada = versao
+            return True
+    
+    def append_data(self, rows):
+        """Acrescenta linhas aos dados atualizando os índices incrementalmente"""
+        if rows is None or len(rows) == 0:
+            return
+        
+        if self.data is None:
+            self.set_data(rows)
+            return
+        
+        import pandas as pd
+        
+        with self._lock:
+            self.data = pd.concat([self.data, rows], ignore_index=True)
+            self._analises = {}
+            self._indexar(rows)
+    
+    @staticmethod
+    def _normalizar(valor):
+        return str(valor).strip()
+    
+    def _status_column(self, data):
+        return 'STATUS' if 'STATUS' in data.columns else 'Status'
+    
+    def _indexar(self, data):
+        """Indexa as linhas informadas por login e nome completo"""
+        if data is None:
+            return
+        
+        status_column = self._status_column(data)
+        colunas = [
+            self.columns['login'],
+            self.columns['senha'],
+            self.columns['perfil'],
+            self.columns['nome_completo'],
+            status_column,
+            self.columns['id']
+        ]
+        
+        # Colunas ausentes não impedem a indexação das demais
+        valores = [
+            data[coluna] if coluna in data.columns else [None] * len(data)
+            for coluna in colunas
+        ]
+        
+        for login, senha, perfil, nome, status, doc_id in zip(*valores):
+            registro = {
+                'login': login,
+                'senha': senha,
+                'perfil': perfil,
+                'nome_completo': nome,
+                'status': status,
+                'id': doc_id
+            }
+            self._login_index.setdefault(self._normalizar(login), []).append(registro)
+            
+            nome_normalizado = self._normalizar(nome)
+            self._nome_index[nome_normalizado] = self._nome_index.get(nome_normalizado, 0) + 1
+            
+            if doc_id is not None:
+                self._id_index[doc_id] = registro
+        
+        if self._semelhantes is not None:
+            self._semelhantes.adicionar_varios(valores[3])
+    
+    def _desindexar(self, doc_id):
+        """Remove dos índices o registro do documento informado"""
+        registro = self._id_index.pop(doc_id, None)
+        if registro is None:
+            return
+        
+        login = self._normalizar(registro['login'])
+        registros = [r for r in self._login_index.get(login, []) if r is not registro]
+        if registros:
+            self._login_index[login] = registros
+        else:
+            self._login_index.pop(login, None)
+        
+        if self._semelhantes is not None:
+            self._semelhantes.remover(registro['nome_completo'])
+        
+        nome = self._normalizar(registro['nome_completo'])
+        restantes = self._nome_index.get(nome, 0) - 1
+        if restantes > 0:
+            self._nome_index[nome] = restantes
+        else:
+            self._nome_index.pop(nome, None)
+    
+    def _sombrear(self, linhas):
+        """Tira dos índices as linhas do snapshot que saem dos dados (máscara booleana)"""
+        saindo = self.data[linhas]
+        self._sombreados.update(saindo[self.columns['id']].tolist())
+        
+        if self._semelhantes is not None and self.columns['nome_completo'] in saindo.columns:
+            for nome in saindo[self.columns['nome_completo']].tolist():
+                self._semelhantes.remover(nome)
+    
+    def _registros_snapshot(self, login):
+        """Registros do snapshot com o login, exceto os alterados ou removidos desde a abertura"""
+        if self._snapshot is None:
+            return []
+        
+        colunas = [
+            self.columns['login'],
+            self.columns['senha'],
+            self.columns['perfil'],
+            self.columns['nome_completo'],
+            self._status_column(self.data),
+            self.columns['id']
+        ]
+        registros = []
+        for posicao in self._snapshot.posicoes_login(login):
+            valores = self._snapshot.linha(posicao, colunas)
+            if valores[5] not in self._sombreados:
+                registros.append(dict(zip(('login', 'senha', 'perfil', 'nome_completo', 'status', 'id'), valores)))
+        return registros
+    
+    def _nome_no_snapshot(self, nome):
+        """Verdadeiro se o nome (sem espaços nas pontas) está numa linha ainda válida do snapshot"""
+        if self._snapshot is None:
+            return False
+        
+        posicoes = self._snapshot.posicoes_nome(nome)
+        return any(
+            self._snapshot.linha(posicao, [self.columns['id']])[0] not in self._sombreados
+            for posicao in posicoes
+        )
     
     def verify_login(self, username, password):
         if self.data is None:
             return None, "Dados não carregados"
         
         try:
-            # Usar STATUS em maiúsculo
-            status_column = 'STATUS' if 'STATUS' in self.data.columns else 'Status'
+            with self._lock:
+                login = self._normalizar(username)
+                registros = self._login_index.get(login, []) + self._registros_snapshot(login)
             
-            user_row = self.data[
-                (self.data[self.columns['login']] == username) & 
-                (self.data[self.columns['senha']] == password)
-            ]
+            # Mesmo login pode aparecer mais de uma vez; vale a primeira linha com a senha correta
+            user_data = next(
+                (registro for registro in registros if verificador.conferir(password, registro['senha'])),
+                None
+            )
             
-            if user_row.empty:
+            if user_data is None:
                 return None, "Login ou senha incorretos"
             
-            user_data = user_row.iloc[0]
-            
-            if user_data[status_column] != 'Ativo':
+            if user_data['status'] != 'Ativo':
                 return None, "Usuário bloqueado ou inativo"
             
-            return {
-                'login': user_data[self.columns['login']],
-                'perfil': user_data[self.columns['perfil']],
-                'nome_completo': user_data[self.columns['nome_completo']],
-                'status': user_data[status_column]
-            }, None
+            user_info = {
+                'login': user_data['login'],
+                'perfil': user_data['perfil'],
+                'nome_completo': user_data['nome_completo'],
+                'status': user_data['status']
+            }
+            if user_data['id'] is not None:
+                user_info['id'] = user_data['id']
             
+            return user_info, None
+        
         except Exception as e:
             return None, f"Erro na verificação: {str(e)}"
     
@@ -53,13 +369,11 @@ class DatabaseManager(QObject):
             return True, "Dados não carregados"
         
         try:
-            login_exists = not self.data[
-                self.data[self.columns['login']] == login
-            ].empty
-            
-            nome_exists = not self.data[
-                self.data[self.columns['nome_completo']] == nome_completo
-            ].empty
+            with self._lock:
+                login = self._normalizar(login)
+                nome = self._normalizar(nome_completo)
+                login_exists = login in self._login_index or bool(self._registros_snapshot(login))
+                nome_exists = self._nome_index.get(nome, 0) > 0 or self._nome_no_snapshot(nome)
             
             if login_exists and nome_exists:
                 return True, "Login e Nome Completo já existem"
@@ -69,6 +383,170 @@ class DatabaseManager(QObject):
                 return True, "Nome Completo já existe"
             else:
                 return False, None
-                
+        
         except Exception as e:
-            return True, f"Erro na verificação: {str(e)}"
\ No newline at end of file
+            return True, f"Erro na verificação: {str(e)}"
+    
+    def _indice_semelhantes(self):
+        """IndiceNomes do roster; montado fora do lock e instalado se os dados não mudaram nesse meio tempo"""
+        with self._lock:
+            if self._semelhantes is not None or self.data is None:
+                return self._semelhantes
+            versao = self._analises
+            coluna = self.columns['nome_completo']
+            nomes = self.data[coluna].tolist() if coluna in self.data.columns else []
+        
+        indice = IndiceNomes(nomes)
+        
+        with self._lock:
+            if self._analises is versao:
+                self._semelhantes = indice
+        return indice
+    
+    def similar_names(self, nome_completo, limiar=None, limite=5):
+        """[(nome cadastrado, similaridade)] parecidos com o nome, ignorando acentos, caixa e partículas"""
+        indice = self._indice_semelhantes()
+        if indice is None:
+            return []
+        
+        limiar = settings.NOMES_LIMIAR_SEMELHANCA if limiar is None else limiar
+        with self._lock:
+            return indice.semelhantes(nome_completo, limiar, limite)
+    
+    def duplicate_names(self, limiar=None):
+        """Grupos de nomes cadastrados iguais ou parecidos entre si, para revisão"""
+        with self._lock:
+            if self.data is None:
+                return []
+            coluna = self.columns['nome_completo']
+            nomes = self.data[coluna].tolist() if coluna in self.data.columns else []
+        
+        # Índice próprio do relatório: a varredura não segura o lock dos logins
+        limiar = settings.NOMES_LIMIAR_SEMELHANCA if limiar is None else limiar
+        return IndiceNomes(nomes).grupos(limiar)
+    
+    # Análises do roster: operações vetorizadas sobre o DataFrame carregado
+    
+    def _analise(self, chave, calcular):
+        """Resultado de calcular(data, cache) guardado até a próxima alteração dos dados"""
+        with self._lock:
+            if self.data is None:
+                return None
+            cache = self._analises
+            if chave in cache:
+                return cache[chave]
+            data = self.data
+        
+        # Calculado fora do lock: logins concorrentes não esperam pela agregação
+        resultado = calcular(data, cache)
+        cache[chave] = resultado
+        return resultado
+    
+    def _coluna(self, data, coluna):
+        import pandas as pd
+        
+        if coluna in data.columns:
+            return data[coluna]
+        return pd.Series(None, index=data.index, dtype=object)
+    
+    def _preparado(self, data, cache):
+        """Colunas de análise convertidas uma vez por versão: categorias e data de cadastro"""
+        preparado = cache.get('_preparado')
+        if preparado is None:
+            import pandas as pd
+            
+            preparado = pd.DataFrame({
+                'perfil': self._coluna(data, self.columns['perfil']).astype('category'),
+                'status': self._coluna(data, self._status_column(data)).astype('category'),
+                'data_cadastro': pd.to_datetime(
+                    self._coluna(data, self.columns['data_cadastro']), format=FORMATO_DATA, errors='coerce'
+                )
+            }, index=data.index)
+            cache['_preparado'] = preparado
+        return preparado
+    
+    def prepare_analytics(self):
+        """Converte as colunas de análise antecipadamente (ex.: logo após carregar o roster)"""
+        self._analise('_preparado', self._preparado)
+    
+    def _derivada(self, preparado, campo):
+        """Coluna de agrupamento: perfil/status direto, dia e mês a partir da data de cadastro"""
+        if campo in ('perfil', 'status'):
+            return preparado[campo]
+        if campo == 'dia':
+            return preparado['data_cadastro'].dt.normalize()
+        if campo == 'mes':
+            return preparado['data_cadastro'].dt.to_period('M')
+        raise ValueError(f"Campo de análise inválido: {campo} (use {', '.join(CAMPOS_ANALISE)})")
+    
+    def count_by(self, *campos):
+        """Quantidade de usuários por combinação dos campos (padrão: perfil e status)"""
+        campos = campos or ('perfil', 'status')
+        
+        def calcular(data, cache):
+            import pandas as pd
+            
+            preparado = self._preparado(data, cache)
+            if not len(preparado):
+                return pd.Series(dtype='int64', name='total')
+            
+            chaves = [self._derivada(preparado, campo).rename(campo) for campo in campos]
+            return preparado.groupby(chaves, observed=True).size().rename('total')
+        
+        return self._analise(('count_by',) + tuple(campos), calcular)
+    
+    def registrations_per_day(self, inicio=None, fim=None):
+        """Cadastros por dia (dias sem cadastro com 0); inicio/fim filtram o período, inclusive"""
+        def calcular(data, cache):
+            import numpy as np
+            import pandas as pd
+            
+            datas = self._preparado(data, cache)['data_cadastro'].to_numpy(dtype='datetime64[D]')
+            datas = datas[~np.isnat(datas)]
+            if not len(datas):
+                return pd.Series(dtype='int64', name='cadastros')
+            
+            # Contagem por deslocamento em dias: O(n), sem ordenar o roster
+            primeiro = datas.min()
+            contagens = np.bincount((datas - primeiro).astype('int64'))
+            dias = pd.date_range(pd.Timestamp(primeiro), periods=len(contagens), freq='D')
+            return pd.Series(contagens, index=dias, name='cadastros')
+        
+        serie = self._analise('registrations_per_day', calcular)
+        if serie is None or (inicio is None and fim is None):
+            return serie
+        return serie.loc[inicio:fim]
+    
+    def blocked_users(self, campos=('login', 'nome_completo', 'perfil', 'status', 'data_cadastro')):
+        """Usuários com status diferente de 'Ativo' (os mesmos recusados no login)"""
+        def calcular(data, cache):
+            import numpy as np
+            
+            status = self._preparado(data, cache)['status']
+            return data.iloc[np.flatnonzero((status != 'Ativo').to_numpy())].reset_index(drop=True)
+        
+        bloqueados = self._analise('blocked_users', calcular)
+        if bloqueados is None:
+            return None
+        
+        colunas = [
+            self._status_column(bloqueados) if campo == 'status' else self.columns[campo]
+            for campo in campos
+        ]
+        return bloqueados[[coluna for coluna in colunas if coluna in bloqueados.columns]]
+    
+    def roster_summary(self):
+        """Totais do roster para o painel do supervisor"""
+        def calcular(data, cache):
+            preparado = self._preparado(data, cache)
+            datas = preparado['data_cadastro']
+            return {
+                'total': len(preparado),
+                'por_perfil': preparado['perfil'].value_counts().to_dict(),
+                'por_status': preparado['status'].value_counts().to_dict(),
+                'bloqueados': int((preparado['status'] != 'Ativo').sum()),
+                'primeiro_cadastro': datas.min() if datas.notna().any() else None,
+                'ultimo_cadastro': datas.max() if datas.notna().any() else None
+            }
+        
+        return self._analise('roster_summary', calcular)
\ No newline at end of file
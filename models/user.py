@@ -1,15 +1,71 @@
-from dataclasses import dataclass
-from datetime import datetime
+import sys
+import time
+from typing import NamedTuple, Optional, Union
 
-@dataclass
-class User:
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+# perfil/status se repetem em todo o roster: uma única instância de cada texto
+_intern = sys.intern
+
+class User(NamedTuple):
+    """Registro imutável de usuário (tupla com __slots__ vazio: sem __dict__ por instância).
+    
+    cadastro guarda o instante do cadastro (epoch) e só vira texto quando
+    data_cadastro é lido; registros vindos do banco já trazem o texto.
+    """
+    
     login: str
     senha: str
     perfil: str
-    status: str = "Ativo"
     nome_completo: str = ""
-    data_cadastro: str = None
+    status: str = "Ativo"
+    cadastro: Optional[Union[float, str]] = None
+    
+    @classmethod
+    def novo(cls, login, senha, perfil, nome_completo="", status="Ativo", cadastro=None):
+        """Usuário recém-criado: valores de perfil/status internados e instante atual"""
+        return cls(
+            login,
+            senha,
+            _intern(perfil),
+            nome_completo,
+            _intern(status),
+            time.time() if cadastro is None else cadastro
+        )
+    
+    @property
+    def data_cadastro(self):
+        if isinstance(self.cadastro, float):
+            return time.strftime(FORMATO_DATA, time.localtime(self.cadastro))
+        return self.cadastro or ""
+    
+    def to_dict(self):
+        login, senha, perfil, nome_completo, status, cadastro = self
+        if cadastro.__class__ is not str:
+            cadastro = self.data_cadastro
+        
+        return {
+            'login': login,
+            'senha': senha,
+            'perfil': perfil,
+            'nome_completo': nome_completo,
+            'status': status,
+            'data_cadastro': cadastro
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        return tuple.__new__(cls, (
+            data['login'],
+            data['senha'],
+            _intern(get('perfil') or ''),
+            get('nome_completo', ''),
+            _intern(get('status') or 'Ativo'),
+            get('data_cadastro') or None
+        ))
     
-    def __post_init__(self):
-        if self.data_cadastro is None:
-            self.data_cadastro = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
+    @classmethod
+    def from_tuple(cls, valores):
+        """Reconstrói a partir de tuple(user), sem passar por dict"""
+        return tuple.__new__(cls, valores)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório de nomes completos duplicados ou parecidos na collection de usuários")
+    parser.add_argument('--limiar', type=float, help="Similaridade mínima dos n-gramas (padrão: AVERBSYS_NOMES_LIMIAR)")
+    parser.add_argument('--saida', help="Arquivo CSV com os grupos encontrados")
+    args = parser.parse_args()
+    
+    import time
+    from config import settings
+    from services.user_service import UserService
+    from utils.name_index import IndiceNomes
+    
+    limiar = settings.NOMES_LIMIAR_SEMELHANCA if args.limiar is None else args.limiar
+    
+    print("🚀 Lendo login e nome de todos os usuários...")
+    logins_por_nome = {}
+    for dados in UserService().iterar_usuarios(tamanho_pagina=5000, campos=['login', 'nome_completo']):
+        nome = str(dados.get('nome_completo', '')).strip()
+        logins_por_nome.setdefault(nome, []).append(str(dados.get('login', '')).strip())
+    
+    inicio = time.perf_counter()
+    nomes = [nome for nome, logins in logins_por_nome.items() for _ in logins]
+    grupos = IndiceNomes(nomes).grupos(limiar)
+    print(f"🔎 {len(nomes)} usuários analisados em {time.perf_counter() - inicio:.1f} s: {len(grupos)} grupos suspeitos")
+    
+    for numero, grupo in enumerate(grupos[:20], start=1):
+        print(f"⚠️ Grupo {numero}:")
+        for nome in dict.fromkeys(grupo):
+            print(f"    {nome} ({', '.join(logins_por_nome[nome])})")
+    if len(grupos) > 20:
+        print(f"... e mais {len(grupos) - 20} grupos")
+    
+    if args.saida and grupos:
+        import csv
+        with open(args.saida, 'w', newline='', encoding='utf-8') as arquivo:
+            writer = csv.writer(arquivo)
+            writer.writerow(['grupo', 'nome_completo', 'login'])
+            for numero, grupo in enumerate(grupos, start=1):
+                for nome in dict.fromkeys(grupo):
+                    writer.writerows((numero, nome, login) for login in logins_por_nome[nome])
+        print(f"📄 Grupos gravados em {args.saida}")
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+import asyncio
+from config import settings
+from models.user import User
+from services.storage_backends import COLECAO_META, DOC_MIGRACAO_IDS, UsuarioJaExiste, gerar_id_login, gerar_id_nome, marcar_atualizacao
+from services.user_service import avaliar_credenciais
+from utils.cache import TTLCache
+from utils.passwords import precisa_rehash, verificador
+from utils.rate_limit import LimitadorLogin, LimiteExcedido, mensagem_espera
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class AsyncFirestoreBackend:
+    """Mesmas operações do FirestoreBackend sobre o firestore.AsyncClient"""
+    
+    nome = 'firestore_async'
+    
+    def __init__(self, db=None):
+        if db is None:
+            from config.firebase_config import FirebaseManager
+            db = FirebaseManager().get_async_db()
+        
+        self.db = db
+        self.users_ref = self.db.collection('usuarios')
+        self.nomes_ref = self.db.collection('usuarios_nomes')
+        self.meta_ref = self.db.collection(COLECAO_META)
+        self._ids_migrados = False
+    
+    async def ids_migrados(self):
+        if not self._ids_migrados:
+            self._ids_migrados = (await self.meta_ref.document(DOC_MIGRACAO_IDS).get()).exists
+        return self._ids_migrados
+    
+    async def get_by_login(self, login):
+        results = await self.users_ref.where('login', '==', login.strip()).limit(1).get()
+        if not results:
+            return None
+        
+        user_doc = results[0]
+        return user_doc.id, user_doc.to_dict()
+    
+    async def exists(self, login, nome_completo):
+        # As duas consultas seguem em paralelo
+        por_login, por_nome = await asyncio.gather(
+            self.users_ref.where('login', '==', login.strip()).limit(1).get(),
+            self.users_ref.where('nome_completo', '==', nome_completo.strip()).limit(1).get()
+        )
+        return bool(por_login), bool(por_nome)
+    
+    async def create(self, dados):
+        from google.api_core.exceptions import AlreadyExists
+        
+        # Antes da migração dos IDs, usuários antigos só aparecem nas consultas por campo
+        if not await self.ids_migrados():
+            login_exists, nome_exists = await self.exists(dados['login'], dados['nome_completo'])
+            if login_exists:
+                raise UsuarioJaExiste('login')
+            if nome_exists:
+                raise UsuarioJaExiste('nome_completo')
+        
+        user_ref = self.users_ref.document(gerar_id_login(dados['login']))
+        nome_ref = self.nomes_ref.document(gerar_id_nome(dados['nome_completo']))
+        
+        batch = self.db.batch()
+        batch.create(user_ref, marcar_atualizacao(dados))
+        batch.create(nome_ref, {'login': dados['login'], 'nome_completo': dados['nome_completo']})
+        
+        try:
+            await batch.commit()
+        except AlreadyExists:
+            raise UsuarioJaExiste(await self._campo_duplicado(user_ref, nome_ref))
+        
+        return user_ref.id
+    
+    async def _campo_duplicado(self, user_ref, nome_ref):
+        existentes = set()
+        async for doc in self.db.get_all([user_ref, nome_ref]):
+            if doc.exists:
+                existentes.add(doc.reference.path)
+        
+        if user_ref.path in existentes:
+            return 'login'
+        if nome_ref.path in existentes:
+            return 'nome_completo'
+        return None
+    
+    async def update(self, user_id, campos):
+        await self.users_ref.document(user_id).update(marcar_atualizacao(campos))
+    
+    async def stream(self, campos=None, tamanho_pagina=500):
+        # Paginação por cursor, como no FirestoreBackend
+        query = self.users_ref.order_by('__name__')
+        if campos:
+            query = query.select(list(campos))
+        
+        ultimo = None
+        while True:
+            pagina = query.limit(tamanho_pagina)
+            if ultimo is not None:
+                pagina = pagina.start_after(ultimo)
+            
+            docs = await pagina.get()
+            for doc in docs:
+                yield doc.id, doc.to_dict()
+            
+            if len(docs) < tamanho_pagina:
+                return
+            ultimo = docs[-1]
+
+class AsyncUserService(QObject):
+    """Variante asyncio do UserService: várias consultas em voo numa única thread.
+    
+    Os métodos são corrotinas e devem rodar no loop asyncio integrado ao Qt
+    (utils.qt_asyncio). Cancelar a task cancela a RPC em andamento.
+    """
+    
+    user_registered = pyqtSignal(bool, str)
+    user_authenticated = pyqtSignal(dict, str)
+    
+    _NAO_ENCONTRADO = object()
+    
+    def __init__(self, backend=None, cache_size=None, cache_ttl=None, negative_ttl=None, limitador=None):
+        super().__init__()
+        self.backend = AsyncFirestoreBackend() if backend is None else backend
+        
+        self.user_cache = TTLCache(
+            maxsize=settings.CACHE_USUARIOS_TAMANHO if cache_size is None else cache_size,
+            ttl=settings.CACHE_USUARIOS_TTL if cache_ttl is None else cache_ttl
+        )
+        self.negative_ttl = settings.CACHE_USUARIOS_TTL_NEGATIVO if negative_ttl is None else negative_ttl
+        
+        self.limitador = LimitadorLogin() if limitador is None else limitador
+        
+        # Consultas em voo por login: pedidos simultâneos do mesmo login compartilham a RPC
+        self._em_andamento = {}
+    
+    async def buscar_usuario(self, login):
+        """Retorna (id, dados) do usuário pelo login, consultando o cache antes do Firestore"""
+        login = login.strip()
+        cached = self.user_cache.get(login)
+        
+        if cached is self._NAO_ENCONTRADO:
+            return None
+        if cached is None:
+            future = self._em_andamento.get(login)
+            if future is None:
+                future = asyncio.ensure_future(self._consultar(login))
+                self._em_andamento[login] = future
+                future.add_done_callback(lambda _: self._em_andamento.pop(login, None))
+            
+            # shield: cancelar um dos interessados não derruba a consulta dos demais
+            cached = await asyncio.shield(future)
+            if cached is self._NAO_ENCONTRADO:
+                return None
+        
+        doc_id, user_data = cached
+        return doc_id, dict(user_data)
+    
+    async def _consultar(self, login):
+        # Limite global: espera a vez no loop, sem bloquear a GUI
+        espera = self.limitador.reservar_global()
+        if espera > settings.LOGIN_ESPERA_MAXIMA:
+            self.limitador.devolver_global()
+            raise LimiteExcedido(espera)
+        if espera > 0:
+            await asyncio.sleep(espera)
+        
+        encontrado = await self.backend.get_by_login(login)
+        
+        if encontrado is None:
+            self.user_cache.set(login, self._NAO_ENCONTRADO, ttl=self.negative_ttl)
+            return self._NAO_ENCONTRADO
+        
+        self.user_cache.set(login, encontrado)
+        return encontrado
+    
+    def cache_stats(self):
+        return self.user_cache.stats()
+    
+    async def verificar_login(self, username, password):
+        try:
+            falha = self.limitador.falha_recente(username, password)
+            permitido, espera = (True, 0.0) if falha else self.limitador.permitir_usuario(username)
+            
+            if falha:
+                user_info, error_message = {}, falha
+            elif not permitido:
+                user_info, error_message = {}, mensagem_espera(espera)
+            else:
+                resultado = await self.buscar_usuario(username)
+                
+                if resultado is None:
+                    user_info, error_message = {}, "Usuário não encontrado"
+                else:
+                    user_info, error_message = await self.avaliar_credenciais(*resultado, password)
+                    if not error_message:
+                        await self.atualizar_hash_senha(*resultado, password)
+                self.limitador.registrar_resultado(username, password, error_message)
+        
+        except asyncio.CancelledError:
+            raise
+        except LimiteExcedido as e:
+            user_info, error_message = {}, str(e)
+        except Exception as e:
+            user_info, error_message = {}, f"Erro na autenticação: {str(e)}"
+        
+        self.user_authenticated.emit(user_info, error_message)
+        return user_info, error_message
+    
+    async def avaliar_credenciais(self, user_id, user_data, password):
+        """avaliar_credenciais com o hash conferido no pool de processos, sem travar o loop"""
+        senha_confere = await verificador.conferir_async(password.strip(), user_data['senha'])
+        return avaliar_credenciais(user_id, user_data, password, senha_confere)
+    
+    async def atualizar_hash_senha(self, user_id, user_data, password):
+        if not settings.SENHA_REHASH_NO_LOGIN or not precisa_rehash(user_data['senha']):
+            return
+        
+        try:
+            await self.backend.update(user_id, {'senha': await verificador.gerar_hash_async(password.strip())})
+            self.user_cache.invalidate(user_data['login'].strip())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Não foi possível atualizar o hash da senha: {e}")
+    
+    async def usuario_existe(self, login, nome_completo):
+        """Retorna (existe, mensagem) no mesmo formato do DatabaseManager.user_exists"""
+        login_exists, nome_exists = await self.backend.exists(login, nome_completo)
+        
+        if login_exists and nome_exists:
+            return True, "Login e Nome Completo já existem"
+        elif login_exists:
+            return True, "Login já existe"
+        elif nome_exists:
+            return True, "Nome Completo já existe"
+        return False, None
+    
+    async def cadastrar_usuario(self, user_data):
+        try:
+            new_user = User.novo(
+                login=user_data['login'].strip(),
+                senha=await verificador.gerar_hash_async(user_data['senha']),
+                perfil=user_data['perfil'],
+                nome_completo=user_data['nome_completo'].strip()
+            )
+            
+            try:
+                await self.backend.create(new_user.to_dict())
+                success, message = True, "Usuário cadastrado com sucesso!"
+                self.user_cache.invalidate(new_user.login)
+                self.limitador.esquecer(new_user.login)
+            except UsuarioJaExiste as e:
+                success, message = False, str(e)
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            success, message = False, f"Erro no cadastro: {str(e)}"
+        
+        self.user_registered.emit(success, message)
+        return success, message
+    
+    async def iterar_usuarios(self, tamanho_pagina=500, campos=None, incluir_id=False):
+        async for user_id, dados in self.backend.stream(campos, tamanho_pagina):
+            if incluir_id:
+                dados['id'] = user_id
+            yield dados
+    
+    async def listar_usuarios(self, campos=None, tamanho_pagina=500):
+        try:
+            return [dados async for dados in self.iterar_usuarios(tamanho_pagina, campos)]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Erro ao listar usuários: {e}")
+            return []
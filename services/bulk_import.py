@@ -0,0 +1,183 @@
+import csv
+import os
+from dataclasses import dataclass, field
+from models.user import User
+from services.storage_backends import USUARIOS_POR_BATCH
+from utils.passwords import verificador
+
+# Mesmos perfis oferecidos na tela de cadastro
+PERFIS_VALIDOS = ("Analista", "Gerente", "Dev", "Supervisor")
+STATUS_VALIDOS = ("Ativo", "Bloqueado")
+
+CAMPOS = ('login', 'senha', 'perfil', 'nome_completo', 'status')
+
+def _aliases_cabecalho():
+    """Aceita tanto 'nome_completo' quanto o cabeçalho da planilha 'NOME COMPLETO'"""
+    aliases = {}
+    for campo in CAMPOS:
+        aliases[campo] = campo
+        aliases[campo.upper()] = campo
+        aliases[campo.replace('_', ' ').upper()] = campo
+    return aliases
+
+@dataclass
+class ResultadoImportacao:
+    total: int = 0
+    importados: int = 0
+    falhas: list = field(default_factory=list)  # (linha, login, motivo)
+
+class ImportadorUsuarios:
+    """Importa usuários em massa de CSV/XLSX ou Google Sheets usando o bulk_write do backend"""
+    
+    def __init__(self, user_service, progresso=None, tamanho_batch=None):
+        self.user_service = user_service
+        self.backend = user_service.backend
+        self.progresso = progresso
+        self.tamanho_batch = tamanho_batch or USUARIOS_POR_BATCH
+    
+    # Fontes: geram (número da linha, dict com os campos)
+    
+    def ler_csv(self, caminho, encoding='utf-8-sig'):
+        with open(caminho, newline='', encoding=encoding) as arquivo:
+            amostra = arquivo.read(4096)
+            arquivo.seek(0)
+            try:
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+            except csv.Error:
+                dialeto = csv.excel
+            
+            leitor = csv.reader(arquivo, dialeto)
+            yield from self._linhas_com_cabecalho(leitor)
+    
+    def ler_xlsx(self, caminho, aba=None):
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise ImportError("Leitura de XLSX requer o pacote openpyxl (pip install openpyxl)") from e
+        
+        workbook = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            planilha = workbook[aba] if aba else workbook.active
+            yield from self._linhas_com_cabecalho(planilha.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    
+    def ler_planilha(self, sheets_api, range_name):
+        yield from self._linhas_com_cabecalho(iter(sheets_api.get_data(range_name)))
+    
+    def ler_arquivo(self, caminho):
+        extensao = os.path.splitext(caminho)[1].lower()
+        if extensao in ('.xlsx', '.xlsm'):
+            return self.ler_xlsx(caminho)
+        return self.ler_csv(caminho)
+    
+    def _linhas_com_cabecalho(self, linhas):
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        
+        aliases = _aliases_cabecalho()
+        campos = [aliases.get(str(coluna or '').strip()) for coluna in cabecalho]
+        
+        # Linha 1 é o cabeçalho
+        for numero, valores in enumerate(linhas, start=2):
+            registro = {}
+            for campo, valor in zip(campos, valores):
+                if campo is not None:
+                    registro[campo] = '' if valor is None else str(valor).strip()
+            
+            if any(registro.values()):
+                yield numero, registro
+    
+    # Validação e deduplicação
+    
+    def carregar_existentes(self):
+        """Busca apenas login e nome de todos os usuários para deduplicar em memória"""
+        logins = set()
+        nomes = set()
+        
+        for dados in self.user_service.iterar_usuarios(tamanho_pagina=5000, campos=['login', 'nome_completo']):
+            logins.add(str(dados.get('login', '')).strip())
+            nomes.add(str(dados.get('nome_completo', '')).strip())
+        
+        return logins, nomes
+    
+    def _validar(self, registro):
+        """Retorna o User da linha ou lança ValueError com o motivo"""
+        faltando = [campo for campo in ('login', 'senha', 'perfil', 'nome_completo') if not registro.get(campo)]
+        if faltando:
+            raise ValueError(f"Campos obrigatórios vazios: {', '.join(faltando)}")
+        
+        if len(registro['senha']) < 4:
+            raise ValueError("A senha deve ter pelo menos 4 caracteres")
+        
+        if registro['perfil'] not in PERFIS_VALIDOS:
+            raise ValueError(f"Perfil inválido: {registro['perfil']}")
+        
+        status = registro.get('status') or 'Ativo'
+        if status not in STATUS_VALIDOS:
+            raise ValueError(f"Status inválido: {status}")
+        
+        return User.novo(
+            login=registro['login'],
+            senha=registro['senha'],
+            perfil=registro['perfil'],
+            nome_completo=registro['nome_completo'],
+            status=status
+        )
+    
+    # Escrita
+    
+    def importar(self, linhas):
+        """Valida, deduplica e grava as linhas em batches; retorna um ResultadoImportacao"""
+        resultado = ResultadoImportacao()
+        logins, nomes = self.carregar_existentes()
+        pendentes = []
+        
+        for numero, registro in linhas:
+            resultado.total += 1
+            
+            try:
+                user = self._validar(registro)
+            except ValueError as e:
+                resultado.falhas.append((numero, registro.get('login', ''), str(e)))
+                continue
+            
+            if user.login in logins:
+                resultado.falhas.append((numero, user.login, "Login já existe"))
+                continue
+            if user.nome_completo in nomes:
+                resultado.falhas.append((numero, user.login, "Nome completo já existe"))
+                continue
+            
+            logins.add(user.login)
+            nomes.add(user.nome_completo)
+            pendentes.append((numero, user))
+            
+            if len(pendentes) >= self.tamanho_batch:
+                self._gravar(pendentes, resultado)
+                pendentes = []
+        
+        if pendentes:
+            self._gravar(pendentes, resultado)
+        
+        return resultado
+    
+    def _gravar(self, pendentes, resultado):
+        # Hash das senhas do lote distribuído entre os processos de senha
+        hashes = verificador.gerar_hashes([user.senha for _, user in pendentes])
+        registros = [user._replace(senha=senha).to_dict() for (_, user), senha in zip(pendentes, hashes)]
+        
+        # No Firestore, um batch de 500 operações por lote, com regravação linha a linha em conflito
+        falhas = self.backend.bulk_write(registros)
+        
+        for posicao, motivo in falhas:
+            numero, user = pendentes[posicao]
+            resultado.falhas.append((numero, user.login, f"Erro ao gravar: {motivo}"))
+        resultado.importados += len(pendentes) - len(falhas)
+        
+        for _, user in pendentes:
+            self.user_service.user_cache.invalidate(user.login)
+        
+        if self.progresso:
+            self.progresso(resultado)
@@ -0,0 +1,153 @@
+import json
+import os
+import time
+from datetime import datetime
+
+# pyarrow, numpy e pandas são importados sob demanda: o snapshot é aberto fora da thread da GUI
+
+VERSAO_FORMATO = 2
+CHAVE_METADADOS = b'averbsys.snapshot'
+
+# Colunas de índice gravadas junto com o roster
+COLUNA_LOGIN_HASH = '_login_hash'      # hash do login, na mesma ordem das linhas (ordenadas por ele)
+COLUNA_NOME_HASH = '_nome_hash'        # hashes dos nomes, ordenados
+COLUNA_NOME_POSICAO = '_nome_posicao'  # linha de cada hash de _nome_hash
+COLUNAS_INDICE = (COLUNA_LOGIN_HASH, COLUNA_NOME_HASH, COLUNA_NOME_POSICAO)
+
+def _hashes(textos):
+    """Hash de 64 bits estável entre execuções (SipHash com chave fixa do pandas)"""
+    import numpy as np
+    import pandas as pd
+    
+    return pd.util.hash_array(np.array(textos, dtype=object), categorize=False)
+
+class SnapshotRoster:
+    """Roster gravado em Arrow IPC (Feather v2 sem compressão) com os índices de login e nome.
+    
+    As linhas ficam ordenadas pelo hash do login, então o índice de login é a
+    própria coluna _login_hash; o de nome é o par _nome_hash (ordenado) e
+    _nome_posicao. O arquivo é aberto por memory-map: nem as colunas nem os
+    índices são copiados ou reconstruídos, e a consulta é uma busca binária.
+    """
+    
+    def __init__(self, tabela, metadados):
+        self._tabela = tabela
+        self.metadados = metadados
+        self._coluna_login = metadados['coluna_login']
+        self._coluna_nome = metadados['coluna_nome']
+        self._colunas = {nome: tabela.column(nome) for nome in tabela.column_names}
+        
+        # Arrays numpy sobre o mapeamento (um único bloco por coluna: sem cópia)
+        self._login_hash = tabela.column(COLUNA_LOGIN_HASH).to_numpy()
+        self._nome_hash = tabela.column(COLUNA_NOME_HASH).to_numpy()
+        self._nome_posicao = tabela.column(COLUNA_NOME_POSICAO).to_numpy()
+    
+    def __len__(self):
+        return self._tabela.num_rows
+    
+    @property
+    def marca(self):
+        """Maior 'atualizado_em' contido no snapshot: a sincronização continua a partir dele"""
+        marca = self.metadados.get('marca')
+        return datetime.fromisoformat(marca) if marca else None
+    
+    @property
+    def carregado_em(self):
+        """Instante da carga completa da qual o snapshot descende; gravações de delta o mantêm"""
+        return self.metadados.get('carregado_em') or 0.0
+    
+    @classmethod
+    def abrir(cls, caminho):
+        """Abre o snapshot por memory-map; None se não existir ou for de outro formato"""
+        # Gravação que não pôde substituir o arquivo aberto (Windows) entra agora
+        pendente = caminho + '.novo'
+        if os.path.exists(pendente):
+            try:
+                os.replace(pendente, caminho)
+            except OSError:
+                pass
+        
+        if not os.path.exists(caminho):
+            return None
+        
+        import pyarrow as pa
+        
+        tabela = pa.ipc.open_file(pa.memory_map(caminho)).read_all()
+        metadados = json.loads((tabela.schema.metadata or {}).get(CHAVE_METADADOS, b'{}'))
+        if metadados.get('versao') != VERSAO_FORMATO:
+            return None
+        return cls(tabela, metadados)
+    
+    @staticmethod
+    def gravar(caminho, data, coluna_login, coluna_nome, marca=None, carregado_em=None):
+        """Grava o DataFrame com os índices; o arquivo anterior só é trocado com o novo completo"""
+        import numpy as np
+        import pyarrow as pa
+        from pyarrow import feather
+        
+        # Mesmas chaves dos índices do DatabaseManager: login e nome sem espaços nas pontas
+        logins = _hashes([str(login).strip() for login in data[coluna_login]])
+        ordem = np.argsort(logins, kind='stable')
+        data = data.iloc[ordem].reset_index(drop=True)
+        
+        nomes = _hashes([str(nome).strip() for nome in data[coluna_nome]])
+        ordem_nomes = np.argsort(nomes, kind='stable')
+        
+        tabela = pa.Table.from_pandas(data, preserve_index=False)
+        tabela = tabela.append_column(COLUNA_LOGIN_HASH, pa.array(logins[ordem]))
+        tabela = tabela.append_column(COLUNA_NOME_HASH, pa.array(nomes[ordem_nomes]))
+        tabela = tabela.append_column(COLUNA_NOME_POSICAO, pa.array(ordem_nomes.astype(np.int64)))
+        
+        metadados = dict(tabela.schema.metadata or {})
+        metadados[CHAVE_METADADOS] = json.dumps({
+            'versao': VERSAO_FORMATO,
+            'coluna_login': coluna_login,
+            'coluna_nome': coluna_nome,
+            'marca': marca.isoformat() if marca is not None else None,
+            'gravado_em': time.time(),
+            'carregado_em': carregado_em if carregado_em is not None else time.time(),
+            'total': len(data)
+        }).encode('utf-8')
+        tabela = tabela.replace_schema_metadata(metadados)
+        
+        pendente = caminho + '.novo'
+        feather.write_feather(tabela, pendente, compression='uncompressed', chunksize=max(len(data), 1))
+        try:
+            os.replace(pendente, caminho)
+        except OSError as e:
+            print(f"Snapshot do roster fica em {pendente} até a próxima abertura: {e}")
+    
+    def dataframe(self):
+        """DataFrame do roster sobre as colunas mapeadas (sem as colunas de índice)"""
+        colunas = [nome for nome in self._tabela.column_names if nome not in COLUNAS_INDICE]
+        return self._tabela.select(colunas).to_pandas()
+    
+    def _faixa(self, hashes, texto):
+        chave = _hashes([texto])[0]
+        return hashes.searchsorted(chave, 'left'), hashes.searchsorted(chave, 'right')
+    
+    def _valor(self, coluna, posicao):
+        return self._colunas[coluna][posicao].as_py()
+    
+    def posicoes_login(self, login):
+        """Linhas com o login (já sem espaços nas pontas); colisões de hash são descartadas"""
+        inicio, fim = self._faixa(self._login_hash, login)
+        return [
+            posicao for posicao in range(inicio, fim)
+            if str(self._valor(self._coluna_login, posicao)).strip() == login
+        ]
+    
+    def posicoes_nome(self, nome):
+        """Linhas com o nome (já sem espaços nas pontas)"""
+        inicio, fim = self._faixa(self._nome_hash, nome)
+        return [
+            posicao for posicao in self._nome_posicao[inicio:fim].tolist()
+            if str(self._valor(self._coluna_nome, posicao)).strip() == nome
+        ]
+    
+    def linha(self, posicao, colunas):
+        """Valores das colunas pedidas numa linha (None para coluna ausente)"""
+        return [
+            self._valor(coluna, posicao) if coluna in self._colunas else None
+            for coluna in colunas
+        ]
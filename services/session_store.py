@@ -0,0 +1,127 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from config import settings
+
+# Perfil guardado na sessão: os mesmos campos devolvidos por avaliar_credenciais
+CAMPOS_PERFIL = ('login', 'perfil', 'nome_completo', 'status', 'id')
+
+# Tolerância para relógio ajustado para trás depois da emissão
+TOLERANCIA_RELOGIO = 300
+
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).decode('ascii').rstrip('=')
+
+def _de_b64(texto):
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+class SessaoLocal:
+    """Sessão persistida entre execuções: perfil do usuário num token assinado e com validade.
+    
+    A assinatura (HMAC-SHA256 com uma chave aleatória guardada na pasta de
+    configuração do usuário) impede alterar perfil ou validade no arquivo; a
+    situação, o perfil e o nome do usuário no backend continuam sendo
+    confirmados depois que a home abre.
+    """
+    
+    def __init__(self, caminho=None, caminho_chave=None, validade_horas=None, timer=time.time):
+        self.caminho = caminho or settings.SESSAO_ARQUIVO
+        self.caminho_chave = caminho_chave or settings.SESSAO_CHAVE_ARQUIVO
+        self.validade = (settings.SESSAO_VALIDADE_HORAS if validade_horas is None else validade_horas) * 3600
+        self.timer = timer
+        self._chave_cache = None
+    
+    def _chave(self):
+        """Chave de assinatura do usuário, criada no primeiro uso com acesso só do dono"""
+        if self._chave_cache is not None:
+            return self._chave_cache
+        
+        pasta = os.path.dirname(self.caminho_chave)
+        if pasta:
+            os.makedirs(pasta, mode=0o700, exist_ok=True)
+        
+        try:
+            descritor = os.open(self.caminho_chave, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            with open(self.caminho_chave, 'rb') as arquivo:
+                self._chave_cache = arquivo.read()
+        else:
+            chave = secrets.token_bytes(32)
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(chave)
+            self._chave_cache = chave
+        
+        return self._chave_cache
+    
+    def _assinar(self, conteudo):
+        return hmac.new(self._chave(), conteudo, hashlib.sha256).digest()
+    
+    def emitir(self, user_data):
+        """Token 'conteúdo.assinatura' com o perfil do usuário e a validade"""
+        agora = int(self.timer())
+        conteudo = json.dumps({
+            'usuario': {campo: user_data.get(campo) for campo in CAMPOS_PERFIL},
+            'emitido_em': agora,
+            'expira_em': agora + int(self.validade)
+        }, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        
+        return f"{_b64(conteudo)}.{_b64(self._assinar(conteudo))}"
+    
+    def validar(self, token):
+        """Perfil do usuário se o token for autêntico, estiver no prazo e o usuário ativo; senão None"""
+        try:
+            conteudo_b64, assinatura_b64 = token.strip().split('.')
+            conteudo = _de_b64(conteudo_b64)
+            if not hmac.compare_digest(self._assinar(conteudo), _de_b64(assinatura_b64)):
+                return None
+            
+            dados = json.loads(conteudo)
+            agora = self.timer()
+            if not dados['emitido_em'] - TOLERANCIA_RELOGIO <= agora < dados['expira_em']:
+                return None
+            
+            usuario = dados['usuario']
+        except (ValueError, KeyError, TypeError, OSError):
+            return None
+        
+        if usuario.get('status') != 'Ativo':
+            return None
+        return usuario
+    
+    def salvar(self, user_data):
+        try:
+            temporario = self.caminho + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(self.emitir(user_data))
+            os.replace(temporario, self.caminho)
+        except OSError as e:
+            print(f"Não foi possível salvar a sessão: {e}")
+    
+    def existe(self):
+        """Verificação barata, sem validar: há um token salvo"""
+        return os.path.exists(self.caminho)
+    
+    def carregar(self):
+        """Perfil da sessão salva, ou None; tokens inválidos ou vencidos são apagados"""
+        try:
+            with open(self.caminho, encoding='utf-8') as arquivo:
+                token = arquivo.read()
+        except OSError:
+            return None
+        
+        usuario = self.validar(token)
+        if usuario is None:
+            self.encerrar()
+        return usuario
+    
+    def encerrar(self):
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Não foi possível apagar a sessão: {e}")
@@ -0,0 +1,163 @@
+import sqlite3
+import threading
+import time
+from config import settings
+from utils.passwords import verificador
+
+CAMPOS = ('login', 'senha', 'perfil', 'nome_completo', 'status', 'data_cadastro')
+
+class ReplicaSQLite:
+    """Réplica local da collection 'usuarios' em SQLite.
+    
+    Oferece a mesma interface de consulta do DatabaseManager (verify_login,
+    user_exists, is_loaded) e persiste entre execuções, permitindo autenticar
+    mesmo com a rede degradada.
+    """
+    
+    def __init__(self, caminho=None):
+        self.caminho = caminho or settings.REPLICA_SQLITE_CAMINHO
+        self._lock = threading.Lock()
+        
+        # Acessada pelo listener do Firestore e pelas threads do APIWorker
+        self._conn = sqlite3.connect(self.caminho, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._criar_tabelas()
+    
+    def _criar_tabelas(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS usuarios (
+                    id TEXT PRIMARY KEY,
+                    login TEXT NOT NULL,
+                    senha TEXT,
+                    perfil TEXT,
+                    nome_completo TEXT,
+                    status TEXT,
+                    data_cadastro TEXT,
+                    sincronizado_em REAL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_login ON usuarios (login)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_nome ON usuarios (nome_completo)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_estado (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                )
+            """)
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+    
+    # Sincronização
+    
+    def _linha(self, doc_id, dados, agora):
+        return (doc_id,) + tuple(
+            str(dados.get(campo, '')).strip() if campo in ('login', 'nome_completo') else dados.get(campo)
+            for campo in CAMPOS
+        ) + (agora,)
+    
+    def substituir_todos(self, documentos):
+        """Recarrega a réplica inteira a partir de [(id, dados)]"""
+        agora = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM usuarios")
+            self._conn.executemany(
+                "INSERT INTO usuarios VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._linha(doc_id, dados, agora) for doc_id, dados in documentos]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_estado VALUES ('carregado_em', ?)", (str(agora),)
+            )
+    
+    def aplicar_alteracoes(self, upserts, removidos):
+        """Aplica um delta [(id, dados)] e ids removidos"""
+        agora = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM usuarios WHERE id = ?", [(doc_id,) for doc_id in removidos])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO usuarios VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._linha(doc_id, dados, agora) for doc_id, dados in upserts]
+            )
+    
+    def upsert(self, doc_id, dados):
+        self.aplicar_alteracoes([(doc_id, dados)], [])
+    
+    def remover_login(self, login):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM usuarios WHERE login = ?", (login.strip(),))
+    
+    # Consultas
+    
+    def is_loaded(self):
+        """Verdadeiro se a réplica já recebeu ao menos uma carga completa"""
+        with self._lock:
+            row = self._conn.execute("SELECT valor FROM sync_estado WHERE chave = 'carregado_em'").fetchone()
+        return row is not None
+    
+    def total(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+    
+    def nomes(self):
+        """Nomes completos de todos os usuários (índice do aviso de nome parecido)"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT nome_completo FROM usuarios")]
+    
+    def buscar_por_login(self, login):
+        """Retorna (id, dados) do usuário ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM usuarios WHERE login = ? LIMIT 1", (login.strip(),)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        return row['id'], {campo: row[campo] for campo in CAMPOS}
+    
+    def verify_login(self, username, password):
+        try:
+            encontrado = self.buscar_por_login(username)
+            
+            if encontrado is None or not verificador.conferir(password, encontrado[1]['senha']):
+                return None, "Login ou senha incorretos"
+            
+            doc_id, user_data = encontrado
+            if user_data['status'] != 'Ativo':
+                return None, "Usuário bloqueado ou inativo"
+            
+            return {
+                'login': user_data['login'],
+                'perfil': user_data['perfil'],
+                'nome_completo': user_data['nome_completo'],
+                'status': user_data['status'],
+                'id': doc_id
+            }, None
+        
+        except Exception as e:
+            return None, f"Erro na verificação: {str(e)}"
+    
+    def user_exists(self, login, nome_completo):
+        try:
+            with self._lock:
+                login_exists = self._conn.execute(
+                    "SELECT 1 FROM usuarios WHERE login = ? LIMIT 1", (login.strip(),)
+                ).fetchone() is not None
+                nome_exists = self._conn.execute(
+                    "SELECT 1 FROM usuarios WHERE nome_completo = ? LIMIT 1", (nome_completo.strip(),)
+                ).fetchone() is not None
+            
+            if login_exists and nome_exists:
+                return True, "Login e Nome Completo já existem"
+            elif login_exists:
+                return True, "Login já existe"
+            elif nome_exists:
+                return True, "Nome Completo já existe"
+            else:
+                return False, None
+        
+        except Exception as e:
+            return True, f"Erro na verificação: {str(e)}"
@@ -0,0 +1,483 @@
+import hashlib
+import threading
+from config import settings
+from services.sqlite_replica import CAMPOS, ReplicaSQLite
+
+# Cada usuário ocupa duas operações no Firestore: documento + reserva do nome
+LIMITE_OPERACOES_BATCH = 500
+USUARIOS_POR_BATCH = LIMITE_OPERACOES_BATCH // 2
+
+# Marca gravada ao fim de migrar_ids_deterministicos: antes dela, usuários com IDs
+# aleatórios só aparecem nas consultas por campo e o cadastro também as faz
+COLECAO_META = 'usuarios_meta'
+DOC_MIGRACAO_IDS = 'migracao_ids'
+
+# Instante da última escrita do usuário (hora do servidor): base da sincronização por delta
+CAMPO_ATUALIZACAO = 'atualizado_em'
+
+def gerar_id_login(login):
+    """ID determinístico do documento do usuário a partir do login"""
+    return hashlib.sha256(login.strip().encode('utf-8')).hexdigest()
+
+def gerar_id_nome(nome_completo):
+    """ID determinístico da reserva de unicidade do nome completo"""
+    return hashlib.sha256(nome_completo.strip().encode('utf-8')).hexdigest()
+
+def marcar_atualizacao(dados):
+    """Cópia dos dados com CAMPO_ATUALIZACAO preenchido pelo servidor do Firestore na escrita"""
+    from google.cloud.firestore import SERVER_TIMESTAMP
+    
+    return {**dados, CAMPO_ATUALIZACAO: SERVER_TIMESTAMP}
+
+class UsuarioJaExiste(Exception):
+    """Login ou nome completo já cadastrado; campo indica qual ('login' ou 'nome_completo')"""
+    
+    MENSAGENS = {
+        'login': "Login já existe",
+        'nome_completo': "Nome completo já existe"
+    }
+    
+    def __init__(self, campo):
+        self.campo = campo
+        super().__init__(self.MENSAGENS.get(campo, "Login ou nome completo já existe"))
+
+class UserBackend:
+    """Interface de armazenamento da collection de usuários.
+    
+    Os registros trafegam como (id, dados), com dados no formato de
+    User.to_dict().
+    """
+    
+    nome = None
+    
+    def get_by_login(self, login):
+        """Retorna (id, dados) do usuário ou None"""
+        raise NotImplementedError
+    
+    def exists(self, login, nome_completo):
+        """Retorna (login_existe, nome_existe)"""
+        raise NotImplementedError
+    
+    def create(self, dados):
+        """Cria o usuário e retorna o id; lança UsuarioJaExiste em caso de duplicidade"""
+        raise NotImplementedError
+    
+    def update(self, user_id, campos):
+        """Altera campos de um usuário existente (ex.: o hash da senha)"""
+        raise NotImplementedError
+    
+    def stream(self, campos=None, tamanho_pagina=500):
+        """Gera (id, dados) de todos os usuários, opcionalmente só com os campos pedidos"""
+        raise NotImplementedError
+    
+    def bulk_write(self, registros):
+        """Cria vários usuários; retorna [(posição, mensagem)] dos que falharam"""
+        falhas = []
+        for posicao, dados in enumerate(registros):
+            try:
+                self.create(dados)
+            except Exception as e:
+                falhas.append((posicao, str(e)))
+        return falhas
+    
+    def watch(self, on_load, on_changes, desde=None):
+        """Escuta alterações em tempo real; nem todo backend oferece"""
+        raise NotImplementedError(f"Backend '{self.nome}' não oferece listener em tempo real")
+    
+    def close(self):
+        pass
+
+class FirestoreBackend(UserBackend):
+    nome = 'firestore'
+    
+    def __init__(self, db=None):
+        if db is None:
+            from config.firebase_config import FirebaseManager
+            db = FirebaseManager().get_db()
+        
+        self.db = db
+        self.users_ref = self.db.collection('usuarios')
+        self.nomes_ref = self.db.collection('usuarios_nomes')
+        self.meta_ref = self.db.collection(COLECAO_META)
+        self._ids_migrados = False
+    
+    def ids_migrados(self):
+        """Verdadeiro depois que migrar_ids_deterministicos terminou nesta base (só o positivo fica em cache)"""
+        if not self._ids_migrados:
+            self._ids_migrados = self.meta_ref.document(DOC_MIGRACAO_IDS).get().exists
+        return self._ids_migrados
+    
+    def _checar_legado(self, dados):
+        """Antes da migração, recusa duplicidade com usuários de ID aleatório pelas consultas por campo"""
+        if self.ids_migrados():
+            return
+        
+        login_exists, nome_exists = self.exists(dados['login'], dados['nome_completo'])
+        if login_exists:
+            raise UsuarioJaExiste('login')
+        if nome_exists:
+            raise UsuarioJaExiste('nome_completo')
+    
+    def get_by_login(self, login):
+        results = self.users_ref.where('login', '==', login.strip()).limit(1).get()
+        if not results:
+            return None
+        
+        user_doc = results[0]
+        return user_doc.id, user_doc.to_dict()
+    
+    def exists(self, login, nome_completo):
+        # Consultas por campo também enxergam usuários anteriores aos IDs determinísticos
+        login_exists = bool(self.users_ref.where('login', '==', login.strip()).limit(1).get())
+        nome_exists = bool(self.users_ref.where('nome_completo', '==', nome_completo.strip()).limit(1).get())
+        return login_exists, nome_exists
+    
+    def _adicionar(self, batch, dados):
+        user_ref = self.users_ref.document(gerar_id_login(dados['login']))
+        nome_ref = self.nomes_ref.document(gerar_id_nome(dados['nome_completo']))
+        
+        batch.create(user_ref, marcar_atualizacao(dados))
+        batch.create(nome_ref, {'login': dados['login'], 'nome_completo': dados['nome_completo']})
+        return user_ref, nome_ref
+    
+    def create(self, dados):
+        from google.api_core.exceptions import AlreadyExists
+        
+        self._checar_legado(dados)
+        
+        # Documento do usuário e reserva do nome com IDs determinísticos:
+        # checagem de duplicidade e inserção acontecem num único commit atômico
+        batch = self.db.batch()
+        user_ref, nome_ref = self._adicionar(batch, dados)
+        
+        try:
+            batch.commit()
+        except AlreadyExists:
+            raise UsuarioJaExiste(self._campo_duplicado(user_ref, nome_ref))
+        
+        return user_ref.id
+    
+    def _campo_duplicado(self, user_ref, nome_ref):
+        """Identifica qual documento já existia após um commit recusado"""
+        existentes = {doc.reference.path for doc in self.db.get_all([user_ref, nome_ref]) if doc.exists}
+        
+        if user_ref.path in existentes:
+            return 'login'
+        if nome_ref.path in existentes:
+            return 'nome_completo'
+        return None
+    
+    def update(self, user_id, campos):
+        self.users_ref.document(user_id).update(marcar_atualizacao(campos))
+    
+    def stream(self, campos=None, tamanho_pagina=500):
+        # Paginação por cursor (start_after) ordenada pelo ID do documento
+        query = self.users_ref.order_by('__name__')
+        if campos:
+            query = query.select(list(campos))
+        
+        ultimo = None
+        while True:
+            pagina = query.limit(tamanho_pagina)
+            if ultimo is not None:
+                pagina = pagina.start_after(ultimo)
+            
+            docs = list(pagina.stream())
+            for doc in docs:
+                yield doc.id, doc.to_dict()
+            
+            if len(docs) < tamanho_pagina:
+                return
+            ultimo = docs[-1]
+    
+    def bulk_write(self, registros):
+        # Sem a migração, cada linha precisa das consultas por campo: grava uma a uma
+        if not self.ids_migrados():
+            return super().bulk_write(registros)
+        
+        falhas = []
+        
+        for inicio in range(0, len(registros), USUARIOS_POR_BATCH):
+            lote = registros[inicio:inicio + USUARIOS_POR_BATCH]
+            batch = self.db.batch()
+            for dados in lote:
+                self._adicionar(batch, dados)
+            
+            try:
+                batch.commit()
+            except Exception:
+                # Um único conflito derruba o batch inteiro: regrava linha a linha
+                for posicao, dados in enumerate(lote, start=inicio):
+                    try:
+                        self.create(dados)
+                    except Exception as e:
+                        falhas.append((posicao, str(e)))
+        
+        return falhas
+    
+    def watch(self, on_load, on_changes, desde=None):
+        """Listener em tempo real na collection.
+        
+        O primeiro snapshot chama on_load([(id, dados)]) com a collection completa;
+        os seguintes chamam on_changes(upserts, removidos) apenas com o delta.
+        Com desde, escuta só os usuários escritos depois desse instante e o
+        primeiro snapshot já chega como delta em on_changes (exclusões de
+        usuários não alterados desde então não aparecem).
+        Os callbacks rodam na thread do Firestore. Retorna o watch (use unsubscribe()).
+        """
+        estado = {'carregado': desde is not None}
+        query = self.users_ref if desde is None else self.users_ref.where(CAMPO_ATUALIZACAO, '>', desde)
+        
+        def on_snapshot(col_snapshot, changes, read_time):
+            try:
+                if not estado['carregado']:
+                    estado['carregado'] = True
+                    on_load([(doc.id, doc.to_dict()) for doc in col_snapshot])
+                    return
+                
+                upserts = []
+                removidos = []
+                for change in changes:
+                    if change.type.name == 'REMOVED':
+                        removidos.append(change.document.id)
+                    else:
+                        upserts.append((change.document.id, change.document.to_dict()))
+                
+                on_changes(upserts, removidos)
+            except Exception as e:
+                print(f"Erro ao processar snapshot de usuários: {e}")
+        
+        return query.on_snapshot(on_snapshot)
+    
+    def _conflitos_migracao(self):
+        """Logins e nomes que a migração não pode mover sem sobrescrever outro usuário.
+        
+        Retorna (ids de login em conflito, ids de nome em conflito, [(campo, valor, ids dos documentos)]).
+        """
+        por_login = {}
+        por_nome = {}
+        for doc in self.users_ref.select(['login', 'nome_completo']).stream():
+            dados = doc.to_dict()
+            login = str(dados.get('login') or '').strip()
+            nome = str(dados.get('nome_completo') or '').strip()
+            por_login.setdefault(gerar_id_login(login), (login, []))[1].append(doc.id)
+            if nome:
+                por_nome.setdefault(gerar_id_nome(nome), (nome, {}))[1][doc.id] = login
+        
+        # Reservas já gravadas (cadastros novos ou migração anterior) contam como mais um dono do nome
+        for doc in self.nomes_ref.stream():
+            if doc.id in por_nome:
+                por_nome[doc.id][1].setdefault(doc.id, doc.to_dict().get('login'))
+        
+        logins = {chave: ids for chave, (_, ids) in por_login.items() if len(ids) > 1}
+        nomes = {chave: donos for chave, (_, donos) in por_nome.items() if len(set(donos.values())) > 1}
+        
+        conflitos = [('login', por_login[chave][0], ids) for chave, ids in logins.items()]
+        conflitos += [
+            ('nome_completo', por_nome[chave][0], [doc_id if doc_id != chave else f"usuarios_nomes/{chave}" for doc_id in donos])
+            for chave, donos in nomes.items()
+        ]
+        return set(logins), set(nomes), conflitos
+    
+    def migrar_ids_deterministicos(self):
+        """Move usuários criados com IDs aleatórios para o ID determinístico e reserva seus nomes.
+        
+        Necessário uma vez para que usuários antigos participem da checagem atômica
+        de duplicidade (migrar_usuarios.py). Login ou nome repetidos entre usuários
+        antigos não são movidos nem reservados: ficam em conflitos para correção
+        manual, e a marca que dispensa as consultas por campo no cadastro só é
+        gravada sem conflitos. Retorna (quantidade migrada, [(campo, valor, ids)]).
+        """
+        from google.cloud.firestore import SERVER_TIMESTAMP
+        
+        logins_conflito, nomes_conflito, conflitos = self._conflitos_migracao()
+        
+        migrados = 0
+        batch = self.db.batch()
+        operacoes = 0
+        
+        for doc in self.users_ref.stream():
+            dados = doc.to_dict()
+            novo_id = gerar_id_login(dados['login'])
+            nome = dados.get('nome_completo', '').strip()
+            
+            if nome and gerar_id_nome(nome) not in nomes_conflito:
+                batch.set(self.nomes_ref.document(gerar_id_nome(nome)), {
+                    'login': dados['login'].strip(),
+                    'nome_completo': nome
+                })
+                operacoes += 1
+            
+            if doc.id != novo_id and novo_id not in logins_conflito:
+                batch.set(self.users_ref.document(novo_id), marcar_atualizacao(dados))
+                batch.delete(doc.reference)
+                operacoes += 2
+                migrados += 1
+            
+            # Limite de 500 operações por commit
+            if operacoes >= LIMITE_OPERACOES_BATCH - 3:
+                batch.commit()
+                batch = self.db.batch()
+                operacoes = 0
+        
+        if operacoes:
+            batch.commit()
+        
+        if not conflitos:
+            self.meta_ref.document(DOC_MIGRACAO_IDS).set({'concluida_em': SERVER_TIMESTAMP, 'migrados': migrados})
+            self._ids_migrados = True
+        return migrados, conflitos
+
+class SQLiteBackend(ReplicaSQLite, UserBackend):
+    """Armazenamento principal em SQLite local, com o mesmo esquema da réplica"""
+    
+    nome = 'sqlite'
+    
+    def __init__(self, caminho=None):
+        super().__init__(caminho or settings.BACKEND_SQLITE_CAMINHO)
+    
+    def get_by_login(self, login):
+        return self.buscar_por_login(login)
+    
+    def exists(self, login, nome_completo):
+        with self._lock:
+            return self._exists(login, nome_completo)
+    
+    def _exists(self, login, nome_completo):
+        login_exists = self._conn.execute(
+            "SELECT 1 FROM usuarios WHERE login = ? LIMIT 1", (login.strip(),)
+        ).fetchone() is not None
+        nome_exists = self._conn.execute(
+            "SELECT 1 FROM usuarios WHERE nome_completo = ? LIMIT 1", (nome_completo.strip(),)
+        ).fetchone() is not None
+        return login_exists, nome_exists
+    
+    def create(self, dados):
+        return self._inserir([dados], parar_no_erro=True)[0]
+    
+    def bulk_write(self, registros):
+        falhas = []
+        self._inserir(registros, falhas=falhas)
+        return falhas
+    
+    def _inserir(self, registros, parar_no_erro=False, falhas=None):
+        """Checagem e inserção sob o mesmo lock e transação"""
+        ids = []
+        with self._lock, self._conn:
+            for posicao, dados in enumerate(registros):
+                login_exists, nome_exists = self._exists(dados['login'], dados['nome_completo'])
+                if login_exists or nome_exists:
+                    erro = UsuarioJaExiste('login' if login_exists else 'nome_completo')
+                    if parar_no_erro:
+                        raise erro
+                    falhas.append((posicao, str(erro)))
+                    continue
+                
+                doc_id = gerar_id_login(dados['login'])
+                self._conn.execute(
+                    "INSERT INTO usuarios VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._linha(doc_id, dados, None)
+                )
+                ids.append(doc_id)
+        return ids
+    
+    def update(self, user_id, campos):
+        colunas = [campo for campo in campos if campo in CAMPOS]
+        if not colunas:
+            return
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE usuarios SET {', '.join(f'{coluna} = ?' for coluna in colunas)} WHERE id = ?",
+                [campos[coluna] for coluna in colunas] + [user_id]
+            )
+    
+    def stream(self, campos=None, tamanho_pagina=500):
+        colunas = [campo for campo in (campos or CAMPOS) if campo in CAMPOS]
+        ultimo = ''
+        
+        # Paginação por chave para não segurar o lock durante toda a iteração
+        while True:
+            with self._lock:
+                linhas = self._conn.execute(
+                    f"SELECT id, {', '.join(colunas)} FROM usuarios WHERE id > ? ORDER BY id LIMIT ?",
+                    (ultimo, tamanho_pagina)
+                ).fetchall()
+            
+            for linha in linhas:
+                yield linha['id'], {campo: linha[campo] for campo in colunas}
+            
+            if len(linhas) < tamanho_pagina:
+                return
+            ultimo = linhas[-1]['id']
+
+class MemoryBackend(UserBackend):
+    """Armazenamento em memória, para testes, benchmarks e implantações sem rede"""
+    
+    nome = 'memoria'
+    
+    def __init__(self, registros=None):
+        self._por_id = {}
+        self._por_login = {}
+        self._nomes = set()
+        self._lock = threading.Lock()
+        
+        for dados in registros or []:
+            self.create(dados)
+    
+    def get_by_login(self, login):
+        with self._lock:
+            doc_id = self._por_login.get(login.strip())
+            if doc_id is None:
+                return None
+            return doc_id, dict(self._por_id[doc_id])
+    
+    def exists(self, login, nome_completo):
+        with self._lock:
+            return login.strip() in self._por_login, nome_completo.strip() in self._nomes
+    
+    def create(self, dados):
+        login = dados['login'].strip()
+        nome = dados['nome_completo'].strip()
+        
+        with self._lock:
+            if login in self._por_login:
+                raise UsuarioJaExiste('login')
+            if nome in self._nomes:
+                raise UsuarioJaExiste('nome_completo')
+            
+            doc_id = gerar_id_login(login)
+            self._por_id[doc_id] = dict(dados)
+            self._por_login[login] = doc_id
+            self._nomes.add(nome)
+            return doc_id
+    
+    def update(self, user_id, campos):
+        with self._lock:
+            self._por_id[user_id].update(campos)
+    
+    def stream(self, campos=None, tamanho_pagina=500):
+        with self._lock:
+            itens = list(self._por_id.items())
+        
+        for doc_id, dados in itens:
+            if campos:
+                yield doc_id, {campo: dados.get(campo) for campo in campos}
+            else:
+                yield doc_id, dict(dados)
+    
+    def __len__(self):
+        return len(self._por_id)
+
+BACKENDS = {
+    FirestoreBackend.nome: FirestoreBackend,
+    SQLiteBackend.nome: SQLiteBackend,
+    MemoryBackend.nome: MemoryBackend
+}
+
+def criar_backend(nome=None):
+    """Instancia o backend configurado (AVERBSYS_BACKEND: firestore, sqlite ou memoria)"""
+    nome = (nome or settings.BACKEND_USUARIOS).strip().lower()
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend de usuários desconhecido: {nome}")
+    return BACKENDS[nome]()
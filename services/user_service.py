@@ -1,92 +1,251 @@
-from config.firebase_config import FirebaseManager
-from models.user_model import UserModel
+import time
+from config import settings
+from models.user import User
+from services.storage_backends import criar_backend, UsuarioJaExiste
+from utils.cache import TTLCache
+from utils.metrics import metricas
+from utils.passwords import precisa_rehash, verificador
+from utils.rate_limit import LimitadorLogin, LimiteExcedido, mensagem_espera
 from PyQt5.QtCore import QObject, pyqtSignal
 
+def avaliar_credenciais(user_id, user_data, password, senha_confere=None):
+    """Confere senha e status de um usuário já encontrado; retorna (user_info, erro).
+    
+    senha_confere permite informar a conferência já feita (caminho async);
+    sem ela, o hash é conferido no pool de processos de senhas.
+    """
+    # Verificar senha
+    if senha_confere is None:
+        senha_confere = verificador.conferir(password.strip(), user_data['senha'])
+    if not senha_confere:
+        return {}, "Senha incorreta"
+    
+    # Verificar status
+    if user_data.get('status') != 'Ativo':
+        return {}, "Usuário bloqueado ou inativo"
+    
+    # Login bem-sucedido
+    user_info = {
+        'login': user_data['login'],
+        'perfil': user_data['perfil'],
+        'nome_completo': user_data['nome_completo'],
+        'status': user_data.get('status', 'Ativo'),
+        'id': user_id
+    }
+    
+    return user_info, ""
+
 class UserService(QObject):
     user_registered = pyqtSignal(bool, str)
     user_authenticated = pyqtSignal(dict, str)
     
-    def __init__(self):
+    # Marcador de cache negativo para logins inexistentes
+    _NAO_ENCONTRADO = object()
+    
+    def __init__(self, backend=None, cache_size=None, cache_ttl=None, negative_ttl=None, limitador=None):
         super().__init__()
-        self.firebase = FirebaseManager()
-        self.db = self.firebase.get_db()
-        self.users_ref = self.db.collection('usuarios')
+        
+        # Armazenamento escolhido pela configuração (Firestore por padrão)
+        self.backend = criar_backend() if backend is None else backend
+        
+        # Cache de leitura em frente à collection 'usuarios'
+        self.user_cache = TTLCache(
+            maxsize=settings.CACHE_USUARIOS_TAMANHO if cache_size is None else cache_size,
+            ttl=settings.CACHE_USUARIOS_TTL if cache_ttl is None else cache_ttl
+        )
+        self.negative_ttl = settings.CACHE_USUARIOS_TTL_NEGATIVO if negative_ttl is None else negative_ttl
+        
+        # Limites de login para proteger a cota de leituras do backend em rajadas
+        self.limitador = LimitadorLogin() if limitador is None else limitador
+    
+    def _aguardar_vez(self):
+        """Reserva uma leitura no limite global, esperando a vez se a fila for curta"""
+        espera = self.limitador.reservar_global()
+        if espera > settings.LOGIN_ESPERA_MAXIMA:
+            self.limitador.devolver_global()
+            metricas.contar('auth.limitado', motivo='global')
+            raise LimiteExcedido(espera)
+        if espera > 0:
+            metricas.registrar('auth.espera_global', espera)
+            time.sleep(espera)
+    
+    def buscar_usuario(self, login):
+        """Retorna (id, dados) do usuário pelo login, consultando o cache antes do backend"""
+        login = login.strip()
+        cached = self.user_cache.get(login)
+        
+        if cached is self._NAO_ENCONTRADO:
+            metricas.contar('user_service.cache', resultado='negativo')
+            return None
+        if cached is not None:
+            metricas.contar('user_service.cache', resultado='acerto')
+            doc_id, user_data = cached
+            return doc_id, dict(user_data)
+        
+        metricas.contar('user_service.cache', resultado='falha')
+        self._aguardar_vez()
+        with metricas.span('backend.get_by_login', backend=self.backend.nome):
+            encontrado = self.backend.get_by_login(login)
+        
+        if encontrado is None:
+            self.user_cache.set(login, self._NAO_ENCONTRADO, ttl=self.negative_ttl)
+            return None
+        
+        user_id, user_data = encontrado
+        self.user_cache.set(login, (user_id, user_data))
+        return user_id, dict(user_data)
+    
+    def _resultado_login(self, user_info, error_message):
+        """Emite o resultado do login e o devolve para quem chamou diretamente"""
+        self.user_authenticated.emit(user_info, error_message)
+        return user_info, error_message
+    
+    def _resultado_cadastro(self, success, message):
+        self.user_registered.emit(success, message)
+        return success, message
+    
+    def cache_stats(self):
+        """Contadores de acerto/falha do cache de usuários"""
+        return self.user_cache.stats()
     
     def verificar_login(self, username, password):
-        try:
-            # Buscar usuário pelo login
-            query = self.users_ref.where('login', '==', username.strip()).limit(1)
-            results = query.get()
-            
-            if not results:
-                self.user_authenticated.emit({}, "Usuário não encontrado")
-                return
-            
-            user_doc = results[0]
-            user_data = user_doc.to_dict()
-            
-            # Verificar senha
-            if user_data['senha'] != password.strip():
-                self.user_authenticated.emit({}, "Senha incorreta")
-                return
-            
-            # Verificar status
-            if user_data.get('status') != 'Ativo':
-                self.user_authenticated.emit({}, "Usuário bloqueado ou inativo")
-                return
-            
-            # Login bem-sucedido
-            user_info = {
-                'login': user_data['login'],
-                'perfil': user_data['perfil'],
-                'nome_completo': user_data['nome_completo'],
-                'status': user_data.get('status', 'Ativo'),
-                'id': user_doc.id
-            }
-            
-            self.user_authenticated.emit(user_info, "")
+        with metricas.span('user_service.verificar_login'):
+            try:
+                # Mesma tentativa que acabou de falhar: responde sem ler o backend
+                falha = self.limitador.falha_recente(username, password)
+                if falha:
+                    metricas.contar('auth.limitado', motivo='falha_recente')
+                    return self._resultado_login({}, falha)
+                
+                permitido, espera = self.limitador.permitir_usuario(username)
+                if not permitido:
+                    metricas.contar('auth.limitado', motivo='usuario')
+                    return self._resultado_login({}, mensagem_espera(espera))
+                
+                # Buscar usuário pelo login
+                resultado = self.buscar_usuario(username)
+                
+                if resultado is None:
+                    user_info, error_message = {}, "Usuário não encontrado"
+                else:
+                    user_info, error_message = avaliar_credenciais(*resultado, password)
+                    if not error_message:
+                        self.atualizar_hash_senha(*resultado, password)
+                
+                self.limitador.registrar_resultado(username, password, error_message)
+                return self._resultado_login(user_info, error_message)
             
+            except LimiteExcedido as e:
+                return self._resultado_login({}, str(e))
+            except Exception as e:
+                return self._resultado_login({}, f"Erro na autenticação: {str(e)}")
+    
+    def atualizar_hash_senha(self, user_id, user_data, password):
+        """Após um login válido, regrava senha em texto puro ou com custo antigo no hash atual"""
+        if not settings.SENHA_REHASH_NO_LOGIN or not precisa_rehash(user_data['senha']):
+            return
+        
+        try:
+            self.backend.update(user_id, {'senha': verificador.gerar_hash(password.strip())})
+            self.user_cache.invalidate(user_data['login'].strip())
+            metricas.contar('senhas.rehash')
         except Exception as e:
-            self.user_authenticated.emit({}, f"Erro na autenticação: {str(e)}")
+            print(f"Não foi possível atualizar o hash da senha: {e}")
     
     def cadastrar_usuario(self, user_data):
         try:
-            # Verificar se login já existe
-            login_query = self.users_ref.where('login', '==', user_data['login'].strip()).limit(1)
-            login_results = login_query.get()
-            
-            if login_results:
-                self.user_registered.emit(False, "Login já existe")
-                return
-            
-            # Verificar se nome completo já existe
-            nome_query = self.users_ref.where('nome_completo', '==', user_data['nome_completo'].strip()).limit(1)
-            nome_results = nome_query.get()
-            
-            if nome_results:
-                self.user_registered.emit(False, "Nome completo já existe")
-                return
-            
-            # Criar novo usuário
-            new_user = UserModel(
+            # Criar novo usuário; a senha só é gravada como hash
+            new_user = User.novo(
                 login=user_data['login'].strip(),
-                senha=user_data['senha'],
+                senha=verificador.gerar_hash(user_data['senha']),
                 perfil=user_data['perfil'],
                 nome_completo=user_data['nome_completo'].strip()
             )
             
-            # Salvar no Firestore
-            self.users_ref.add(new_user.to_dict())
+            try:
+                with metricas.span('backend.create', backend=self.backend.nome):
+                    self.backend.create(new_user.to_dict())
+            except UsuarioJaExiste as e:
+                return self._resultado_cadastro(False, str(e))
             
-            self.user_registered.emit(True, "Usuário cadastrado com sucesso!")
+            # Descartar entrada (inclusive negativa) e falhas lembradas do login recém-criado
+            self.user_cache.invalidate(new_user.login)
+            self.limitador.esquecer(new_user.login)
             
+            return self._resultado_cadastro(True, "Usuário cadastrado com sucesso!")
+        
         except Exception as e:
-            self.user_registered.emit(False, f"Erro no cadastro: {str(e)}")
+            return self._resultado_cadastro(False, f"Erro no cadastro: {str(e)}")
+    
+    def escutar_usuarios(self, on_load, on_changes, desde=None):
+        """Anexa um listener em tempo real à collection 'usuarios' (backend Firestore).
+        
+        O primeiro snapshot chama on_load([(id, dados)]) com a collection completa;
+        os seguintes chamam on_changes(upserts, removidos) apenas com o delta.
+        Com desde (marca de um snapshot local), até o primeiro é só o delta.
+        Os callbacks rodam na thread do Firestore. Retorna o watch (use unsubscribe()).
+        """
+        def on_changes_coerente(upserts, removidos):
+            # Mantém o cache de leitura coerente com o delta recebido
+            for doc_id, dados in upserts:
+                login = str(dados.get('login', '')).strip()
+                self.user_cache.invalidate(login)
+                self.limitador.esquecer(login)
+            if removidos:
+                self.user_cache.clear()
+            
+            on_changes(upserts, removidos)
+        
+        return self.backend.watch(on_load, on_changes_coerente, desde)
+    
+    def iterar_usuarios(self, tamanho_pagina=500, campos=None, incluir_id=False):
+        """Percorre a collection 'usuarios' em páginas, sem materializar tudo em memória.
+        
+        No Firestore usa paginação por cursor (start_after) ordenada pelo ID do
+        documento e, se campos for informado, busca apenas esses campos (select).
+        """
+        for user_id, dados in self.backend.stream(campos, tamanho_pagina):
+            if incluir_id:
+                dados['id'] = user_id
+            yield dados
+    
+    def iterar_registros(self, tamanho_pagina=500):
+        """Percorre a collection como registros User imutáveis, mais compactos que dicts"""
+        for dados in self.iterar_usuarios(tamanho_pagina):
+            yield User.from_dict(dados)
+    
+    def iterar_dataframes(self, tamanho_pagina=5000, campos=None):
+        """Gera DataFrames por página já no formato de colunas do DatabaseManager"""
+        import pandas as pd
+        from models.database import COLUNAS
+        
+        campos = list(campos) if campos else [campo for campo in COLUNAS if campo != 'id']
+        colunas = [COLUNAS[campo] for campo in campos] + [COLUNAS['id']]
+        
+        pagina = []
+        for dados in self.iterar_usuarios(tamanho_pagina, campos, incluir_id=True):
+            pagina.append([dados.get(campo) for campo in campos] + [dados['id']])
+            
+            if len(pagina) >= tamanho_pagina:
+                yield pd.DataFrame(pagina, columns=colunas)
+                pagina = []
+        
+        if pagina:
+            yield pd.DataFrame(pagina, columns=colunas)
+    
+    def carregar_dataframe(self, tamanho_pagina=5000, campos=None):
+        """DataFrame completo para DatabaseManager.set_data, montado página a página"""
+        import pandas as pd
+        from models.database import COLUNAS
+        
+        partes = list(self.iterar_dataframes(tamanho_pagina, campos))
+        if not partes:
+            return pd.DataFrame(columns=list(COLUNAS.values()))
+        return pd.concat(partes, ignore_index=True)
     
-    def listar_usuarios(self):
+    def listar_usuarios(self, campos=None, tamanho_pagina=500):
         try:
-            users = self.users_ref.stream()
-            return [doc.to_dict() for doc in users]
+            return list(self.iterar_usuarios(tamanho_pagina, campos))
         except Exception as e:
             print(f"Erro ao listar usuários: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,150 @@
+import bisect
+import functools
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+PERFIS = ("Analista", "Gerente", "Dev", "Supervisor")
+
+# Senha comum do roster sintético, gravada como hash (texto puro dispararia a regravação no login)
+SENHA_USUARIOS = 'senha'
+
+@functools.lru_cache(maxsize=None)
+def hash_senha_usuarios():
+    """Hash scrypt de SENHA_USUARIOS, calculado uma vez por processo"""
+    from utils.passwords import verificador
+    return verificador.gerar_hash(SENHA_USUARIOS)
+
+def gerar_usuarios(tamanho):
+    """Roster sintético: usuario0000000..., com 1 em cada 10 bloqueado"""
+    senha = hash_senha_usuarios()
+    for i in range(tamanho):
+        yield {
+            'login': f"usuario{i:07d}",
+            'senha': senha,
+            'perfil': PERFIS[i % len(PERFIS)],
+            'nome_completo': f"Usuario {i:07d}",
+            'status': 'Bloqueado' if usuario_bloqueado(i) else 'Ativo',
+            'data_cadastro': '2024-01-01 00:00:00'
+        }
+
+def usuario_bloqueado(i):
+    return i % 10 == 9
+
+def popular_fake(db, tamanho):
+    """Carrega o roster sintético num FakeFirestore, com as reservas de nome e os índices prontos"""
+    from services.storage_backends import gerar_id_login, gerar_id_nome
+    
+    db.carregar('usuarios', ((gerar_id_login(u['login']), u) for u in gerar_usuarios(tamanho)))
+    db.carregar('usuarios_nomes', (
+        (gerar_id_nome(u['nome_completo']), {'login': u['login'], 'nome_completo': u['nome_completo']})
+        for u in gerar_usuarios(tamanho)
+    ))
+    
+    # Base já migrada para IDs determinísticos: o cadastro dispensa as consultas por campo
+    db.carregar('usuarios_meta', [('migracao_ids', {'migrados': 0})])
+    
+    # Índices de igualdade do fake são criados na primeira consulta: constrói antes de medir
+    for campo in ('login', 'nome_completo'):
+        db.collection('usuarios').where(campo, '==', '').limit(1).get()
+
+def popular_backend(backend, tamanho):
+    """Carrega o roster sintético em qualquer UserBackend via bulk_write"""
+    lote = []
+    for usuario in gerar_usuarios(tamanho):
+        lote.append(usuario)
+        if len(lote) >= 5000:
+            backend.bulk_write(lote)
+            lote = []
+    if lote:
+        backend.bulk_write(lote)
+
+def percentil(amostras_ordenadas, p):
+    """Percentil p (0-100) pelo método nearest-rank de uma lista já ordenada"""
+    if not amostras_ordenadas:
+        return 0.0
+    posicao = max(1, math.ceil(p / 100 * len(amostras_ordenadas)))
+    return amostras_ordenadas[posicao - 1]
+
+def _ms(segundos):
+    return round(segundos * 1000, 3)
+
+def resumir(latencias, duracao):
+    """Resumo de latências (segundos) e da vazão de uma rodada que durou duracao segundos"""
+    ordenadas = sorted(latencias)
+    
+    return {
+        'iteracoes': len(ordenadas),
+        'p50_ms': _ms(percentil(ordenadas, 50)),
+        'p95_ms': _ms(percentil(ordenadas, 95)),
+        'p99_ms': _ms(percentil(ordenadas, 99)),
+        'media_ms': _ms(sum(ordenadas) / len(ordenadas)) if ordenadas else 0.0,
+        'max_ms': _ms(ordenadas[-1]) if ordenadas else 0.0,
+        'ops_por_segundo': round(len(ordenadas) / duracao, 2) if duracao > 0 else 0.0
+    }
+
+# Limites superiores (ms) das faixas do histograma de latência
+FAIXAS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+def histograma(latencias, faixas_ms=FAIXAS_MS):
+    """Conta as latências (segundos) por faixa; retorna [(limite_ms, contagem)], com None para o excedente"""
+    contagens = [0] * (len(faixas_ms) + 1)
+    for latencia in latencias:
+        contagens[bisect.bisect_left(faixas_ms, latencia * 1000)] += 1
+    return list(zip(list(faixas_ms) + [None], contagens))
+
+def medir(operacao, argumentos):
+    """Executa operacao(*args) para cada item de argumentos, cronometrando cada chamada"""
+    latencias = []
+    inicio = time.perf_counter()
+    
+    for args in argumentos:
+        t0 = time.perf_counter()
+        operacao(*args)
+        latencias.append(time.perf_counter() - t0)
+    
+    return resumir(latencias, time.perf_counter() - inicio)
+
+def commit_atual():
+    """Hash do commit do repositório, para identificar a origem dos resultados"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def ambiente():
+    return {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'python': sys.version.split()[0],
+        'plataforma': platform.platform()
+    }
+
+def salvar(caminho, relatorio):
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+def comparar(anterior, atual, chave=('tamanho', 'operacao')):
+    """Gera (identificação, campo, antes, depois, variação %) entre dois relatórios salvos"""
+    indexados = {tuple(r[c] for c in chave): r for r in anterior.get('resultados', [])}
+    
+    for resultado in atual.get('resultados', []):
+        identificacao = tuple(resultado[c] for c in chave)
+        base = indexados.get(identificacao)
+        if base is None:
+            continue
+        
+        for campo in ('p50_ms', 'p95_ms', 'p99_ms', 'ops_por_segundo'):
+            antes, depois = base.get(campo), resultado.get(campo)
+            if not antes or depois is None:
+                continue
+            yield identificacao, campo, antes, depois, (depois - antes) / antes * 100
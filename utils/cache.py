@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Cache LRU limitado com expiração por entrada e contadores de acerto"""
+    
+    _AUSENTE = object()
+    
+    def __init__(self, maxsize=1024, ttl=30.0, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """Retorna o valor em cache ou default se ausente/expirado"""
+        with self._lock:
+            entrada = self._entradas.get(key, self._AUSENTE)
+            
+            if entrada is self._AUSENTE:
+                self.misses += 1
+                return default
+            
+            valor, expira_em = entrada
+            if expira_em <= self.timer():
+                del self._entradas[key]
+                self.misses += 1
+                return default
+            
+            self._entradas.move_to_end(key)
+            self.hits += 1
+            return valor
+    
+    def set(self, key, value, ttl=None):
+        """Armazena o valor, descartando o item menos usado se cheio"""
+        if self.maxsize <= 0:
+            return
+        
+        expira_em = self.timer() + (self.ttl if ttl is None else ttl)
+        
+        with self._lock:
+            self._entradas[key] = (value, expira_em)
+            self._entradas.move_to_end(key)
+            
+            while len(self._entradas) > self.maxsize:
+                self._entradas.popitem(last=False)
+    
+    def contains(self, key):
+        """Indica se há entrada válida para a chave, sem afetar os contadores"""
+        with self._lock:
+            entrada = self._entradas.get(key)
+            return entrada is not None and entrada[1] > self.timer()
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._entradas.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+    
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entradas),
+                'maxsize': self.maxsize
+            }
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
@@ -0,0 +1,303 @@
+import bisect
+import itertools
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore import SERVER_TIMESTAMP
+
+class FakeFirestore:
+    """Cliente Firestore em memória com a mesma API usada pelo FirestoreBackend.
+    
+    Cada chamada que no Firestore real seria uma RPC (get, stream de uma página,
+    commit de batch, get_all) espera latencia segundos (+ até jitter aleatório),
+    permitindo medir o código do app sem rede e de forma reproduzível.
+    """
+    
+    def __init__(self, latencia=0.0, jitter=0.0, seed=None):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.rpcs = 0
+        self._random = random.Random(seed)
+        self._colecoes = {}
+        self._lock = threading.RLock()
+    
+    def _rpc(self):
+        with self._lock:
+            self.rpcs += 1
+            espera = self.latencia + (self._random.random() * self.jitter if self.jitter else 0.0)
+        if espera > 0:
+            time.sleep(espera)
+    
+    def _colecao(self, nome):
+        with self._lock:
+            if nome not in self._colecoes:
+                self._colecoes[nome] = _Colecao(nome)
+            return self._colecoes[nome]
+    
+    def collection(self, nome):
+        return FakeCollection(self, self._colecao(nome))
+    
+    def batch(self):
+        return FakeWriteBatch(self)
+    
+    def get_all(self, referencias):
+        self._rpc()
+        with self._lock:
+            return [ref._snapshot() for ref in referencias]
+    
+    def carregar(self, nome, documentos):
+        """Popula a collection com [(id, dados)] sem latência, para preparar cenários"""
+        colecao = self._colecao(nome)
+        with self._lock:
+            for doc_id, dados in documentos:
+                colecao.gravar(doc_id, dict(dados))
+    
+    def total(self, nome):
+        with self._lock:
+            return len(self._colecao(nome).docs)
+
+class _Colecao:
+    """Armazenamento de uma collection com índices de igualdade criados sob demanda"""
+    
+    def __init__(self, nome):
+        self.nome = nome
+        self.docs = {}
+        self.indices = {}       # campo -> valor -> [ids]
+        self._ordenados = None  # ids em ordem, recalculados após escrita
+    
+    def gravar(self, doc_id, dados):
+        # SERVER_TIMESTAMP vira o instante da escrita, como no servidor
+        for campo, valor in dados.items():
+            if valor is SERVER_TIMESTAMP:
+                dados[campo] = datetime.now(timezone.utc)
+        
+        antigo = self.docs.get(doc_id)
+        if antigo is not None:
+            self._desindexar(doc_id, antigo)
+        elif self._ordenados is not None:
+            bisect.insort(self._ordenados, doc_id)
+        
+        self.docs[doc_id] = dados
+        for campo, indice in self.indices.items():
+            if campo in dados:
+                indice.setdefault(dados[campo], []).append(doc_id)
+    
+    def excluir(self, doc_id):
+        dados = self.docs.pop(doc_id, None)
+        if dados is None:
+            return
+        
+        self._desindexar(doc_id, dados)
+        if self._ordenados is not None:
+            self._ordenados.pop(bisect.bisect_left(self._ordenados, doc_id))
+    
+    def _desindexar(self, doc_id, dados):
+        for campo, indice in self.indices.items():
+            ids = indice.get(dados.get(campo))
+            if ids and doc_id in ids:
+                ids.remove(doc_id)
+                if not ids:
+                    del indice[dados[campo]]
+    
+    def indice(self, campo):
+        if campo not in self.indices:
+            indice = {}
+            for doc_id, dados in self.docs.items():
+                if campo in dados:
+                    indice.setdefault(dados[campo], []).append(doc_id)
+            self.indices[campo] = indice
+        return self.indices[campo]
+    
+    def ordenados(self):
+        if self._ordenados is None:
+            self._ordenados = sorted(self.docs)
+        return self._ordenados
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, dados):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = dados is not None
+        self._dados = dados
+    
+    def to_dict(self):
+        return dict(self._dados) if self._dados is not None else None
+    
+    def get(self, campo):
+        return self._dados.get(campo) if self._dados is not None else None
+
+class FakeDocumentReference:
+    def __init__(self, cliente, colecao, doc_id):
+        self._cliente = cliente
+        self._colecao = colecao
+        self.id = doc_id
+        self.path = f"{colecao.nome}/{doc_id}"
+    
+    def _snapshot(self, campos=None):
+        dados = self._colecao.docs.get(self.id)
+        if dados is not None and campos:
+            dados = {campo: dados[campo] for campo in campos if campo in dados}
+        return FakeDocumentSnapshot(self, dados)
+    
+    def get(self):
+        self._cliente._rpc()
+        with self._cliente._lock:
+            return self._snapshot()
+    
+    def set(self, dados):
+        batch = self._cliente.batch()
+        batch.set(self, dados)
+        batch.commit()
+    
+    def create(self, dados):
+        batch = self._cliente.batch()
+        batch.create(self, dados)
+        batch.commit()
+    
+    def update(self, dados):
+        batch = self._cliente.batch()
+        batch.update(self, dados)
+        batch.commit()
+    
+    def delete(self):
+        batch = self._cliente.batch()
+        batch.delete(self)
+        batch.commit()
+
+class FakeQuery:
+    def __init__(self, cliente, colecao, filtros=(), ordenar=False, campos=None, limite=None, apos=None):
+        self._cliente = cliente
+        self._colecao = colecao
+        self._filtros = filtros
+        self._ordenar = ordenar
+        self._campos = campos
+        self._limite = limite
+        self._apos = apos
+    
+    def _copia(self, **alteracoes):
+        atual = {
+            'filtros': self._filtros,
+            'ordenar': self._ordenar,
+            'campos': self._campos,
+            'limite': self._limite,
+            'apos': self._apos
+        }
+        atual.update(alteracoes)
+        return FakeQuery(self._cliente, self._colecao, **atual)
+    
+    def where(self, campo, operador, valor):
+        if operador != '==':
+            raise NotImplementedError(f"Operador não suportado pelo FakeFirestore: {operador}")
+        return self._copia(filtros=self._filtros + ((campo, valor),))
+    
+    def order_by(self, campo):
+        if campo != '__name__':
+            raise NotImplementedError("FakeFirestore só ordena pelo ID do documento ('__name__')")
+        return self._copia(ordenar=True)
+    
+    def select(self, campos):
+        return self._copia(campos=list(campos))
+    
+    def limit(self, limite):
+        return self._copia(limite=limite)
+    
+    def start_after(self, snapshot):
+        return self._copia(apos=snapshot.id)
+    
+    def _ids(self):
+        colecao = self._colecao
+        
+        if self._filtros:
+            candidatos = None
+            for campo, valor in self._filtros:
+                ids = set(colecao.indice(campo).get(valor, ()))
+                candidatos = ids if candidatos is None else candidatos & ids
+            ids = sorted(candidatos) if self._ordenar or self._apos is not None else list(candidatos)
+            if self._apos is not None:
+                ids = ids[bisect.bisect_right(ids, self._apos):]
+            return ids[:self._limite] if self._limite is not None else ids
+        
+        if self._ordenar or self._apos is not None:
+            ordenados = colecao.ordenados()
+            inicio = 0 if self._apos is None else bisect.bisect_right(ordenados, self._apos)
+            fim = len(ordenados) if self._limite is None else inicio + self._limite
+            return ordenados[inicio:fim]
+        
+        return list(itertools.islice(colecao.docs, self._limite))
+    
+    def get(self):
+        return list(self.stream())
+    
+    def stream(self):
+        # Uma RPC por consulta, como uma página do Firestore
+        self._cliente._rpc()
+        with self._cliente._lock:
+            snapshots = [
+                FakeDocumentReference(self._cliente, self._colecao, doc_id)._snapshot(self._campos)
+                for doc_id in self._ids()
+            ]
+        return iter(snapshots)
+    
+    def on_snapshot(self, callback):
+        raise NotImplementedError("FakeFirestore não oferece listener em tempo real")
+
+class FakeCollection(FakeQuery):
+    def __init__(self, cliente, colecao):
+        super().__init__(cliente, colecao)
+        self.id = colecao.nome
+    
+    def document(self, doc_id=None):
+        return FakeDocumentReference(self._cliente, self._colecao, doc_id or uuid.uuid4().hex)
+    
+    def add(self, dados):
+        ref = self.document()
+        ref.create(dados)
+        return None, ref
+
+class FakeWriteBatch:
+    """Batch atômico: qualquer create sobre documento existente recusa o commit inteiro"""
+    
+    def __init__(self, cliente):
+        self._cliente = cliente
+        self._operacoes = []
+    
+    def create(self, referencia, dados):
+        self._operacoes.append(('create', referencia, dict(dados)))
+    
+    def set(self, referencia, dados):
+        self._operacoes.append(('set', referencia, dict(dados)))
+    
+    def update(self, referencia, dados):
+        self._operacoes.append(('update', referencia, dict(dados)))
+    
+    def delete(self, referencia):
+        self._operacoes.append(('delete', referencia, None))
+    
+    def commit(self):
+        self._cliente._rpc()
+        
+        with self._cliente._lock:
+            criados = set()
+            for tipo, ref, _ in self._operacoes:
+                existe = ref.id in ref._colecao.docs or ref.path in criados
+                if tipo == 'create':
+                    if existe:
+                        raise AlreadyExists(f"Document already exists: {ref.path}")
+                    criados.add(ref.path)
+                elif tipo == 'update' and not existe:
+                    raise NotFound(f"No document to update: {ref.path}")
+            
+            for tipo, ref, dados in self._operacoes:
+                if tipo == 'delete':
+                    ref._colecao.excluir(ref.id)
+                elif tipo == 'update':
+                    atual = dict(ref._colecao.docs.get(ref.id, {}))
+                    atual.update(dados)
+                    ref._colecao.gravar(ref.id, atual)
+                else:
+                    ref._colecao.gravar(ref.id, dados)
+        
+        self._operacoes = []
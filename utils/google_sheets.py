@@ -1,15 +1,24 @@
 import os
 import pickle
+import random
+import re
+import threading
+import time
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
 class GoogleSheetsAPI:
     def __init__(self, spreadsheet_id, credentials_file='credentials.json', token_file='token.pickle'):
         self.spreadsheet_id = spreadsheet_id
         self.credentials_file = credentials_file
         self.token_file = token_file
+        self.creds = None
         self.service = self.authenticate()
+        self._fila_append = None
+        self._fila_lock = threading.Lock()
+        self._snapshots = {}  # range -> {'linhas': quantidade lida, 'frame': DataFrame}
     
     def authenticate(self):
         """Autentica com a API do Google Sheets"""
@@ -34,7 +43,12 @@ class GoogleSheetsAPI:
             with open(self.token_file, 'wb') as token:
                 pickle.dump(creds, token)
         
-        return build('sheets', 'v4', credentials=creds)
+        self.creds = creds
+        return self.build_service()
+    
+    def build_service(self):
+        """Novo cliente da API; o cliente HTTP não deve ser compartilhado entre threads"""
+        return build('sheets', 'v4', credentials=self.creds)
     
     def append_row(self, range_name, values):
         """Adiciona uma nova linha na planilha"""
@@ -54,6 +68,46 @@ class GoogleSheetsAPI:
         except Exception as e:
             return False, f"Erro ao adicionar linha: {str(e)}"
     
+    def append_rows(self, range_name, rows):
+        """Adiciona várias linhas na planilha numa única chamada"""
+        try:
+            self.service.spreadsheets().values().append(
+                spreadsheetId=self.spreadsheet_id,
+                range=range_name,
+                valueInputOption='RAW',
+                insertDataOption='INSERT_ROWS',
+                body={'values': rows}
+            ).execute()
+            
+            return True, f"{len(rows)} linhas adicionadas com sucesso"
+        except Exception as e:
+            return False, f"Erro ao adicionar linhas: {str(e)}"
+    
+    def append_row_async(self, range_name, values):
+        """Enfileira a linha para envio em lote e retorna imediatamente"""
+        try:
+            self.append_queue().adicionar(range_name, values)
+        except RuntimeError as e:
+            # Fila encerrada por close(): mesmo formato de erro do append síncrono
+            return False, str(e)
+        return True, "Linha enfileirada"
+    
+    def append_queue(self):
+        with self._fila_lock:
+            if self._fila_append is None:
+                self._fila_append = FilaAppendSheets(self)
+            return self._fila_append
+    
+    def flush(self, timeout=None):
+        """Envia as linhas enfileiradas e aguarda a conclusão"""
+        if self._fila_append is not None:
+            return self._fila_append.flush(timeout)
+        return True
+    
+    def close(self):
+        if self._fila_append is not None:
+            self._fila_append.close()
+    
     def get_data(self, range_name):
         """Obtém dados da planilha"""
         try:
@@ -65,4 +119,286 @@ class GoogleSheetsAPI:
             return result.get('values', [])
         except Exception as e:
             print(f"Erro ao obter dados: {e}")
-            return []
\ No newline at end of file
+            return []
+    
+    def get_dataframe(self, range_name, incremental=True):
+        """DataFrame tipado do range, com as colunas do DatabaseManager"""
+        return self.get_dataframes([range_name], incremental)[range_name]
+    
+    def get_dataframes(self, ranges, incremental=True):
+        """Lê vários ranges numa única chamada batchGet, mantendo um snapshot por range.
+        
+        Com incremental=True, ranges já lidos buscam apenas as linhas após as
+        conhecidas (válido para ranges append-only, em que linhas só são
+        acrescentadas ao final). Use invalidar_cache() após edições no meio.
+        Abas inteiras e ranges ambíguos são sempre relidos por completo; se a
+        leitura incremental falhar, os ranges são relidos inteiros e um erro
+        nessa releitura é propagado (o snapshot antigo não é servido calado).
+        """
+        pedidos = {}  # range -> (range pedido à API, só a cauda?)
+        for range_name in ranges:
+            snapshot = self._snapshots.get(range_name) if incremental else None
+            match = _analisar_a1(range_name) if snapshot is not None else None
+            
+            if match is None:
+                pedidos[range_name] = (range_name, False)
+            else:
+                cauda = _range_cauda(match, snapshot['linhas'])
+                if cauda is not None:
+                    pedidos[range_name] = (cauda, True)
+        
+        if pedidos:
+            try:
+                self._ler_ranges(pedidos)
+            except Exception as e:
+                if not any(so_cauda for _, so_cauda in pedidos.values()):
+                    raise
+                print(f"Leitura incremental falhou ({e}); relendo os ranges completos")
+                self._ler_ranges({range_name: (range_name, False) for range_name in pedidos})
+        
+        frames = {}
+        for range_name in ranges:
+            snapshot = self._snapshots.get(range_name)
+            frames[range_name] = snapshot['frame'] if snapshot else _para_dataframe([], [])
+        return frames
+    
+    def _ler_ranges(self, pedidos):
+        result = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[pedido for pedido, _ in pedidos.values()]
+        ).execute()
+        
+        for (range_name, (_, so_cauda)), value_range in zip(pedidos.items(), result.get('valueRanges', [])):
+            self._atualizar_snapshot(range_name, value_range.get('values', []), so_cauda)
+    
+    def invalidar_cache(self, range_name=None):
+        if range_name is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(range_name, None)
+    
+    def _atualizar_snapshot(self, range_name, valores, incremental):
+        import pandas as pd
+        
+        snapshot = self._snapshots.get(range_name) if incremental else None
+        
+        if snapshot is None:
+            cabecalho = _mapear_cabecalho(valores[0]) if valores else []
+            self._snapshots[range_name] = {
+                'linhas': len(valores),
+                'cabecalho': cabecalho,
+                'frame': _para_dataframe(cabecalho, valores[1:])
+            }
+            return
+        
+        if not valores:
+            return
+        
+        cauda = _para_dataframe(snapshot['cabecalho'], valores)
+        snapshot['frame'] = _tipar(pd.concat([snapshot['frame'], cauda], ignore_index=True))
+        snapshot['linhas'] += len(valores)
+
+# Colunas de 1 a 3 letras (A..ZZZ), como no Sheets
+_A1 = re.compile(r"^(?:(?P<aba>.+)!)?(?P<col1>[A-Za-z]{1,3})(?P<lin1>\d*)(?::(?P<col2>[A-Za-z]{1,3})(?P<lin2>\d*))?$")
+
+# Colunas tratadas como categoria; as demais ficam como texto
+_COLUNAS_CATEGORIA = ('PERFIL', 'STATUS')
+
+def _analisar_a1(range_name):
+    """Match do range A1 que permite pedir só a cauda; None para aba inteira ou range ambíguo"""
+    match = _A1.match(range_name.strip())
+    if match is None:
+        return None
+    
+    # Sem aba, 'Abc' tanto pode ser coluna quanto nome de aba: exige célula ou intervalo
+    if not match.group('aba') and not (match.group('lin1') or match.group('col2')):
+        return None
+    return match
+
+def _range_cauda(match, linhas_lidas):
+    """Range A1 com as linhas após as já lidas, ou None se o range acabou"""
+    inicio = int(match.group('lin1') or 1) + linhas_lidas
+    col2 = match.group('col2') or match.group('col1')
+    fim = match.group('lin2')
+    
+    if fim and inicio > int(fim):
+        return None
+    
+    prefixo = f"{match.group('aba')}!" if match.group('aba') else ''
+    return f"{prefixo}{match.group('col1')}{inicio}:{col2}{fim or ''}"
+
+def _mapear_cabecalho(cabecalho):
+    """Aplica o mapeamento de colunas do DatabaseManager ('login' -> 'LOGIN' etc.)"""
+    from models.database import COLUNAS
+    
+    conhecidas = set(COLUNAS.values())
+    mapeado = []
+    for coluna in cabecalho:
+        nome = str(coluna).strip()
+        if nome in COLUNAS:
+            nome = COLUNAS[nome]
+        elif nome.upper() in conhecidas:
+            nome = nome.upper()
+        mapeado.append(nome)
+    return mapeado
+
+def _para_dataframe(cabecalho, linhas):
+    import pandas as pd
+    
+    # A API omite células vazias no final da linha
+    largura = len(cabecalho)
+    linhas = [list(linha[:largura]) + [''] * (largura - len(linha)) for linha in linhas]
+    return _tipar(pd.DataFrame(linhas, columns=cabecalho, dtype=object))
+
+def _tipar(frame):
+    for coluna in _COLUNAS_CATEGORIA:
+        if coluna in frame.columns:
+            frame[coluna] = frame[coluna].astype('category')
+    return frame
+
+class FilaAppendSheets:
+    """Acumula linhas e as envia em um único append por range.
+    
+    O envio acontece numa thread própria quando a fila atinge max_linhas ou
+    quando a linha mais antiga espera mais que intervalo segundos. Erros 429
+    e 5xx são repetidos com backoff exponencial.
+    """
+    
+    STATUS_REPETIVEIS = (429, 500, 502, 503, 504)
+    
+    def __init__(self, api, max_linhas=500, intervalo=2.0, max_tentativas=5,
+                 backoff_inicial=1.0, backoff_maximo=32.0, on_erro=None):
+        self.api = api
+        self.max_linhas = max_linhas
+        self.intervalo = intervalo
+        self.max_tentativas = max_tentativas
+        self.backoff_inicial = backoff_inicial
+        self.backoff_maximo = backoff_maximo
+        self.on_erro = on_erro
+        
+        self.enviadas = 0
+        self.falhas = []  # (range, linhas, erro)
+        
+        self._pendentes = {}  # range -> linhas
+        self._total_pendente = 0
+        self._primeira_em = None
+        self._em_envio = 0
+        self._flush_pedido = False
+        self._encerrar = False
+        self._cond = threading.Condition()
+        self._thread = None
+    
+    def adicionar(self, range_name, values):
+        with self._cond:
+            if self._encerrar:
+                raise RuntimeError("Fila de append encerrada")
+            
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name='sheets-append', daemon=True)
+                self._thread.start()
+            
+            self._pendentes.setdefault(range_name, []).append(list(values))
+            self._total_pendente += 1
+            if self._primeira_em is None:
+                self._primeira_em = time.monotonic()
+            
+            if self._total_pendente >= self.max_linhas:
+                self._cond.notify_all()
+    
+    def pendentes(self):
+        with self._cond:
+            return self._total_pendente + self._em_envio
+    
+    def flush(self, timeout=None):
+        """Força o envio imediato; retorna False se o timeout expirar antes"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        
+        with self._cond:
+            if self._thread is None:
+                return True
+            
+            self._flush_pedido = True
+            self._cond.notify_all()
+            
+            while self._total_pendente or self._em_envio:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                self._cond.wait(restante)
+            return True
+    
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self._cond:
+            self._encerrar = True
+            self._cond.notify_all()
+    
+    def _pronto_para_enviar(self):
+        if not self._total_pendente:
+            return False
+        if self._flush_pedido or self._encerrar or self._total_pendente >= self.max_linhas:
+            return True
+        return time.monotonic() - self._primeira_em >= self.intervalo
+    
+    def _loop(self):
+        # Cliente próprio: o httplib2 do cliente principal não é thread-safe
+        service = self.api.build_service()
+        
+        while True:
+            with self._cond:
+                while not self._pronto_para_enviar():
+                    if self._encerrar:
+                        return
+                    
+                    espera = None
+                    if self._primeira_em is not None:
+                        espera = max(0.0, self.intervalo - (time.monotonic() - self._primeira_em))
+                    self._cond.wait(espera)
+                
+                lote = self._pendentes
+                self._em_envio = self._total_pendente
+                self._pendentes = {}
+                self._total_pendente = 0
+                self._primeira_em = None
+                self._flush_pedido = False
+            
+            for range_name, linhas in lote.items():
+                self._enviar(service, range_name, linhas)
+            
+            with self._cond:
+                self._em_envio = 0
+                self._cond.notify_all()
+    
+    def _enviar(self, service, range_name, linhas):
+        espera = self.backoff_inicial
+        
+        for tentativa in range(1, self.max_tentativas + 1):
+            try:
+                service.spreadsheets().values().append(
+                    spreadsheetId=self.api.spreadsheet_id,
+                    range=range_name,
+                    valueInputOption='RAW',
+                    insertDataOption='INSERT_ROWS',
+                    body={'values': linhas}
+                ).execute()
+                
+                self.enviadas += len(linhas)
+                return
+            except HttpError as e:
+                status = getattr(e.resp, 'status', None)
+                if status not in self.STATUS_REPETIVEIS or tentativa == self.max_tentativas:
+                    self._registrar_falha(range_name, linhas, e)
+                    return
+            except Exception as e:
+                self._registrar_falha(range_name, linhas, e)
+                return
+            
+            # Backoff exponencial com jitter
+            time.sleep(espera * (0.5 + random.random() / 2))
+            espera = min(espera * 2, self.backoff_maximo)
+    
+    def _registrar_falha(self, range_name, linhas, erro):
+        self.falhas.append((range_name, linhas, str(erro)))
+        print(f"Erro ao enviar {len(linhas)} linhas para {range_name}: {erro}")
+        if self.on_erro:
+            self.on_erro(range_name, linhas, erro)
\ No newline at end of file
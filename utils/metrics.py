@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import settings
+
+# Histogramas no estilo HDR: 32 faixas por potência de 2 (erro relativo < 3%),
+# valores em microssegundos, de 1 µs a horas com memória proporcional às faixas usadas
+_SUB_BITS = 5
+_SUB_FAIXAS = 1 << _SUB_BITS
+
+def _indice(micros):
+    if micros < 2 * _SUB_FAIXAS:
+        return micros
+    deslocamento = micros.bit_length() - _SUB_BITS - 1
+    return (deslocamento << _SUB_BITS) + (micros >> deslocamento)
+
+def _limite_superior(indice):
+    """Maior valor (µs) que cai na faixa do índice"""
+    if indice < 2 * _SUB_FAIXAS:
+        return indice
+    deslocamento = (indice >> _SUB_BITS) - 1
+    mantissa = indice - (deslocamento << _SUB_BITS)
+    return ((mantissa + 1) << deslocamento) - 1
+
+class Histograma:
+    """Histograma de latências com faixas logarítmicas; seguro entre threads"""
+    
+    def __init__(self):
+        self.contagens = {}
+        self.total = 0
+        self.soma = 0.0
+        self.minimo = None
+        self.maximo = None
+        self._lock = threading.Lock()
+    
+    def registrar(self, segundos):
+        indice = _indice(max(0, int(segundos * 1_000_000)))
+        with self._lock:
+            self.contagens[indice] = self.contagens.get(indice, 0) + 1
+            self.total += 1
+            self.soma += segundos
+            if self.minimo is None or segundos < self.minimo:
+                self.minimo = segundos
+            if self.maximo is None or segundos > self.maximo:
+                self.maximo = segundos
+    
+    def percentil(self, p):
+        """Valor (segundos) abaixo do qual estão p% das amostras"""
+        with self._lock:
+            if not self.total:
+                return 0.0
+            alvo = max(1, round(p / 100 * self.total))
+            acumulado = 0
+            for indice in sorted(self.contagens):
+                acumulado += self.contagens[indice]
+                if acumulado >= alvo:
+                    return min(_limite_superior(indice) / 1_000_000, self.maximo)
+        return self.maximo
+    
+    def resumo(self):
+        return {
+            'total': self.total,
+            'soma_s': round(self.soma, 6),
+            'media_ms': round(self.soma / self.total * 1000, 3) if self.total else 0.0,
+            'p50_ms': round(self.percentil(50) * 1000, 3),
+            'p90_ms': round(self.percentil(90) * 1000, 3),
+            'p99_ms': round(self.percentil(99) * 1000, 3),
+            'p999_ms': round(self.percentil(99.9) * 1000, 3),
+            'max_ms': round((self.maximo or 0.0) * 1000, 3)
+        }
+
+class Registro:
+    """Conjunto de histogramas e contadores identificados por nome e rótulos"""
+    
+    def __init__(self, ativo=True):
+        self.ativo = ativo
+        self.histogramas = {}
+        self.contadores = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _chave(nome, rotulos):
+        return nome, tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+    
+    def histograma(self, nome, **rotulos):
+        chave = self._chave(nome, rotulos)
+        histograma = self.histogramas.get(chave)
+        if histograma is None:
+            with self._lock:
+                histograma = self.histogramas.setdefault(chave, Histograma())
+        return histograma
+    
+    def registrar(self, nome, segundos, **rotulos):
+        if self.ativo:
+            self.histograma(nome, **rotulos).registrar(segundos)
+    
+    def contar(self, nome, quantidade=1, **rotulos):
+        if not self.ativo:
+            return
+        chave = self._chave(nome, rotulos)
+        with self._lock:
+            self.contadores[chave] = self.contadores.get(chave, 0) + quantidade
+    
+    @contextmanager
+    def span(self, nome, **rotulos):
+        """Cronometra o bloco; exceções contam como erro em <nome>_erros"""
+        if not self.ativo:
+            yield
+            return
+        
+        inicio = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.contar(f"{nome}_erros", **rotulos)
+            raise
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio, **rotulos)
+    
+    def limpar(self):
+        with self._lock:
+            self.histogramas.clear()
+            self.contadores.clear()
+    
+    # Exportação
+    
+    def resumo(self):
+        """Lista de dicts com nome, rótulos e percentis de cada histograma"""
+        with self._lock:
+            itens = sorted(self.histogramas.items())
+        return [
+            dict(nome=nome, rotulos=dict(rotulos), **histograma.resumo())
+            for (nome, rotulos), histograma in itens
+        ]
+    
+    def exportar_json(self):
+        with self._lock:
+            contadores = sorted(self.contadores.items())
+        return json.dumps({
+            'gerado_em': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'histogramas': self.resumo(),
+            'contadores': [
+                {'nome': nome, 'rotulos': dict(rotulos), 'valor': valor}
+                for (nome, rotulos), valor in contadores
+            ]
+        }, ensure_ascii=False, indent=2)
+    
+    def exportar_prometheus(self, prefixo='averbsys'):
+        """Formato texto do Prometheus: histogramas viram summaries em segundos"""
+        linhas = []
+        with self._lock:
+            histogramas = sorted(self.histogramas.items())
+            contadores = sorted(self.contadores.items())
+        
+        declarados = set()
+        for (nome, rotulos), histograma in histogramas:
+            metrica = _nome_prometheus(prefixo, nome) + '_seconds'
+            if metrica not in declarados:
+                linhas.append(f"# TYPE {metrica} summary")
+                declarados.add(metrica)
+            
+            for quantil in (0.5, 0.9, 0.99, 0.999):
+                valor = histograma.percentil(quantil * 100)
+                linhas.append(f"{metrica}{_rotulos(rotulos, quantile=quantil)} {valor:.6f}")
+            linhas.append(f"{metrica}_sum{_rotulos(rotulos)} {histograma.soma:.6f}")
+            linhas.append(f"{metrica}_count{_rotulos(rotulos)} {histograma.total}")
+        
+        for (nome, rotulos), valor in contadores:
+            metrica = _nome_prometheus(prefixo, nome) + '_total'
+            if metrica not in declarados:
+                linhas.append(f"# TYPE {metrica} counter")
+                declarados.add(metrica)
+            linhas.append(f"{metrica}{_rotulos(rotulos)} {valor}")
+        
+        return '\n'.join(linhas) + '\n'
+    
+    def salvar(self, caminho):
+        """Grava em JSON se o caminho terminar em .json, senão no formato do Prometheus"""
+        conteudo = self.exportar_json() if caminho.endswith('.json') else self.exportar_prometheus()
+        temporario = caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho)
+    
+    def servir(self, porta, endereco='127.0.0.1'):
+        """Endpoint HTTP /metrics no formato do Prometheus, numa thread daemon"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registro = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_error(404)
+                    return
+                
+                corpo = registro.exportar_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+            
+            def log_message(self, *args):
+                pass
+        
+        servidor = ThreadingHTTPServer((endereco, porta), Handler)
+        threading.Thread(target=servidor.serve_forever, name='metricas-http', daemon=True).start()
+        return servidor
+
+def _nome_prometheus(prefixo, nome):
+    return f"{prefixo}_{nome}".replace('.', '_').replace('-', '_')
+
+def _rotulos(rotulos, **extras):
+    pares = list(rotulos) + [(chave, str(valor)) for chave, valor in extras.items()]
+    if not pares:
+        return ''
+    escapados = (
+        f'{chave}="' + valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for chave, valor in pares
+    )
+    return '{' + ','.join(escapados) + '}'
+
+# Registro global usado pela instrumentação do app
+metricas = Registro(ativo=settings.METRICAS_ATIVAS)
+
+def iniciar_exportacao(registro=None):
+    """Liga a exportação configurada: arquivo periódico e/ou endpoint HTTP.
+    
+    Retorna uma função que grava o arquivo uma última vez (para o aboutToQuit).
+    """
+    registro = registro or metricas
+    if not registro.ativo:
+        return lambda: None
+    
+    if settings.METRICAS_PORTA:
+        registro.servir(settings.METRICAS_PORTA)
+        print(f"📈 Métricas em http://127.0.0.1:{settings.METRICAS_PORTA}/metrics")
+    
+    caminho = settings.METRICAS_ARQUIVO
+    if not caminho:
+        return lambda: None
+    
+    parar = threading.Event()
+    
+    def gravar_periodicamente():
+        while not parar.wait(settings.METRICAS_INTERVALO):
+            try:
+                registro.salvar(caminho)
+            except OSError as e:
+                print(f"Erro ao gravar métricas: {e}")
+    
+    threading.Thread(target=gravar_periodicamente, name='metricas-arquivo', daemon=True).start()
+    
+    def finalizar():
+        parar.set()
+        registro.salvar(caminho)
+    
+    return finalizar
@@ -0,0 +1,278 @@
+import random
+import unicodedata
+
+# Partículas ignoradas na comparação: "José da Silva" e "José Silva" são a mesma pessoa
+PARTICULAS = frozenset(('da', 'das', 'de', 'do', 'dos', 'e'))
+
+# MinHash com LSH: BANDAS grupos de LINHAS valores; nomes que coincidem numa banda viram candidatos.
+# Com 20 x 5, pares com similaridade 0.7 são encontrados em ~97% dos casos e pares de 0.3 em ~5%
+TAMANHO_GRAMA = 3
+BANDAS = 20
+LINHAS = 5
+PERMUTACOES = BANDAS * LINHAS
+
+# Hash multiplicativo a*x + b (mod 2^64) >> 32 por permutação, com sementes fixas
+_rng = random.Random(20240601)
+_COEFICIENTES = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(PERMUTACOES)]
+
+# Mistura dos valores de uma banda numa chave de 64 bits
+_MISTURA = [_rng.getrandbits(64) | 1 for _ in range(LINHAS)]
+
+_SEM_CODIGO = (1 << 64) - 1
+
+def normalizar_nome(nome):
+    """Minúsculas, sem acentos e com espaços simples: nomes com a mesma chave são equivalentes"""
+    texto = str(nome or '')
+    if not texto.isascii():
+        decomposto = unicodedata.normalize('NFKD', texto)
+        texto = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(texto.casefold().split())
+
+def forma_comparacao(nome):
+    """Nome normalizado sem partículas: o que o índice compara"""
+    palavras = normalizar_nome(nome).split(' ')
+    return ' '.join([p for p in palavras if p not in PARTICULAS] or palavras)
+
+def descrever_semelhantes(parecidos):
+    """Aviso para o cadastro a partir de [(nome, similaridade)]; equivalentes (1.0) vêm à parte"""
+    equivalentes = [nome for nome, similaridade in parecidos if similaridade >= 1.0]
+    outros = [nome for nome, similaridade in parecidos if similaridade < 1.0]
+    avisos = []
+    if equivalentes:
+        avisos.append("Atenção: já existe o mesmo nome com outra grafia: " + ", ".join(equivalentes))
+    if outros:
+        avisos.append("Atenção: já existe nome parecido: " + ", ".join(outros))
+    return "\n".join(avisos)
+
+def _gramas(forma):
+    texto = f" {forma} "
+    if len(texto) <= TAMANHO_GRAMA:
+        return {texto}
+    return {texto[i:i + TAMANHO_GRAMA] for i in range(len(texto) - TAMANHO_GRAMA + 1)}
+
+def _jaccard(ga, gb):
+    comuns = len(ga & gb)
+    return comuns / (len(ga) + len(gb) - comuns) if comuns else 0.0
+
+def similaridade(a, b):
+    """Jaccard dos n-gramas de caracteres de dois nomes (1.0 para nomes equivalentes)"""
+    return _jaccard(_gramas(forma_comparacao(a)), _gramas(forma_comparacao(b)))
+
+def _matriz_codigos(formas):
+    """Códigos dos n-gramas (uma linha por nome) e a máscara das posições válidas"""
+    import numpy as np
+    
+    textos = [f" {forma} " for forma in formas]
+    largura = max(max(len(t) for t in textos), TAMANHO_GRAMA)
+    pontos = np.array(textos, dtype=f'U{largura}').view(np.uint32).reshape(len(textos), largura).astype(np.uint64)
+    
+    # Três code points (< 2^21) por n-grama; posições além do fim do texto ficam de fora
+    quantidade = np.maximum(np.array([len(t) for t in textos]) - TAMANHO_GRAMA + 1, 1)
+    posicoes = largura - TAMANHO_GRAMA + 1
+    codigos = np.zeros((len(textos), posicoes), dtype=np.uint64)
+    for deslocamento in range(TAMANHO_GRAMA):
+        codigos = (codigos << np.uint64(21)) | pontos[:, deslocamento:deslocamento + posicoes]
+    return codigos, np.arange(posicoes) < quantidade[:, None]
+
+def _similaridades(forma, candidatas):
+    """Jaccard de uma forma com cada candidata, em lote; mesmo resultado de _jaccard sobre _gramas"""
+    import numpy as np
+    
+    codigos, validos = _matriz_codigos([forma] + candidatas)
+    
+    # N-gramas repetidos no mesmo nome contam uma vez, como nos conjuntos
+    codigos = np.where(validos, codigos, np.uint64(_SEM_CODIGO))
+    codigos.sort(axis=1)
+    codigos[:, 1:][codigos[:, 1:] == codigos[:, :-1]] = _SEM_CODIGO
+    unicos = codigos != _SEM_CODIGO
+    
+    consulta = codigos[0][unicos[0]]
+    comuns = (np.isin(codigos[1:], consulta) & unicos[1:]).sum(axis=1)
+    return comuns / (len(consulta) + unicos[1:].sum(axis=1) - comuns)
+
+def chaves_bandas(formas, tamanho_bloco=4000):
+    """Matriz (nomes x BANDAS) com a chave de 64 bits de cada banda da assinatura MinHash"""
+    import numpy as np
+    
+    a = np.array([c[0] for c in _COEFICIENTES], dtype=np.uint64)
+    b = np.array([c[1] for c in _COEFICIENTES], dtype=np.uint64)
+    mistura = np.array(_MISTURA, dtype=np.uint64)
+    blocos = []
+    
+    for inicio in range(0, len(formas), tamanho_bloco):
+        codigos, validos = _matriz_codigos(formas[inicio:inicio + tamanho_bloco])
+        inicios = np.concatenate(([0], np.cumsum(validos.sum(axis=1))[:-1]))
+        
+        with np.errstate(over='ignore'):
+            # Todas as permutações de uma vez: (PERMUTACOES x n-gramas), mínimo por nome
+            hashes = np.multiply.outer(a, codigos[validos])
+            hashes += b[:, None]
+            hashes >>= np.uint64(32)
+            valores = np.minimum.reduceat(hashes, inicios, axis=1).T
+            
+            chaves = np.zeros((len(codigos), BANDAS), dtype=np.uint64)
+            for linha in range(LINHAS):
+                chaves ^= valores[:, linha::LINHAS] * mistura[linha]
+        blocos.append(chaves)
+    
+    if not blocos:
+        return np.zeros((0, BANDAS), dtype=np.uint64)
+    return np.concatenate(blocos)
+
+class IndiceNomes:
+    """Índice de nomes para localizar quase-duplicados sem comparar todos os pares.
+    
+    Cada forma de comparação entra nos baldes de LSH das suas bandas, com a lista
+    dos nomes como foram cadastrados; a consulta só compara os nomes que dividem
+    algum balde e confirma a similaridade pelos n-gramas. A carga inicial fica em
+    arrays ordenados por chave (uma busca binária por banda) e os nomes
+    acrescentados depois, em dicts. Nomes removidos da carga inicial saem apenas
+    de _originais e são ignorados nos baldes.
+    """
+    
+    def __init__(self, nomes=()):
+        self._originais = {}   # forma -> nomes como foram cadastrados (um por registro)
+        self._carga = []       # formas da carga inicial, na ordem das posições dos arrays
+        self._ordenados = []   # por banda: (chaves ordenadas, posições em _carga)
+        self._extras = [{} for _ in range(BANDAS)]
+        self._chaves_extras = {}  # forma -> chaves nos dicts de extras
+        
+        nomes = list(nomes)
+        if nomes:
+            self.adicionar_varios(nomes)
+    
+    def __len__(self):
+        return len(self._originais)
+    
+    def __contains__(self, nome):
+        return forma_comparacao(nome) in self._originais
+    
+    def adicionar(self, nome):
+        self.adicionar_varios([nome])
+    
+    def adicionar_varios(self, nomes):
+        """Acrescenta registros; assinaturas dos nomes novos calculadas em lote"""
+        novos = {}
+        for nome in nomes:
+            forma = forma_comparacao(nome)
+            if not forma:
+                continue
+            if forma in self._originais:
+                self._originais[forma].append(str(nome).strip())
+            else:
+                novos.setdefault(forma, []).append(str(nome).strip())
+        
+        if not novos:
+            return
+        
+        self._originais.update(novos)
+        formas = list(novos)
+        chaves = chaves_bandas(formas)
+        
+        if not self._carga and len(formas) > 1:
+            import numpy as np
+            
+            self._carga = formas
+            for banda in range(BANDAS):
+                ordem = np.argsort(chaves[:, banda], kind='stable')
+                self._ordenados.append((chaves[ordem, banda], ordem))
+            return
+        
+        for forma, linha in zip(formas, chaves.tolist()):
+            self._chaves_extras[forma] = linha
+            for extras, chave in zip(self._extras, linha):
+                extras.setdefault(chave, []).append(forma)
+    
+    def remover(self, nome):
+        """Retira um registro com esse nome; sem registros, o nome deixa de ser candidato"""
+        forma = forma_comparacao(nome)
+        originais = self._originais.get(forma)
+        if originais is None:
+            return
+        
+        original = str(nome).strip()
+        originais.remove(original if original in originais else originais[0])
+        if originais:
+            return
+        
+        del self._originais[forma]
+        for extras, chave in zip(self._extras, self._chaves_extras.pop(forma, ())):
+            balde = extras[chave]
+            balde.remove(forma)
+            if not balde:
+                del extras[chave]
+    
+    def _balde(self, banda, chave):
+        """Formas ainda cadastradas que têm a chave na banda"""
+        formas = list(self._extras[banda].get(int(chave), ()))
+        if self._ordenados:
+            ordenadas, posicoes = self._ordenados[banda]
+            inicio = ordenadas.searchsorted(chave, 'left')
+            fim = ordenadas.searchsorted(chave, 'right')
+            formas.extend(self._carga[p] for p in posicoes[inicio:fim].tolist())
+        return [forma for forma in dict.fromkeys(formas) if forma in self._originais]
+    
+    def semelhantes(self, nome, limiar=0.7, limite=5):
+        """[(nome cadastrado, similaridade)] dos nomes parecidos, do mais ao menos parecido"""
+        forma = forma_comparacao(nome)
+        if not forma:
+            return []
+        
+        chaves = chaves_bandas([forma])[0]
+        candidatas = set()
+        for banda in range(BANDAS):
+            candidatas.update(self._balde(banda, chaves[banda]))
+        if not candidatas:
+            return []
+        
+        candidatas = list(candidatas)
+        encontrados = [
+            (self._originais[candidata][0], round(valor, 3))
+            for candidata, valor in zip(candidatas, _similaridades(forma, candidatas).tolist())
+            if valor >= limiar
+        ]
+        encontrados.sort(key=lambda item: (-item[1], item[0]))
+        return encontrados[:limite]
+    
+    def _baldes_multiplos(self, banda):
+        """Baldes da banda com mais de um nome: sequências repetidas do array ordenado e dos extras"""
+        import numpy as np
+        
+        # Toda chave dos extras pode completar um balde de um único nome da carga
+        chaves = set(self._extras[banda])
+        if self._ordenados:
+            ordenadas, _ = self._ordenados[banda]
+            limites = np.concatenate(([0], np.flatnonzero(np.diff(ordenadas)) + 1, [len(ordenadas)]))
+            chaves.update(ordenadas[limites[:-1][np.diff(limites) > 1]].tolist())
+        
+        for chave in chaves:
+            balde = self._balde(banda, np.uint64(chave))
+            if len(balde) > 1:
+                yield balde
+    
+    def grupos(self, limiar=0.7):
+        """Grupos de registros com nomes iguais ou parecidos, percorrendo só os baldes com mais de um nome"""
+        # Union-find: pares já no mesmo grupo não são comparados de novo
+        pai = {forma: forma for forma, originais in self._originais.items() if len(originais) > 1}
+        
+        def raiz(forma):
+            while pai.get(forma, forma) != forma:
+                pai[forma] = pai.get(pai[forma], pai[forma])
+                forma = pai[forma]
+            return forma
+        
+        for banda in range(BANDAS):
+            for balde in self._baldes_multiplos(banda):
+                conjuntos = [_gramas(forma) for forma in balde]
+                for i, a in enumerate(balde):
+                    for j in range(i + 1, len(balde)):
+                        ra, rb = raiz(a), raiz(balde[j])
+                        if ra != rb and _jaccard(conjuntos[i], conjuntos[j]) >= limiar:
+                            pai.setdefault(ra, ra)
+                            pai[rb] = ra
+        
+        membros = {}
+        for forma in pai:
+            membros.setdefault(raiz(forma), []).extend(self._originais[forma])
+        
+        return sorted((sorted(grupo) for grupo in membros.values()), key=lambda g: (-len(g), g[0]))
@@ -0,0 +1,249 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from config import settings
+from utils.metrics import metricas
+
+# Formato armazenado: scrypt$<log2 de N>$<r>$<p>$<sal base64>$<hash base64>
+PREFIXO = 'scrypt'
+BLOCO_R = 8
+PARALELISMO_P = 1
+TAMANHO_SAL = 16
+TAMANHO_HASH = 32
+
+# Faixa aceita na calibração: 2^14 usa 16 MB por hash, 2^20 usa 1 GB
+CUSTO_MINIMO = 14
+CUSTO_MAXIMO = 20
+
+def _b64(dados):
+    return base64.b64encode(dados).decode('ascii').rstrip('=')
+
+def _de_b64(texto):
+    return base64.b64decode(texto + '=' * (-len(texto) % 4))
+
+def _scrypt(senha, sal, custo, r=BLOCO_R, p=PARALELISMO_P, tamanho=TAMANHO_HASH):
+    n = 1 << custo
+    return hashlib.scrypt(
+        senha.encode('utf-8'), salt=sal, n=n, r=r, p=p,
+        maxmem=128 * r * (n + p + 2) + 2 ** 20, dklen=tamanho
+    )
+
+def gerar_hash(senha, custo=None):
+    """Hash scrypt da senha no formato armazenado; custo é log2 de N"""
+    custo = custo_atual() if custo is None else custo
+    sal = os.urandom(TAMANHO_SAL)
+    digest = _scrypt(senha, sal, custo)
+    return f"{PREFIXO}${custo}${BLOCO_R}${PARALELISMO_P}${_b64(sal)}${_b64(digest)}"
+
+def eh_hash(armazenado):
+    return isinstance(armazenado, str) and armazenado.startswith(PREFIXO + '$')
+
+def conferir_senha(senha, armazenado):
+    """Confere a senha com o valor armazenado: hash scrypt ou texto puro legado"""
+    if not armazenado or senha is None:
+        return False
+    
+    if not eh_hash(armazenado):
+        return hmac.compare_digest(senha.encode('utf-8'), str(armazenado).encode('utf-8'))
+    
+    try:
+        _, custo, r, p, sal, digest = armazenado.split('$')
+        esperado = _de_b64(digest)
+        calculado = _scrypt(senha, _de_b64(sal), int(custo), int(r), int(p), len(esperado))
+    except (ValueError, binascii.Error):
+        return False
+    return hmac.compare_digest(calculado, esperado)
+
+def custo_do_hash(armazenado):
+    """Custo gravado no hash, ou None para texto puro e valores inválidos"""
+    if not eh_hash(armazenado):
+        return None
+    try:
+        return int(armazenado.split('$')[1])
+    except (IndexError, ValueError):
+        return None
+
+def precisa_rehash(armazenado, custo=None):
+    """Texto puro ou custo abaixo do atual: a senha deve ser regravada no próximo login"""
+    custo_gravado = custo_do_hash(armazenado)
+    return custo_gravado is None or custo_gravado < (custo_atual() if custo is None else custo)
+
+# Calibração do custo por implantação
+
+def medir_hash(custo):
+    """Duração (s) de um hash com o custo informado nesta máquina"""
+    inicio = time.perf_counter()
+    _scrypt('calibracao', bytes(TAMANHO_SAL), custo)
+    return time.perf_counter() - inicio
+
+def calibrar(orcamento_ms=None):
+    """Maior custo cujo hash cabe no orçamento de latência (ms); retorna (custo, duração_s)"""
+    orcamento = (settings.SENHA_ORCAMENTO_MS if orcamento_ms is None else orcamento_ms) / 1000
+    custo = CUSTO_MINIMO
+    duracao = medir_hash(custo)
+    
+    # Cada passo dobra N e, com ele, o tempo do hash
+    while custo < CUSTO_MAXIMO and duracao * 2 <= orcamento:
+        custo += 1
+        duracao = medir_hash(custo)
+    
+    if duracao > orcamento and custo > CUSTO_MINIMO:
+        custo -= 1
+        duracao /= 2
+    return custo, duracao
+
+def _carregar_calibracao(caminho):
+    try:
+        with open(caminho, encoding='utf-8') as arquivo:
+            calibracao = json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+    
+    # Orçamento alterado desde a última calibração: calibra de novo
+    if calibracao.get('orcamento_ms') != settings.SENHA_ORCAMENTO_MS:
+        return None
+    return calibracao.get('custo')
+
+def _calibrar_e_gravar(caminho):
+    custo, duracao = calibrar()
+    print(f"🔐 Custo de hash calibrado: 2^{custo} ({duracao * 1000:.0f} ms por senha)")
+    
+    try:
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'custo': custo,
+                'orcamento_ms': settings.SENHA_ORCAMENTO_MS,
+                'medido_ms': round(duracao * 1000, 1),
+                'calibrado_em': time.strftime("%Y-%m-%d %H:%M:%S")
+            }, arquivo, indent=2)
+    except OSError as e:
+        print(f"Não foi possível gravar a calibração de senhas: {e}")
+    return custo
+
+_custo = None
+_custo_lock = threading.Lock()
+
+def custo_atual():
+    """Custo desta implantação: AVERBSYS_SENHA_CUSTO, a calibração gravada ou uma nova calibração"""
+    global _custo
+    if _custo is None:
+        with _custo_lock:
+            if _custo is None:
+                caminho = settings.SENHA_CALIBRACAO_ARQUIVO
+                _custo = (
+                    settings.SENHA_CUSTO
+                    or _carregar_calibracao(caminho)
+                    or _calibrar_e_gravar(caminho)
+                )
+    return _custo
+
+class VerificadorSenhas:
+    """Hash e conferência de senhas num pool de processos, fora do GIL das threads do app.
+    
+    Com processos=0 o trabalho roda na thread que chamou. Senhas em texto
+    puro (legado) são conferidas sem passar pelo pool.
+    """
+    
+    def __init__(self, processos=None):
+        self.processos = settings.SENHA_PROCESSOS if processos is None else processos
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    def _executor(self):
+        if self.processos <= 0:
+            return None
+        
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn: processos limpos, sem herdar as threads do Qt e do Firestore
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.processos,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._pool
+    
+    def _descartar_pool(self, pool):
+        """Processo filho morto derruba o pool inteiro: o próximo uso cria outro"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+    
+    def _executar(self, funcao, *args):
+        pool = self._executor()
+        if pool is None:
+            return funcao(*args)
+        
+        try:
+            return pool.submit(funcao, *args).result()
+        except BrokenProcessPool:
+            print("Pool de senhas interrompido; recriando")
+            self._descartar_pool(pool)
+            return funcao(*args)
+    
+    def conferir(self, senha, armazenado):
+        if not eh_hash(armazenado):
+            return conferir_senha(senha, armazenado)
+        
+        with metricas.span('senhas.conferir'):
+            return self._executar(conferir_senha, senha, armazenado)
+    
+    def gerar_hash(self, senha):
+        with metricas.span('senhas.gerar'):
+            return self._executar(gerar_hash, senha, custo_atual())
+    
+    def gerar_hashes(self, senhas):
+        """Hash de várias senhas distribuído entre os processos, na mesma ordem"""
+        senhas = list(senhas)
+        custo = custo_atual()
+        pool = self._executor()
+        if pool is None:
+            return [gerar_hash(senha, custo) for senha in senhas]
+        
+        lote = max(1, len(senhas) // (self.processos * 4))
+        return list(pool.map(gerar_hash, senhas, repeat(custo), chunksize=lote))
+    
+    async def conferir_async(self, senha, armazenado):
+        """conferir para corrotinas: espera o pool sem ocupar o loop"""
+        if not eh_hash(armazenado):
+            return conferir_senha(senha, armazenado)
+        
+        loop = asyncio.get_running_loop()
+        with metricas.span('senhas.conferir'):
+            return await loop.run_in_executor(self._executor(), conferir_senha, senha, armazenado)
+    
+    async def gerar_hash_async(self, senha):
+        loop = asyncio.get_running_loop()
+        custo = await loop.run_in_executor(None, custo_atual)
+        with metricas.span('senhas.gerar'):
+            return await loop.run_in_executor(self._executor(), gerar_hash, senha, custo)
+    
+    def aquecer(self):
+        """Calibra o custo e sobe os processos antes do primeiro login"""
+        custo_atual()
+        pool = self._executor()
+        if pool is not None:
+            list(pool.map(_nada, range(self.processos)))
+    
+    def encerrar(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def _nada(_):
+    return None
+
+# Verificador compartilhado pelos serviços e réplicas
+verificador = VerificadorSenhas()
@@ -0,0 +1,23 @@
+import asyncio
+
+# Ponte entre o loop do Qt e o asyncio (dependência opcional: pip install qasync)
+
+def criar_loop(app):
+    """Instala um loop asyncio que roda dentro do event loop do Qt"""
+    try:
+        import qasync
+    except ImportError as e:
+        raise ImportError("AVERBSYS_ASYNC requer o pacote qasync (pip install qasync)") from e
+    
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    return loop
+
+def executar(app, loop):
+    """Substitui app.exec_(): roda Qt e asyncio juntos até o app encerrar"""
+    encerrar = asyncio.Event()
+    app.aboutToQuit.connect(encerrar.set)
+    
+    with loop:
+        loop.run_until_complete(encerrar.wait())
+    return 0
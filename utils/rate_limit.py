@@ -0,0 +1,163 @@
+import hashlib
+import math
+import threading
+import time
+from config import settings
+from utils.cache import TTLCache
+
+class LimiteExcedido(Exception):
+    """Fila do limite global longa demais; espera indica quando tentar de novo"""
+    
+    def __init__(self, espera):
+        self.espera = espera
+        super().__init__(f"Sistema ocupado, tente novamente em {math.ceil(espera)} s")
+
+class TokenBucket:
+    """Balde de fichas: taxa fichas/s até capacidade; taxa <= 0 desliga o limite"""
+    
+    def __init__(self, taxa, capacidade, timer=time.monotonic):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.timer = timer
+        self._fichas = float(capacidade)
+        self._atualizado_em = timer()
+        self._lock = threading.Lock()
+    
+    def _repor(self, agora):
+        decorrido = agora - self._atualizado_em
+        self._atualizado_em = agora
+        self._fichas = min(self.capacidade, self._fichas + decorrido * self.taxa)
+    
+    def tentar(self, custo=1):
+        """Consome as fichas se houver; retorna False sem consumir caso contrário"""
+        if self.taxa <= 0:
+            return True
+        
+        with self._lock:
+            self._repor(self.timer())
+            if self._fichas >= custo:
+                self._fichas -= custo
+                return True
+            return False
+    
+    def reservar(self, custo=1):
+        """Consome as fichas mesmo em falta e retorna quanto esperar (s) até a reserva valer"""
+        if self.taxa <= 0:
+            return 0.0
+        
+        with self._lock:
+            self._repor(self.timer())
+            self._fichas -= custo
+            return 0.0 if self._fichas >= 0 else -self._fichas / self.taxa
+    
+    def devolver(self, custo=1):
+        """Desfaz uma reserva que não será usada"""
+        if self.taxa <= 0:
+            return
+        
+        with self._lock:
+            self._fichas = min(self.capacidade, self._fichas + custo)
+    
+    def espera(self, custo=1):
+        """Tempo (s) até haver fichas para o custo, sem consumir"""
+        if self.taxa <= 0:
+            return 0.0
+        
+        with self._lock:
+            self._repor(self.timer())
+            falta = custo - self._fichas
+            return 0.0 if falta <= 0 else falta / self.taxa
+
+def _digest(login, password):
+    # A senha tentada não fica em memória em texto puro
+    return hashlib.sha256(f"{login}\0{password}".encode('utf-8')).digest()
+
+class LimitadorLogin:
+    """Limites do caminho de login: global, por login e falhas recentes.
+    
+    Falhas determinísticas (senha incorreta, usuário inexistente ou bloqueado)
+    ficam lembradas por alguns segundos para a mesma combinação login/senha,
+    e a repetição é respondida sem consultar o backend.
+    """
+    
+    # Mensagens que não mudam ao repetir a mesma tentativa
+    FALHAS_MEMORIZAVEIS = ("Senha incorreta", "Usuário não encontrado", "Usuário bloqueado ou inativo")
+    
+    def __init__(self, taxa_global=None, rajada_global=None, taxa_usuario=None, rajada_usuario=None,
+                 falha_ttl=None, timer=time.monotonic):
+        self.timer = timer
+        self.global_bucket = TokenBucket(
+            settings.LOGIN_LIMITE_GLOBAL_TAXA if taxa_global is None else taxa_global,
+            settings.LOGIN_LIMITE_GLOBAL_RAJADA if rajada_global is None else rajada_global,
+            timer
+        )
+        self.taxa_usuario = settings.LOGIN_LIMITE_USUARIO_TAXA if taxa_usuario is None else taxa_usuario
+        self.rajada_usuario = settings.LOGIN_LIMITE_USUARIO_RAJADA if rajada_usuario is None else rajada_usuario
+        
+        # Baldes por login expiram depois de enchidos de novo, limitando a memória
+        ociosidade = self.rajada_usuario / self.taxa_usuario if self.taxa_usuario > 0 else 0
+        self._baldes = TTLCache(maxsize=10000, ttl=max(1.0, ociosidade), timer=timer)
+        self._baldes_lock = threading.Lock()
+        
+        self._falhas = TTLCache(
+            maxsize=10000,
+            ttl=settings.LOGIN_FALHA_TTL if falha_ttl is None else falha_ttl,
+            timer=timer
+        )
+    
+    # Falhas recentes
+    
+    def falha_recente(self, login, password):
+        """Mensagem da falha anterior para a mesma tentativa, ou None"""
+        falhas = self._falhas.get(login.strip())
+        if not falhas:
+            return None
+        return falhas.get(_digest(login.strip(), password))
+    
+    def tem_falhas(self, login):
+        """Verdadeiro se alguma tentativa do login (com qualquer senha) falhou há pouco"""
+        return bool(self._falhas.get(login.strip()))
+    
+    def registrar_resultado(self, login, password, error_message):
+        if error_message not in self.FALHAS_MEMORIZAVEIS:
+            return
+        
+        login = login.strip()
+        falhas = dict(self._falhas.get(login) or {})
+        falhas[_digest(login, password)] = error_message
+        self._falhas.set(login, falhas)
+    
+    def esquecer(self, login):
+        """Descarta falhas lembradas do login (cadastro, desbloqueio, troca de senha)"""
+        self._falhas.invalidate(login.strip())
+    
+    # Limites
+    
+    def permitir_usuario(self, login):
+        """Retorna (permitido, espera_s) do limite por login"""
+        if self.taxa_usuario <= 0:
+            return True, 0.0
+        
+        login = login.strip()
+        with self._baldes_lock:
+            balde = self._baldes.get(login)
+            if balde is None:
+                balde = TokenBucket(self.taxa_usuario, self.rajada_usuario, self.timer)
+            # set renova a expiração enquanto o login continua ativo
+            self._baldes.set(login, balde)
+        
+        if balde.tentar():
+            return True, 0.0
+        return False, balde.espera()
+    
+    def espera_global(self):
+        return self.global_bucket.espera()
+    
+    def reservar_global(self):
+        return self.global_bucket.reservar()
+    
+    def devolver_global(self):
+        self.global_bucket.devolver()
+
+def mensagem_espera(segundos):
+    return f"Muitas tentativas para este usuário. Aguarde {math.ceil(segundos)} s e tente novamente"
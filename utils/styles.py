@@ -1,3 +1,8 @@
+import time
+from functools import lru_cache
+from config import settings
+from utils.metrics import metricas
+
 def get_login_styles():
     return """
     QWidget {
@@ -55,6 +60,11 @@ def get_login_styles():
         background-color: #cccccc;
     }
     
+    #statusLabel {
+        font-size: 12px;
+        color: #b06000;
+    }
+    
     #registerButton {
         background-color: transparent;
         color: #1a73e8;
@@ -185,4 +195,57 @@ def get_register_styles():
     #backButton:hover {
         background-color: #5a6268;
     }
-    """
\ No newline at end of file
+    """
+
+# Folha única da aplicação: a folha de cada janela escopada pelo objectName dela,
+# instalada uma vez no QApplication em vez de reprocessada a cada setStyleSheet
+
+JANELAS = {
+    'login': ('loginWindow', get_login_styles),
+    'register': ('registerWindow', get_register_styles),
+    'home': ('homeWindow', get_home_styles)
+}
+
+def escopar(folha, escopo):
+    """Prefixa os seletores da folha com #escopo, restringindo as regras àquela janela"""
+    regras = []
+    for bloco in folha.split('}'):
+        if '{' not in bloco:
+            continue
+        
+        seletores, corpo = bloco.split('{', 1)
+        escopados = []
+        for seletor in seletores.split(','):
+            seletor = seletor.strip()
+            escopados.append(f"#{escopo} {seletor}")
+            
+            # Na folha da própria janela, QWidget também pintava a janela
+            if seletor.split(':')[0] == 'QWidget':
+                escopados.append(f"QWidget#{escopo}{seletor[len('QWidget'):]}")
+        
+        regras.append(f"{', '.join(escopados)} {{{corpo.rstrip()}\n}}")
+    return '\n\n'.join(regras)
+
+@lru_cache(maxsize=None)
+def folha_aplicacao():
+    """Folha combinada de todas as janelas, montada uma única vez"""
+    return '\n\n'.join(escopar(funcao(), escopo) for escopo, funcao in JANELAS.values())
+
+def aplicar_estilo(janela, nome):
+    """Identifica a janela pelo objectName do escopo e garante a folha única no QApplication"""
+    from PyQt5.QtWidgets import QApplication
+    
+    escopo, funcao = JANELAS[nome]
+    janela.setObjectName(escopo)
+    
+    inicio = time.perf_counter()
+    app = QApplication.instance()
+    if not settings.ESTILOS_GLOBAIS or app is None:
+        # Modo anterior: cada janela analisa e aplica a própria folha
+        janela.setStyleSheet(funcao())
+    elif getattr(app, '_folha_estilos', None) is not folha_aplicacao():
+        app.setStyleSheet(folha_aplicacao())
+        app._folha_estilos = folha_aplicacao()
+    else:
+        return
+    metricas.registrar('estilos.aplicar', time.perf_counter() - inicio, janela=nome)
\ No newline at end of file
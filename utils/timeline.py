@@ -0,0 +1,25 @@
+import time
+
+# Linha do tempo da inicialização; o relógio começa na primeira importação deste módulo
+_inicio = time.perf_counter()
+_eventos = []
+
+def marcar(evento):
+    """Registra o instante (ms desde o início) em que o evento ocorreu"""
+    decorrido = (time.perf_counter() - _inicio) * 1000
+    _eventos.append((evento, decorrido))
+    return decorrido
+
+def eventos():
+    return list(_eventos)
+
+def decorrido(evento):
+    """Tempo em ms do primeiro registro do evento, ou None"""
+    for nome, instante in _eventos:
+        if nome == evento:
+            return instante
+    return None
+
+def imprimir():
+    for nome, instante in _eventos:
+        print(f"⏱️ {instante:8.1f} ms  {nome}")
@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QFrame, QGridLayout)
 from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtGui import QFont
-from utils.styles import get_home_styles
+from utils.styles import aplicar_estilo
 
 #comentario teste
 
@@ -16,7 +16,7 @@ class HomeWindow(QWidget):
     
     def init_ui(self):
         self.setWindowTitle("Sistema - Home")
-        self.setStyleSheet(get_home_styles())
+        aplicar_estilo(self, 'home')
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
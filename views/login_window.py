@@ -1,13 +1,15 @@
+import math
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QFrame, QMessageBox,
                              QProgressBar)
 from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtGui import QFont
-from utils.styles import get_login_styles
+from utils.styles import aplicar_estilo
 
 class LoginWindow(QWidget):
     login_attempt = pyqtSignal(str, str)
     register_request = pyqtSignal()
+    closed = pyqtSignal()
     
     def __init__(self):
         super().__init__()
@@ -15,7 +17,7 @@ class LoginWindow(QWidget):
     
     def init_ui(self):
         self.setWindowTitle("ABERBSYS")
-        self.setStyleSheet(get_login_styles())
+        aplicar_estilo(self, 'login')
         
         # Layout principal
         layout = QVBoxLayout()
@@ -57,6 +59,13 @@ class LoginWindow(QWidget):
         self.progress_bar.setVisible(False)
         self.progress_bar.setRange(0, 0)  # Progresso indeterminado
         
+        # Aviso de fila quando o sistema limita as tentativas
+        self.status_label = QLabel()
+        self.status_label.setObjectName("statusLabel")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setWordWrap(True)
+        self.status_label.setVisible(False)
+        
         # Adicionar ao layout do formulário
         form_layout.addWidget(QLabel("Usuário:"))
         form_layout.addWidget(self.username_input)
@@ -65,6 +74,7 @@ class LoginWindow(QWidget):
         form_layout.addWidget(self.login_button)
         form_layout.addWidget(self.register_button)
         form_layout.addWidget(self.progress_bar)
+        form_layout.addWidget(self.status_label)
         
         form_frame.setLayout(form_layout)
         
@@ -85,6 +95,10 @@ class LoginWindow(QWidget):
         )
     
     def attempt_login(self):
+        # Enter pressionado com uma tentativa já em andamento
+        if not self.login_button.isEnabled():
+            return
+        
         username = self.username_input.text().strip()
         password = self.password_input.text().strip()
         
@@ -99,6 +113,13 @@ class LoginWindow(QWidget):
         self.login_button.setEnabled(not loading)
         self.register_button.setEnabled(not loading)
         self.progress_bar.setVisible(loading)
+        if not loading:
+            self.status_label.setVisible(False)
+    
+    def show_waiting(self, segundos):
+        """Mantém a tentativa em andamento e informa a espera na fila"""
+        self.status_label.setText(f"Muitos acessos no momento. Sua tentativa está na fila (~{math.ceil(segundos)} s)")
+        self.status_label.setVisible(True)
     
     def show_error(self, message):
         self.set_loading(False)
@@ -113,4 +134,5 @@ class LoginWindow(QWidget):
     def closeEvent(self, event):
         """Limpeza quando a janela for fechada"""
         self.set_loading(False)
+        self.closed.emit()
         super().closeEvent(event)
\ No newline at end of file
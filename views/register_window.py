@@ -2,11 +2,12 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QFrame, QComboBox,
                              QMessageBox, QProgressBar)
 from PyQt5.QtCore import pyqtSignal, Qt
-from utils.styles import get_register_styles
+from utils.styles import aplicar_estilo
 
 class RegisterWindow(QWidget):
     register_attempt = pyqtSignal(dict)
     back_to_login = pyqtSignal()
+    closed = pyqtSignal()
     
     def __init__(self):
         super().__init__()
@@ -14,7 +15,7 @@ class RegisterWindow(QWidget):
     
     def init_ui(self):
         self.setWindowTitle("Sistema - Cadastro")
-        self.setStyleSheet(get_register_styles())
+        aplicar_estilo(self, 'register')
         
         layout = QVBoxLayout()
         layout.setContentsMargins(40, 40, 40, 40)
@@ -136,6 +137,14 @@ class RegisterWindow(QWidget):
         self.set_loading(False)
         QMessageBox.warning(self, "Erro no Cadastro", message)
     
+    def confirm_similar(self, message):
+        """Pergunta se o cadastro segue mesmo com nome parecido já cadastrado"""
+        resposta = QMessageBox.question(
+            self, "Nome Parecido", f"{message}\n\nCadastrar mesmo assim?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        return resposta == QMessageBox.Yes
+    
     def show_success(self, message):
         self.set_loading(False)
         QMessageBox.information(self, "Sucesso", message)
@@ -146,4 +155,8 @@ class RegisterWindow(QWidget):
         self.login_input.clear()
         self.senha_input.clear()
         self.confirm_senha_input.clear()
-        self.perfil_combo.setCurrentIndex(0)
\ No newline at end of file
+        self.perfil_combo.setCurrentIndex(0)
+    
+    def closeEvent(self, event):
+        self.closed.emit()
+        super().closeEvent(event)
\ No newline at end of file
@@ -1,64 +1,562 @@
-import pandas as pd
-from PyQt5.QtCore import QThread, pyqtSignal, QObject
-from services.user_service import UserService
+import itertools
+import threading
+import time
+from PyQt5.QtCore import QCoreApplication, QRunnable, QThreadPool, QTimer, pyqtSignal, QObject
+from config import settings
+from utils import timeline
+from utils.metrics import metricas
+from utils.name_index import IndiceNomes, descrever_semelhantes
+from utils.passwords import verificador
+from utils.rate_limit import LimitadorLogin, LimiteExcedido, mensagem_espera
 
-class WorkerThread(QThread):
-    finished_signal = pyqtSignal(object)
-    error_signal = pyqtSignal(str)
-    
-    def __init__(self, worker_function, *args, **kwargs):
+class WorkerSignals(QObject):
+    finished_signal = pyqtSignal(int, object)
+    error_signal = pyqtSignal(int, str)
+
+class WorkerTask(QRunnable):
+    def __init__(self, task_id, key, args, callback, worker_function):
         super().__init__()
-        self.worker_function = worker_function
+        self.task_id = task_id
+        self.key = key
         self.args = args
-        self.kwargs = kwargs
+        self.callback = callback
+        self.worker_function = worker_function
+        self.cancelled = False
+        self.signals = WorkerSignals()
+        
+        # Instantes para as métricas: entrada na fila e emissão do resultado
+        self.operacao = key[0] if isinstance(key, tuple) else key
+        self.enfileirado_em = None
+        self.emitido_em = None
+        
+        # O APIWorker mantém a referência até o resultado chegar; o pool não deve deletar
+        self.setAutoDelete(False)
     
     def run(self):
+        inicio = time.perf_counter()
+        if self.enfileirado_em is not None:
+            metricas.registrar('worker.fila', inicio - self.enfileirado_em, operacao=self.operacao)
+        
+        if self.cancelled:
+            self.signals.finished_signal.emit(self.task_id, None)
+            return
+        
         try:
-            result = self.worker_function(*self.args, **self.kwargs)
-            self.finished_signal.emit(result)
+            result = self.worker_function(*self.args)
+            self.emitido_em = time.perf_counter()
+            metricas.registrar('worker.execucao', self.emitido_em - inicio, operacao=self.operacao)
+            self.signals.finished_signal.emit(self.task_id, result)
         except Exception as e:
-            self.error_signal.emit(str(e))
+            self.emitido_em = time.perf_counter()
+            metricas.contar('worker.erros', operacao=self.operacao)
+            self.signals.error_signal.emit(self.task_id, str(e))
 
 class APIWorker(QObject):
     data_loaded = pyqtSignal(object)
     error_occurred = pyqtSignal(str)
     login_verified = pyqtSignal(dict, str)
     user_registered = pyqtSignal(bool, str)
+    register_confirmation = pyqtSignal(dict, str)  # cadastro em espera: dados e aviso de nome parecido
+    replica_loaded = pyqtSignal(list)
+    replica_changed = pyqtSignal(list, list)
+    login_revoked = pyqtSignal(str)
+    login_throttled = pyqtSignal(float)
     
-    def __init__(self):
+    def __init__(self, max_workers=None, max_pending=None, backend=None):
         super().__init__()
-        self.user_service = UserService()
-        self.threads = []
+        self._user_service = None
+        self._backend = backend
+        self._service_lock = threading.Lock()
+        
+        # Pool compartilhado com concorrência e fila limitadas
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(settings.WORKER_MAX_THREADS if max_workers is None else max_workers)
+        self.max_pending = settings.WORKER_MAX_PENDENTES if max_pending is None else max_pending
+        
+        self._ids = itertools.count(1)
+        self._tasks = {}          # id -> tarefa em fila ou executando
+        self._current_by_key = {} # chave -> id da requisição vigente
+        
+        # Réplicas locais alimentadas pelo listener do Firestore: DatabaseManager em memória
+        # e, opcionalmente, SQLite em disco (disponível já na abertura do app)
+        self.replica = None
+        self.sqlite_replica = None
+        self._watch = None
+        
+        if settings.USAR_REPLICA_SQLITE:
+            from services.sqlite_replica import ReplicaSQLite
+            self.sqlite_replica = ReplicaSQLite()
+        
+        # Limites de login compartilhados com o UserService; tentativas acima do
+        # limite global esperam aqui, sem ocupar thread do pool
+        self.limitador = LimitadorLogin()
+        self._login_adiado = None
+        self._timer_login = QTimer(self)
+        self._timer_login.setSingleShot(True)
+        self._timer_login.timeout.connect(self._on_login_liberado)
         
-        # Conectar sinais do user_service
-        self.user_service.user_authenticated.connect(self._on_login_result)
-        self.user_service.user_registered.connect(self._on_register_result)
+        # Índice de nomes para o aviso do cadastro quando não há réplica em memória carregada:
+        # montado uma vez (réplica SQLite ou backend) e acrescido dos cadastros feitos aqui
+        self._nomes = None
+        self._nomes_lock = threading.Lock()
+        
+        # Sessão salva ainda não confirmada no backend: nova tentativa a cada intervalo até responder
+        self._sessao_revalidar = None
+        self._timer_revalidacao = QTimer(self)
+        self._timer_revalidacao.setSingleShot(True)
+        self._timer_revalidacao.timeout.connect(self._on_revalidacao_liberada)
+    
+    @property
+    def user_service(self):
+        """UserService criado no primeiro uso; importa e inicializa o Firebase sob demanda"""
+        if self._user_service is None:
+            with self._service_lock:
+                if self._user_service is None:
+                    from services.user_service import UserService
+                    
+                    service = UserService(backend=self._backend, limitador=self.limitador)
+                    
+                    # Criado numa thread do pool: devolve o objeto à thread principal
+                    app = QCoreApplication.instance()
+                    if app is not None and service.thread() is not app.thread():
+                        service.moveToThread(app.thread())
+                    
+                    self._user_service = service
+                    timeline.marcar('firebase_pronto')
+        
+        return self._user_service
+    
+    def warm_up(self):
+        """Inicializa o UserService/Firebase em segundo plano, fora da thread da GUI"""
+        self._submit('warm_up', (), lambda service: None, self._aquecer)
+    
+    def _aquecer(self):
+        service = self.user_service
+        # Custo do hash calibrado e processos de senha prontos antes do primeiro login
+        verificador.aquecer()
+        return service
+    
+    def set_replica(self, replica):
+        """Define o DatabaseManager usado para responder logins e duplicidades localmente"""
+        self.replica = replica
     
     def load_data(self):
-        # Para compatibilidade, emite sinal vazio
-        self.data_loaded.emit(None)
+        if not settings.USAR_REPLICA_LOCAL and self.sqlite_replica is None:
+            # Para compatibilidade, emite sinal vazio
+            self.data_loaded.emit(None)
+            return
+        
+        # O listener depende do Firebase, então também sai da thread da GUI
+        self._submit('sync', (), self._on_sync_started, self._iniciar_sync)
+    
+    def _usar_snapshot(self):
+        return self.replica is not None and settings.USAR_REPLICA_LOCAL and settings.SNAPSHOT_ATIVO
+    
+    def _abrir_snapshot(self):
+        """Abre a réplica em memória do snapshot em disco; retorna a marca do delta (None: carga completa)"""
+        if not self._usar_snapshot():
+            return None
+        
+        if self.replica.open_snapshot():
+            tempo = timeline.marcar('snapshot_aberto')
+            print(f"Réplica local aberta do snapshot com {len(self.replica.data)} usuários em {tempo:.0f} ms")
+        
+        # Réplica SQLite ainda vazia precisa da collection completa
+        if self.sqlite_replica is not None and not self.sqlite_replica.is_loaded():
+            return None
+        return self.replica.sync_mark()
+    
+    def _iniciar_sync(self):
+        sqlite_replica = self.sqlite_replica
+        
+        # Snapshot antes do Firebase: logins já respondidos enquanto a conexão sobe
+        desde = self._abrir_snapshot()
+        
+        # Executados na thread do listener: o SQLite é gravado ali mesmo
+        def on_load(documents):
+            if sqlite_replica is not None:
+                sqlite_replica.substituir_todos(documents)
+            if settings.USAR_REPLICA_LOCAL:
+                self.replica_loaded.emit(documents)
+        
+        def on_changes(upserts, removed_ids):
+            if sqlite_replica is not None:
+                sqlite_replica.aplicar_alteracoes(upserts, removed_ids)
+            if settings.USAR_REPLICA_LOCAL:
+                self.replica_changed.emit(upserts, removed_ids)
+        
+        return self.user_service.escutar_usuarios(on_load, on_changes, desde)
+    
+    def _on_sync_started(self, watch):
+        self._watch = watch
+    
+    def save_snapshot(self):
+        """Grava o snapshot da réplica em memória em segundo plano (ex.: após a carga completa)"""
+        if self._usar_snapshot():
+            self._submit('snapshot', (), lambda gravado: None, self.replica.save_snapshot)
+    
+    def stop_sync(self):
+        if self._watch is not None:
+            self._watch.unsubscribe()
+            self._watch = None
+        
+        # Deltas recebidos nesta execução ficam para a próxima abertura
+        if self._usar_snapshot():
+            self.replica.save_snapshot()
+    
+    def _active_replica(self):
+        """Réplica carregada a consultar: a de memória se pronta, senão a do SQLite"""
+        for replica in (self.replica, self.sqlite_replica):
+            if replica is not None and replica.is_loaded():
+                return replica
+        return None
+    
+    def pending_count(self):
+        return len(self._tasks) + (1 if self._login_adiado is not None else 0)
+    
+    def _submit(self, key, args, callback, worker_function):
+        """Enfileira a tarefa no pool; retorna False se a fila estiver cheia.
+        
+        Uma nova requisição com a mesma chave e os mesmos argumentos é
+        agregada à que já está em andamento; com argumentos diferentes,
+        a anterior é retirada da fila ou tem o resultado descartado.
+        """
+        current_id = self._current_by_key.get(key)
+        current = self._tasks.get(current_id)
+        
+        if current is not None and not current.cancelled:
+            if current.args == args:
+                return True
+            self._cancel(current)
+        
+        if len(self._tasks) >= self.max_pending:
+            return False
+        
+        task = WorkerTask(next(self._ids), key, args, callback, worker_function)
+        task.signals.finished_signal.connect(self._on_task_finished)
+        task.signals.error_signal.connect(self._on_task_error)
+        
+        self._tasks[task.task_id] = task
+        self._current_by_key[key] = task.task_id
+        
+        # start() cria a thread quando o pool ainda não chegou ao máximo
+        task.enfileirado_em = time.perf_counter()
+        self.pool.start(task)
+        metricas.registrar('worker.submit', time.perf_counter() - task.enfileirado_em, operacao=task.operacao)
+        return True
+    
+    def _cancel(self, task):
+        task.cancelled = True
+        
+        # Ainda na fila: sai do pool sem executar
+        if self.pool.tryTake(task):
+            self._release(task)
+    
+    def cancel_pending(self, key=None):
+        """Cancela as requisições da chave (ou todas); resultados em execução são descartados"""
+        if key in (None, 'login'):
+            self._timer_login.stop()
+            self._login_adiado = None
+        
+        for task in list(self._tasks.values()):
+            if (key is None or task.key == key) and not task.cancelled:
+                self._cancel(task)
+    
+    def _release(self, task):
+        self._tasks.pop(task.task_id, None)
+        if self._current_by_key.get(task.key) == task.task_id:
+            del self._current_by_key[task.key]
+    
+    def _registrar_entrega(self, task):
+        # Da emissão na thread do pool até o slot rodar na thread da GUI
+        if task.emitido_em is not None:
+            metricas.registrar('worker.entrega_sinal', time.perf_counter() - task.emitido_em, operacao=task.operacao)
+    
+    def _on_task_finished(self, task_id, result):
+        task = self._tasks.get(task_id)
+        if task is None:
+            return
+        
+        self._registrar_entrega(task)
+        self._release(task)
+        if not task.cancelled:
+            task.callback(result)
+    
+    def _on_task_error(self, task_id, error_message):
+        task = self._tasks.get(task_id)
+        if task is None:
+            return
+        
+        self._registrar_entrega(task)
+        self._release(task)
+        if not task.cancelled:
+            self.error_occurred.emit(error_message)
     
     def verify_login(self, username, password):
-        def worker():
-            self.user_service.verificar_login(username, password)
+        # Réplica local responde sem ler o backend; sem ela, respeita o limite global
+        espera = 0.0 if self._active_replica() is not None else self.limitador.espera_global()
+        
+        if espera > settings.LOGIN_ESPERA_MAXIMA:
+            self.login_verified.emit({}, str(LimiteExcedido(espera)))
+            return
+        
+        if espera > 0:
+            # A tentativa mais recente substitui a que estava esperando
+            self._login_adiado = (username, password)
+            self._timer_login.start(int(espera * 1000) + 1)
+            self.login_throttled.emit(espera)
+            return
         
-        thread = WorkerThread(worker)
-        thread.start()
-        self.threads.append(thread)
+        self._enviar_login(username, password)
     
-    def _on_login_result(self, user_data, error_message):
+    def _on_login_liberado(self):
+        if self._login_adiado is None:
+            return
+        
+        username, password = self._login_adiado
+        self._login_adiado = None
+        self.verify_login(username, password)
+    
+    def _enviar_login(self, username, password):
+        accepted = self._submit(
+            'login', (username, password),
+            lambda result: self._on_login_result(username, password, *result),
+            self._verificar_login
+        )
+        
+        if not accepted:
+            self.login_verified.emit({}, "Muitas requisições em andamento, tente novamente")
+    
+    def _limite_login(self, username, password):
+        """Mensagem da falha recente ou do limite por login; None se a tentativa pode seguir"""
+        falha = self.limitador.falha_recente(username, password)
+        if falha:
+            metricas.contar('auth.limitado', motivo='falha_recente')
+            return falha
+        
+        permitido, espera = self.limitador.permitir_usuario(username)
+        if not permitido:
+            metricas.contar('auth.limitado', motivo='usuario')
+            return mensagem_espera(espera)
+        return None
+    
+    def _verificar_login(self, username, password):
+        """Retorna (user_data, erro, veio_da_replica)"""
+        replica = self._active_replica()
+        if replica is None:
+            return (*self.user_service.verificar_login(username, password), False)
+        
+        # Limites do login valem com réplica também: a confirmação de falhas lê o Firestore
+        bloqueio = self._limite_login(username, password)
+        if bloqueio:
+            return {}, bloqueio, False
+        
+        # Sucesso local responde na hora e é conferido depois com o Firestore
+        user_data, error_message = replica.verify_login(username, password)
+        if user_data:
+            return user_data, "", True
+        
+        # Falha local pode ser réplica desatualizada: confirma no Firestore,
+        # mas se a rede falhar a resposta local vale. Só a primeira falha
+        # do login descarta o cache; as seguintes reaproveitam a leitura
+        try:
+            fresco = not self.limitador.tem_falhas(username)
+            user_data, error_message = self._verificar_remoto(username, password, fresco)
+        except Exception:
+            return {}, error_message, True
+        
+        self.limitador.registrar_resultado(username, password, error_message)
+        return user_data, error_message, False
+    
+    def _verificar_remoto(self, username, password, fresco=True):
+        """Consulta o Firestore (sem cache se fresco) e atualiza a réplica em disco; propaga erros de rede"""
+        from services.user_service import avaliar_credenciais
+        
+        if fresco:
+            self.user_service.user_cache.invalidate(username.strip())
+        encontrado = self.user_service.buscar_usuario(username)
+        
+        if encontrado is None:
+            if self.sqlite_replica is not None:
+                self.sqlite_replica.remover_login(username)
+            return {}, "Usuário não encontrado"
+        
+        doc_id, user_data = encontrado
+        if self.sqlite_replica is not None:
+            self.sqlite_replica.upsert(doc_id, user_data)
+        
+        user_info, error_message = avaliar_credenciais(doc_id, user_data, password)
+        if not error_message:
+            self.user_service.atualizar_hash_senha(doc_id, user_data, password)
+        return user_info, error_message
+    
+    def _reconciliar_login(self, username, password):
+        try:
+            return self._verificar_remoto(username, password)
+        except Exception as e:
+            # Sem rede: mantém a sessão aberta com base na réplica
+            print(f"Não foi possível confirmar o login no Firestore: {e}")
+            return None
+    
+    def _on_login_result(self, username, password, user_data, error_message, from_replica=False):
         if user_data and not error_message:
             self.login_verified.emit(user_data, "")
+            
+            if from_replica:
+                self._submit(
+                    ('reconcile', username), (username, password),
+                    self._on_login_reconciled,
+                    self._reconciliar_login
+                )
         else:
             self.login_verified.emit({}, error_message)
     
-    def register_user(self, user_data):
-        def worker():
-            self.user_service.cadastrar_usuario(user_data)
+    def _on_login_reconciled(self, result):
+        if result is None:
+            return
+        
+        user_data, error_message = result
+        if error_message:
+            self.login_revoked.emit(error_message)
+    
+    def revalidate_session(self, user_data):
+        """Confirma em segundo plano que o usuário de uma sessão salva continua existindo, ativo e com o mesmo perfil"""
+        self._sessao_revalidar = user_data
+        self._timer_revalidacao.stop()
+        
+        login = user_data['login']
+        accepted = self._submit(
+            ('revalidate', login), (login, user_data.get('id'), user_data.get('perfil'), user_data.get('nome_completo')),
+            self._on_session_revalidated,
+            self._revalidar_sessao
+        )
+        if not accepted:
+            self._timer_revalidacao.start(int(settings.SESSAO_REVALIDAR_INTERVALO * 1000))
+    
+    def stop_revalidation(self):
+        """Abandona a confirmação da sessão salva (logout ou sessão já derrubada)"""
+        self._timer_revalidacao.stop()
+        user_data, self._sessao_revalidar = self._sessao_revalidar, None
+        if user_data is not None:
+            self.cancel_pending(('revalidate', user_data['login']))
+    
+    def _on_revalidacao_liberada(self):
+        if self._sessao_revalidar is not None:
+            self.revalidate_session(self._sessao_revalidar)
+    
+    def _revalidar_sessao(self, login, user_id, perfil, nome_completo):
+        try:
+            service = self.user_service
+            service.user_cache.invalidate(login.strip())
+            encontrado = service.buscar_usuario(login)
+        except Exception as e:
+            # Sem rede: a sessão continua valendo, e a verificação é repetida até o backend responder
+            print(f"Não foi possível revalidar a sessão, nova tentativa em {settings.SESSAO_REVALIDAR_INTERVALO:.0f} s: {e}")
+            return None
         
-        thread = WorkerThread(worker)
-        thread.start()
-        self.threads.append(thread)
+        if encontrado is None:
+            return "Usuário não encontrado"
+        
+        doc_id, user_data = encontrado
+        if user_id and doc_id != user_id:
+            return "Sessão expirada, faça login novamente"
+        if user_data.get('status') != 'Ativo':
+            return "Usuário bloqueado ou inativo"
+        # Perfil ou nome alterados desde o login: a home não pode seguir com os dados antigos
+        if user_data.get('perfil') != perfil or user_data.get('nome_completo') != nome_completo:
+            return "Dados do usuário alterados, faça login novamente"
+        return ""
+    
+    def _on_session_revalidated(self, error_message):
+        if error_message is None:
+            if self._sessao_revalidar is not None:
+                self._timer_revalidacao.start(int(settings.SESSAO_REVALIDAR_INTERVALO * 1000))
+            return
+        
+        self._sessao_revalidar = None
+        if error_message:
+            self.login_revoked.emit(error_message)
+    
+    def register_user(self, user_data, confirmado=False):
+        """Cadastra o usuário; com nome parecido e sem confirmado, emite register_confirmation em vez de gravar"""
+        accepted = self._submit(
+            'register', (user_data, confirmado),
+            lambda result: self._on_register_result(user_data, *result),
+            self._cadastrar_usuario
+        )
+        
+        if not accepted:
+            self.user_registered.emit(False, "Muitas requisições em andamento, tente novamente")
+    
+    def prepare_similar_names(self):
+        """Monta em segundo plano o índice de nomes do aviso de cadastro (ex.: ao abrir a tela de cadastro)"""
+        replica = self._active_replica()
+        if self._nomes is None and (replica is None or not hasattr(replica, 'similar_names')):
+            self._submit('nomes', (), lambda indice: None, self._indice_nomes)
     
-    def _on_register_result(self, success, message):
-        self.user_registered.emit(success, message)
\ No newline at end of file
+    def _indice_nomes(self):
+        """IndiceNomes dos nomes cadastrados, lidos da réplica SQLite se carregada, senão do backend"""
+        with self._nomes_lock:
+            if self._nomes is not None:
+                return self._nomes
+        
+        try:
+            if self.sqlite_replica is not None and self.sqlite_replica.is_loaded():
+                nomes = self.sqlite_replica.nomes()
+            else:
+                nomes = [
+                    dados.get('nome_completo', '')
+                    for dados in self.user_service.iterar_usuarios(tamanho_pagina=5000, campos=['nome_completo'])
+                ]
+        except Exception as e:
+            # Sem a lista de nomes o cadastro segue sem o aviso
+            print(f"Não foi possível carregar os nomes para o aviso de cadastro: {e}")
+            return None
+        
+        indice = IndiceNomes(nomes)
+        with self._nomes_lock:
+            if self._nomes is None:
+                self._nomes = indice
+            return self._nomes
+    
+    def _nomes_parecidos(self, nome_completo):
+        """[(nome cadastrado, similaridade)] para o aviso do cadastro, de qualquer fonte disponível"""
+        replica = self._active_replica()
+        if replica is not None and hasattr(replica, 'similar_names'):
+            return replica.similar_names(nome_completo)
+        
+        indice = self._indice_nomes()
+        if indice is None:
+            return []
+        with self._nomes_lock:
+            return indice.semelhantes(nome_completo, settings.NOMES_LIMIAR_SEMELHANCA)
+    
+    def _nome_cadastrado(self, nome_completo):
+        with self._nomes_lock:
+            if self._nomes is not None:
+                self._nomes.adicionar(nome_completo)
+    
+    def _cadastrar_usuario(self, user_data, confirmado):
+        """Retorna (sucesso, mensagem); sucesso None pede confirmação do nome parecido antes de gravar"""
+        # Duplicidade evidente é recusada localmente; o Firestore continua sendo a palavra final
+        replica = self._active_replica()
+        if replica is not None:
+            exists, message = replica.user_exists(user_data['login'], user_data['nome_completo'])
+            if exists:
+                return False, message
+        
+        if not confirmado:
+            parecidos = self._nomes_parecidos(user_data['nome_completo'])
+            if parecidos:
+                return None, descrever_semelhantes(parecidos)
+        
+        success, message = self.user_service.cadastrar_usuario(user_data)
+        if success:
+            self._nome_cadastrado(user_data['nome_completo'])
+        return success, message
+    
+    def _on_register_result(self, user_data, success, message):
+        if success is None:
+            self.register_confirmation.emit(user_data, message)
+        else:
+            self.user_registered.emit(success, message)
\ No newline at end of file
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from PyQt5.QtCore import QCoreApplication
+from utils.metrics import metricas
+from utils.name_index import descrever_semelhantes
+from workers.api_worker import APIWorker
+
+class AsyncAPIWorker(APIWorker):
+    """APIWorker que atende login e cadastro com o AsyncUserService no loop asyncio do Qt.
+    
+    Sem thread por requisição: as consultas ficam em voo na thread da GUI e
+    uma nova requisição com a mesma chave cancela a anterior de fato (a RPC
+    é interrompida). Aquecimento e listener seguem no pool de threads.
+    """
+    
+    def __init__(self, max_workers=None, max_pending=None, backend=None, async_backend=None):
+        super().__init__(max_workers, max_pending, backend)
+        self._async_backend = async_backend
+        self._async_service = None
+        self._async_tasks = {}  # chave -> (args, asyncio.Task)
+    
+    async def _servico_async(self):
+        if self._async_service is None:
+            from services.async_user_service import AsyncUserService
+            
+            def criar():
+                service = AsyncUserService(backend=self._async_backend, limitador=self.limitador)
+                
+                # Criado na thread do executor: devolve o objeto (e seus sinais) à thread principal.
+                # moveToThread só "empurra" a partir da thread dona, por isso acontece aqui
+                app = QCoreApplication.instance()
+                if app is not None and service.thread() is not app.thread():
+                    service.moveToThread(app.thread())
+                return service
+            
+            # A inicialização do Firebase bloqueia: fica fora da thread da GUI
+            loop = asyncio.get_running_loop()
+            service = await loop.run_in_executor(None, criar)
+            if self._async_service is None:
+                self._async_service = service
+        return self._async_service
+    
+    def pending_count(self):
+        return super().pending_count() + len(self._async_tasks)
+    
+    def _agendar(self, key, args, callback, coro_function):
+        """Equivalente assíncrono do _submit: agrega, substitui e limita requisições por chave"""
+        atual = self._async_tasks.get(key)
+        
+        if atual is not None:
+            atual_args, atual_task = atual
+            if atual_args == args:
+                return True
+            atual_task.cancel()
+            self._async_tasks.pop(key, None)
+        
+        if self.pending_count() >= self.max_pending:
+            return False
+        
+        operacao = key[0] if isinstance(key, tuple) else key
+        inicio = time.perf_counter()
+        task = asyncio.ensure_future(coro_function(*args))
+        self._async_tasks[key] = (args, task)
+        
+        def concluir(task):
+            if self._async_tasks.get(key, (None, None))[1] is task:
+                del self._async_tasks[key]
+            if task.cancelled():
+                metricas.contar('worker.canceladas', operacao=operacao)
+                return
+            
+            # Sem fila nem troca de thread: execução é todo o tempo até o callback
+            metricas.registrar('worker.execucao', time.perf_counter() - inicio, operacao=operacao)
+            
+            erro = task.exception()
+            if erro is not None:
+                self.error_occurred.emit(str(erro))
+            else:
+                callback(task.result())
+        
+        task.add_done_callback(concluir)
+        return True
+    
+    def cancel_pending(self, key=None):
+        super().cancel_pending(key)
+        
+        for chave, (_, task) in list(self._async_tasks.items()):
+            if key is None or chave == key:
+                task.cancel()
+                del self._async_tasks[chave]
+    
+    def _enviar_login(self, username, password):
+        accepted = self._agendar(
+            'login', (username, password),
+            lambda result: self._on_login_result(username, password, *result),
+            self._verificar_login_async
+        )
+        
+        if not accepted:
+            self.login_verified.emit({}, "Muitas requisições em andamento, tente novamente")
+    
+    async def _verificar_login_async(self, username, password):
+        """Retorna (user_data, erro, veio_da_replica)"""
+        replica = self._active_replica()
+        if replica is not None:
+            bloqueio = self._limite_login(username, password)
+            if bloqueio:
+                return {}, bloqueio, False
+            
+            # A conferência do hash bloqueia: fora da thread da GUI
+            loop = asyncio.get_running_loop()
+            user_data, error_message = await loop.run_in_executor(None, replica.verify_login, username, password)
+            if user_data:
+                return user_data, "", True
+            
+            try:
+                fresco = not self.limitador.tem_falhas(username)
+                user_data, error_message = await self._verificar_remoto_async(username, password, fresco)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                return {}, error_message, True
+            
+            self.limitador.registrar_resultado(username, password, error_message)
+            return user_data, error_message, False
+        
+        service = await self._servico_async()
+        return (*await service.verificar_login(username, password), False)
+    
+    async def _verificar_remoto_async(self, username, password, fresco=True):
+        service = await self._servico_async()
+        if fresco:
+            service.user_cache.invalidate(username.strip())
+        encontrado = await service.buscar_usuario(username)
+        
+        if encontrado is None:
+            if self.sqlite_replica is not None:
+                self.sqlite_replica.remover_login(username)
+            return {}, "Usuário não encontrado"
+        
+        doc_id, user_data = encontrado
+        if self.sqlite_replica is not None:
+            self.sqlite_replica.upsert(doc_id, user_data)
+        
+        user_info, error_message = await service.avaliar_credenciais(doc_id, user_data, password)
+        if not error_message:
+            await service.atualizar_hash_senha(doc_id, user_data, password)
+        return user_info, error_message
+    
+    async def _reconciliar_login_async(self, username, password):
+        try:
+            return await self._verificar_remoto_async(username, password)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Não foi possível confirmar o login no Firestore: {e}")
+            return None
+    
+    def _on_login_result(self, username, password, user_data, error_message, from_replica=False):
+        if user_data and not error_message:
+            self.login_verified.emit(user_data, "")
+            
+            if from_replica:
+                self._agendar(
+                    ('reconcile', username), (username, password),
+                    self._on_login_reconciled,
+                    self._reconciliar_login_async
+                )
+        else:
+            self.login_verified.emit({}, error_message)
+    
+    def register_user(self, user_data, confirmado=False):
+        accepted = self._agendar(
+            'register', (user_data, confirmado),
+            lambda result: self._on_register_result(user_data, *result),
+            self._cadastrar_usuario_async
+        )
+        
+        if not accepted:
+            self.user_registered.emit(False, "Muitas requisições em andamento, tente novamente")
+    
+    async def _cadastrar_usuario_async(self, user_data, confirmado):
+        replica = self._active_replica()
+        if replica is not None:
+            exists, message = replica.user_exists(user_data['login'], user_data['nome_completo'])
+            if exists:
+                return False, message
+        
+        if not confirmado:
+            # O índice de nomes é montado na primeira consulta: fora da thread da GUI
+            loop = asyncio.get_running_loop()
+            parecidos = await loop.run_in_executor(None, self._nomes_parecidos, user_data['nome_completo'])
+            if parecidos:
+                return None, descrever_semelhantes(parecidos)
+        
+        service = await self._servico_async()
+        success, message = await service.cadastrar_usuario(user_data)
+        if success:
+            self._nome_cadastrado(user_data['nome_completo'])
+        return success, message